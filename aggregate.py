@@ -0,0 +1,152 @@
+"""Накопительные итоги тренировок по пользователям и периодам.
+
+Каждое сообщение о тренировке добавляется в итоги за день, неделю и
+месяц — по виду тренировки и по всем видам сразу — за постоянное
+время. Итоги, собранные в разных процессах, складываются `merge`.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field, fields, replace
+from datetime import date, datetime, timedelta
+from typing import Hashable, Iterable
+
+from homework import InfoMessage, Training
+
+PERIODS: tuple[str, ...] = ('day', 'week', 'month')
+
+
+def period_start(period: str, when: date) -> date:
+    """Вернуть первый день периода, в который попадает `when`."""
+    if isinstance(when, datetime):
+        when = when.date()
+    if period == 'day':
+        return when
+    if period == 'week':
+        return when - timedelta(days=when.weekday())
+    if period == 'month':
+        return when.replace(day=1)
+    raise ValueError(f'Неизвестный период: {period}')
+
+
+@dataclass
+class Totals:
+    """Сумма, число, средние и крайние значения показателей."""
+    count: int = 0
+    duration: float = 0.0
+    distance: float = 0.0
+    calories: float = 0.0
+    speed_sum: float = 0.0
+    min_speed: float = math.inf
+    max_speed: float = -math.inf
+    min_distance: float = math.inf
+    max_distance: float = -math.inf
+    min_calories: float = math.inf
+    max_calories: float = -math.inf
+
+    @property
+    def mean_speed(self) -> float:
+        """Средняя из скоростей отдельных тренировок."""
+        return self.speed_sum / self.count if self.count else 0.0
+
+    @property
+    def overall_speed(self) -> float:
+        """Средняя скорость за всё время тренировок."""
+        return self.distance / self.duration if self.duration else 0.0
+
+    def add(self, info: InfoMessage) -> None:
+        """Учесть одну тренировку."""
+        self.count += 1
+        self.duration += info.duration
+        self.distance += info.distance
+        self.calories += info.calories
+        self.speed_sum += info.speed
+        self.min_speed = min(self.min_speed, info.speed)
+        self.max_speed = max(self.max_speed, info.speed)
+        self.min_distance = min(self.min_distance, info.distance)
+        self.max_distance = max(self.max_distance, info.distance)
+        self.min_calories = min(self.min_calories, info.calories)
+        self.max_calories = max(self.max_calories, info.calories)
+
+    def merge(self, other: Totals) -> None:
+        """Добавить итоги, собранные отдельно."""
+        for item in fields(self):
+            name = item.name
+            mine, theirs = getattr(self, name), getattr(other, name)
+            if name.startswith('min_'):
+                setattr(self, name, min(mine, theirs))
+            elif name.startswith('max_'):
+                setattr(self, name, max(mine, theirs))
+            else:
+                setattr(self, name, mine + theirs)
+
+
+BucketKey = tuple[Hashable, str, str | None]
+
+
+@dataclass
+class Aggregator:
+    """Накопительные итоги по пользователям, видам тренировок и периодам.
+
+    Итоги по всем видам тренировок хранятся под видом `None`.
+    """
+    periods: tuple[str, ...] = PERIODS
+    buckets: dict[BucketKey, dict[date, Totals]] = field(
+        default_factory=dict)
+
+    def add(self, user: Hashable, result: InfoMessage | Training,
+            when: date) -> None:
+        """Учесть тренировку пользователя `user`, прошедшую `when`."""
+        if isinstance(result, Training):
+            result = result.show_training_info()
+        for period in self.periods:
+            start = period_start(period, when)
+            for training_type in (result.training_type, None):
+                key = (user, period, training_type)
+                series = self.buckets.setdefault(key, {})
+                totals = series.get(start)
+                if totals is None:
+                    totals = series[start] = Totals()
+                totals.add(result)
+
+    def extend(self, results: Iterable[tuple[Hashable,
+                                             InfoMessage | Training,
+                                             date]]) -> None:
+        """Учесть несколько тренировок `(user, result, when)`."""
+        for user, result, when in results:
+            self.add(user, result, when)
+
+    def merge(self, other: Aggregator) -> None:
+        """Добавить итоги другого агрегатора с теми же периодами."""
+        if other.periods != self.periods:
+            raise ValueError('Агрегаторы собраны по разным периодам')
+        for key, other_series in other.buckets.items():
+            series = self.buckets.setdefault(key, {})
+            for start, other_totals in other_series.items():
+                totals = series.get(start)
+                if totals is None:
+                    series[start] = replace(other_totals)
+                else:
+                    totals.merge(other_totals)
+
+    def get(self, user: Hashable, period: str, when: date,
+            training_type: str | None = None) -> Totals:
+        """Итоги пользователя за период, в который попадает `when`."""
+        if period not in self.periods:
+            raise ValueError(f'Итоги за период {period} не собираются')
+        series = self.buckets.get((user, period, training_type), {})
+        totals = series.get(period_start(period, when))
+        return replace(totals) if totals is not None else Totals()
+
+    def series(self, user: Hashable, period: str,
+               training_type: str | None = None
+               ) -> list[tuple[date, Totals]]:
+        """Итоги пользователя по всем периодам в порядке времени."""
+        if period not in self.periods:
+            raise ValueError(f'Итоги за период {period} не собираются')
+        series = self.buckets.get((user, period, training_type), {})
+        return [(start, replace(series[start])) for start in sorted(series)]
+
+    def users(self) -> set[Hashable]:
+        """Пользователи, по которым есть итоги."""
+        return {user for user, _, _ in self.buckets}
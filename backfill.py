@@ -0,0 +1,297 @@
+"""Долгая обработка дампов пакетов с контрольными точками.
+
+Пакеты читаются из файлов кусками по `chunk_size`. После куска
+сообщения дописываются в файл результатов, а не реже чем раз в
+`every` пакетов (и/или `seconds` секунд) на диск атомарно пишется
+контрольная точка: номер файла и смещение в нём в байтах, число
+обработанных пакетов, длина файла результатов и итоги по видам
+тренировок (`aggregate.Totals`).
+
+При перезапуске с той же контрольной точкой чтение продолжается с
+сохранённого смещения, файл результатов обрезается до сохранённой
+длины, а итоги восстанавливаются из точки, поэтому пакеты не
+обрабатываются и не учитываются дважды.
+
+Неверный пакет останавливает обработку, и перезапуск упрётся в него
+снова. С `skip_invalid` такие пакеты пропускаются
+(`validation.iter_valid`), а их число и первые `MAX_REJECTED` причин
+сохраняются в контрольной точке.
+
+    python backfill.py dumps/*.csv -o results.txt --checkpoint state.json
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field, replace
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, Sequence
+
+from aggregate import Totals
+from homework import read_package, render_messages
+from packets import (FIXED_MAGIC, FIXED_RECORD, Packet, detect_format,
+                     read_binary, read_csv, read_jsonl, unpack_fixed)
+from validation import Rejection, iter_valid
+
+VERSION: int = 1
+MAX_REJECTED: int = 1000
+
+
+@dataclass
+class Checkpoint:
+    """Состояние обработки: где остановились и что уже посчитано."""
+    paths: list[str]
+    format: str | None = None
+    file: int = 0
+    offset: int = 0
+    packets: int = 0
+    output_size: int = 0
+    done: bool = False
+    totals: dict[str, Totals] = field(default_factory=dict)
+    skipped: int = 0
+    rejected: list[Rejection] = field(default_factory=list)
+
+    def to_json(self) -> str:
+        state = asdict(self)
+        state['version'] = VERSION
+        return json.dumps(state, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> Checkpoint:
+        state = json.loads(text)
+        if state.pop('version', None) != VERSION:
+            raise ValueError('Неизвестная версия контрольной точки')
+        state['totals'] = {name: Totals(**totals)
+                           for name, totals in state['totals'].items()}
+        state['rejected'] = [Rejection(**rejection)
+                             for rejection in state.get('rejected', [])]
+        return cls(**state)
+
+    def save(self, path: str | Path) -> None:
+        """Записать точку атомарно: во временный файл и переименовать."""
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as stream:
+            stream.write(self.to_json())
+            stream.flush()
+            os.fsync(stream.fileno())
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> Checkpoint | None:
+        """Прочитать точку; None, если её ещё нет."""
+        try:
+            with open(path, encoding='utf-8') as stream:
+                return cls.from_json(stream.read())
+        except FileNotFoundError:
+            return None
+
+
+def _read_text(stream: BinaryIO, fmt: str,
+               chunk_size: int) -> Iterator[list[Packet]]:
+    parse = read_csv if fmt == 'csv' else read_jsonl
+    while True:
+        lines = list(islice(stream, chunk_size))
+        if not lines:
+            return
+        yield list(parse([line.decode('utf-8') for line in lines]))
+
+
+def _read_fixed(stream: BinaryIO,
+                chunk_size: int) -> Iterator[list[Packet]]:
+    if stream.tell() == 0:
+        if stream.read(len(FIXED_MAGIC)) != FIXED_MAGIC:
+            raise ValueError('Файл не в формате записей постоянной длины')
+    while True:
+        chunk = stream.read(FIXED_RECORD.size * chunk_size)
+        if not chunk:
+            return
+        if len(chunk) % FIXED_RECORD.size:
+            raise ValueError('Запись постоянной длины обрезана')
+        yield list(unpack_fixed(chunk))
+
+
+def read_chunks(path: str | Path, fmt: str | None = None, offset: int = 0,
+                chunk_size: int = 10_000
+                ) -> Iterator[tuple[list[Packet], int]]:
+    """Читать пакеты кусками с `offset`, отдавая смещение после куска.
+
+    Смещение — позиция в файле в байтах, с которой начинается
+    следующий кусок.
+    """
+    fmt = fmt or detect_format(path)
+    with open(path, 'rb') as stream:
+        stream.seek(offset)
+        if fmt == 'fixed':
+            chunks = _read_fixed(stream, chunk_size)
+        elif fmt == 'bin':
+            packets = read_binary(stream)
+            chunks = iter(lambda: list(islice(packets, chunk_size)), [])
+        else:
+            chunks = _read_text(stream, fmt, chunk_size)
+        for chunk in chunks:
+            yield chunk, stream.tell()
+
+
+class Backfill:
+    """Обработка набора файлов с продолжением с контрольной точки.
+
+    С `skip_invalid` неверные пакеты пропускаются; для каждого
+    вызывается `on_reject`, номер в `Rejection.index` считается по всем
+    файлам набора.
+    """
+
+    def __init__(self, paths: Sequence[str | Path],
+                 checkpoint: str | Path, output: str | Path | None = None,
+                 fmt: str | None = None, chunk_size: int = 10_000,
+                 every: int = 100_000, seconds: float | None = None,
+                 skip_invalid: bool = False,
+                 on_reject: Callable[[Rejection], None] | None = None
+                 ) -> None:
+        if '-' in map(str, paths):
+            raise ValueError('Стандартный ввод нельзя продолжить с '
+                             'контрольной точки')
+        if chunk_size < 1 or every < 1:
+            raise ValueError('chunk_size и every должны быть '
+                             'положительными')
+        self.paths = [str(path) for path in paths]
+        self.checkpoint_path = checkpoint
+        self.output = output
+        self.fmt = fmt
+        self.chunk_size = chunk_size
+        self.every = every
+        self.seconds = seconds
+        self.skip_invalid = skip_invalid
+        self.on_reject = on_reject
+        self.checkpoints = 0
+        self.checkpoint_time = 0.0
+
+    def _resume(self) -> Checkpoint:
+        state = Checkpoint.load(self.checkpoint_path)
+        if state is None:
+            return Checkpoint(self.paths, self.fmt)
+        if (state.paths, state.format) != (self.paths, self.fmt):
+            raise ValueError('Контрольная точка записана для других '
+                             'файлов или формата')
+        return state
+
+    def _open_output(self, state: Checkpoint) -> BinaryIO | None:
+        if self.output is None:
+            return None
+        if not state.packets:
+            return open(self.output, 'wb')
+        stream = open(self.output, 'r+b')
+        stream.truncate(state.output_size)
+        stream.seek(state.output_size)
+        return stream
+
+    def _save(self, state: Checkpoint, output: BinaryIO | None) -> None:
+        started = time.perf_counter()
+        if output is not None:
+            output.flush()
+            os.fsync(output.fileno())
+            state.output_size = output.tell()
+        state.save(self.checkpoint_path)
+        self.checkpoints += 1
+        self.checkpoint_time += time.perf_counter() - started
+
+    def run(self) -> Checkpoint:
+        """Обработать оставшиеся пакеты, вернуть итоговое состояние."""
+        state = self._resume()
+        if state.done:
+            return state
+        output = self._open_output(state)
+        try:
+            pending = 0
+            saved_at = time.monotonic()
+            while state.file < len(self.paths):
+                chunks = read_chunks(self.paths[state.file], self.fmt,
+                                     state.offset, self.chunk_size)
+                for chunk, offset in chunks:
+                    self._process(chunk, state, output)
+                    state.offset = offset
+                    pending += len(chunk)
+                    if pending >= self.every or (
+                            self.seconds is not None
+                            and time.monotonic() - saved_at
+                            >= self.seconds):
+                        self._save(state, output)
+                        pending = 0
+                        saved_at = time.monotonic()
+                state.file += 1
+                state.offset = 0
+            state.done = True
+            self._save(state, output)
+        finally:
+            if output is not None:
+                output.close()
+        return state
+
+    def _reject(self, state: Checkpoint, rejection: Rejection) -> None:
+        rejection = replace(rejection, index=state.packets + rejection.index)
+        state.skipped += 1
+        if len(state.rejected) < MAX_REJECTED:
+            state.rejected.append(rejection)
+        if self.on_reject is not None:
+            self.on_reject(rejection)
+
+    def _process(self, chunk: list[Packet], state: Checkpoint,
+                 output: BinaryIO | None) -> None:
+        packets: Iterable[Packet] = chunk
+        if self.skip_invalid:
+            packets = iter_valid(chunk, lambda rejection: self._reject(
+                state, rejection))
+        infos = [read_package(workout_type, data).show_training_info()
+                 for workout_type, data in packets]
+        totals = state.totals
+        for info in infos:
+            training_totals = totals.get(info.training_type)
+            if training_totals is None:
+                training_totals = totals[info.training_type] = Totals()
+            training_totals.add(info)
+        state.packets += len(chunk)
+        if output is not None and infos:
+            output.write(('\n'.join(render_messages(infos))
+                          + '\n').encode('utf-8'))
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Обработать дампы с контрольными точками и вывести итоги."""
+    import argparse
+
+    from packets import FORMATS
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('paths', nargs='+', help='файлы с пакетами')
+    parser.add_argument('--checkpoint', required=True,
+                        help='файл контрольной точки')
+    parser.add_argument('-o', '--output', help='файл для сообщений')
+    parser.add_argument('-f', '--format', choices=FORMATS)
+    parser.add_argument('--chunk-size', type=int, default=10_000)
+    parser.add_argument('--every', type=int, default=100_000,
+                        help='пакетов между контрольными точками')
+    parser.add_argument('--seconds', type=float,
+                        help='секунд между контрольными точками')
+    parser.add_argument('--skip-invalid', action='store_true',
+                        help='пропускать неверные пакеты, сообщая о них '
+                             'в stderr')
+    args = parser.parse_args(argv)
+    state = Backfill(
+        args.paths, args.checkpoint, args.output, args.format,
+        args.chunk_size, args.every, args.seconds, args.skip_invalid,
+        lambda rejection: print(
+            f'Пакет {rejection.index} пропущен: {rejection.reason}',
+            file=sys.stderr)).run()
+    for name, totals in sorted(state.totals.items()):
+        print(f'{name}: тренировок {totals.count}, '
+              f'дистанция {totals.distance:.3f} км, '
+              f'калории {totals.calories:.3f}')
+    if state.skipped:
+        print(f'Пропущено неверных пакетов: {state.skipped}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""Пакетный (колоночный) расчёт показателей тренировок.
+
+Вместо объекта `Training` на каждый пакет показатели считаются сразу
+по колонкам: `action`, `duration`, `weight`, `height`, `length_pool`,
+`count_pool`. Формулы — ядра классов из `homework.py` (`KERNELS`),
+поэтому результаты совпадают с поштучным расчётом. Если установлен
+NumPy и колонки переданы как `ndarray`, расчёт выполняется векторно,
+иначе — на чистом Python.
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Any, Iterable, Iterator, Mapping, Sequence
+
+from homework import (KERNELS, TRAINING_FIELDS as FIELDS, InfoMessage,
+                      Running, SportsWalking, Swimming)
+
+RESULTS: tuple[str, ...] = ('distance', 'speed', 'calories')
+
+
+def _numpy() -> Any:
+    """Вернуть модуль NumPy или None, если он не установлен."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+FORMULAS = {code: KERNELS[code] for code in ('RUN', 'WLK', 'SWM')}
+
+
+def _codes(workout_type: str | Sequence[str], size: int) -> list[str]:
+    """Привести код тренировки к списку кодов по строкам."""
+    if isinstance(workout_type, str):
+        codes = [workout_type] * size
+    else:
+        codes = list(workout_type)
+    if len(codes) != size:
+        raise ValueError('Число кодов тренировок не совпадает '
+                         'с длиной колонок')
+    unknown = set(codes) - FORMULAS.keys()
+    if unknown:
+        raise KeyError(f'Код тренировки не существует: {sorted(unknown)}')
+    return codes
+
+
+def _size(arrays: Mapping[str, Sequence[float]]) -> int:
+    sizes = {len(column) for column in arrays.values()}
+    if len(sizes) != 1:
+        raise ValueError('Колонки должны быть одинаковой длины')
+    return sizes.pop()
+
+
+def _compute_numpy(np: Any, codes: list[str],
+                   arrays: Mapping[str, Any]) -> dict[str, Any]:
+    size = len(codes)
+    columns = {name: np.asarray(column, dtype=np.float64)
+               for name, column in arrays.items()}
+    codes_array = np.asarray(codes)
+    result = {name: np.empty(size, dtype=np.float64) for name in RESULTS}
+    # Как и на чистом Python, деление на ноль — ошибка, а не inf/nan.
+    with np.errstate(divide='raise', invalid='raise'):
+        for code, formula in FORMULAS.items():
+            mask = codes_array == code
+            if not mask.any():
+                continue
+            args = [columns[name][mask] for name in FIELDS[code]]
+            for name, values in zip(RESULTS, formula(*args)):
+                result[name][mask] = values
+    return result
+
+
+def _compute_python(codes: list[str],
+                    arrays: Mapping[str, Sequence[float]]
+                    ) -> dict[str, array]:
+    size = len(codes)
+    result = {name: array('d', bytes(8 * size)) for name in RESULTS}
+    groups: dict[str, list[int]] = {}
+    for index, code in enumerate(codes):
+        groups.setdefault(code, []).append(index)
+    for code, indexes in groups.items():
+        formula = FORMULAS[code]
+        columns = [arrays[name] for name in FIELDS[code]]
+        distance, speed, calories = (result[name] for name in RESULTS)
+        for index in indexes:
+            values = formula(*(float(column[index])
+                               for column in columns))
+            distance[index], speed[index], calories[index] = values
+    return result
+
+
+def compute_batch(workout_type: str | Sequence[str],
+                  arrays: Mapping[str, Sequence[float]]) -> dict[str, Any]:
+    """Рассчитать дистанцию, скорость и калории для пакета тренировок.
+
+    `workout_type` — один код для всех строк или последовательность
+    кодов ('RUN'/'WLK'/'SWM') по строкам. `arrays` — колонки с
+    показателями датчиков; колонки, не нужные ни одному из кодов
+    пакета, можно не передавать.
+
+    Если хотя бы одну строку посчитать нельзя (например, при нулевой
+    длительности), весь пакет даёт `ArithmeticError` — как и поштучный
+    расчёт: `ZeroDivisionError` на чистом Python и `FloatingPointError`
+    для колонок NumPy.
+    """
+    size = _size(arrays)
+    codes = _codes(workout_type, size)
+    required = {name for code in set(codes) for name in FIELDS[code]}
+    missing = required - arrays.keys()
+    if missing:
+        raise KeyError(f'Не переданы колонки: {sorted(missing)}')
+    np = _numpy()
+    if np is not None and any(isinstance(column, np.ndarray)
+                              for column in arrays.values()):
+        return _compute_numpy(np, codes, arrays)
+    return _compute_python(codes, arrays)
+
+
+TRAINING_TYPES: dict[str, str] = {'RUN': Running.__name__,
+                                  'WLK': SportsWalking.__name__,
+                                  'SWM': Swimming.__name__}
+COLUMNS: tuple[str, ...] = FIELDS['SWM'] + ('height',)
+
+
+class StoredTraining:
+    """Тренировка, хранящаяся в строке `TrainingStore`.
+
+    Повторяет публичные методы `Training`, но не хранит данные сама.
+    """
+
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store: TrainingStore, index: int) -> None:
+        self.store = store
+        self.index = index
+
+    @property
+    def workout_type(self) -> str:
+        return self.store.workout_type(self.index)
+
+    def _metrics(self) -> tuple[float, float, float]:
+        return self.store.metrics(self.index)
+
+    def get_distance(self) -> float:
+        """Получить дистанцию в км."""
+        return self._metrics()[0]
+
+    def get_mean_speed(self) -> float:
+        """Получить среднюю скорость движения."""
+        return self._metrics()[1]
+
+    def get_spent_calories(self) -> float:
+        """Получить количество затраченных калорий."""
+        return self._metrics()[2]
+
+    def show_training_info(self) -> InfoMessage:
+        """Вернуть информационное сообщение о выполненной тренировке."""
+        distance, speed, calories = self._metrics()
+        return InfoMessage(TRAINING_TYPES[self.workout_type],
+                           self.store.columns['duration'][self.index],
+                           distance, speed, calories)
+
+
+class TrainingStore:
+    """Компактное хранилище тренировок в виде колонок `array`.
+
+    Каждая тренировка занимает одну строку в колонках показателей
+    (float64) и один байт под код тренировки, без отдельного объекта
+    и словаря атрибутов на запись.
+    """
+
+    CODES: tuple[str, ...] = tuple(FORMULAS)
+
+    def __init__(self) -> None:
+        self.codes = array('B')
+        self.columns: dict[str, array] = {name: array('d')
+                                          for name in COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> StoredTraining:
+        if not -len(self) <= index < len(self):
+            raise IndexError('Номер тренировки вне хранилища')
+        return StoredTraining(self, index % len(self))
+
+    def __iter__(self) -> Iterator[StoredTraining]:
+        return (StoredTraining(self, index) for index in range(len(self)))
+
+    def append(self, workout_type: str, data: Sequence[float]) -> None:
+        """Добавить пакет от блока датчиков."""
+        if workout_type not in FORMULAS:
+            raise KeyError('Код тренировки не существует')
+        fields = FIELDS[workout_type]
+        if len(data) != len(fields):
+            raise ValueError(f'Для {workout_type} нужно {len(fields)} '
+                             f'показателей, получено {len(data)}')
+        values = dict(zip(fields, data))
+        for name, column in self.columns.items():
+            column.append(values.get(name, 0))
+        self.codes.append(self.CODES.index(workout_type))
+
+    def extend(self, packages: Iterable[tuple[str, Sequence[float]]]
+               ) -> None:
+        """Добавить несколько пакетов."""
+        for workout_type, data in packages:
+            self.append(workout_type, data)
+
+    def workout_type(self, index: int) -> str:
+        """Вернуть код тренировки в строке `index`."""
+        return self.CODES[self.codes[index]]
+
+    def metrics(self, index: int) -> tuple[float, float, float]:
+        """Рассчитать дистанцию, скорость и калории строки `index`."""
+        code = self.workout_type(index)
+        return FORMULAS[code](*(self.columns[name][index]
+                                for name in FIELDS[code]))
+
+    def compute(self) -> dict[str, Any]:
+        """Рассчитать показатели всех тренировок пакетно."""
+        return compute_batch([self.CODES[code] for code in self.codes],
+                             self.columns)
+
+    def nbytes(self) -> int:
+        """Объём памяти под данные тренировок в байтах."""
+        return (self.codes.itemsize * len(self.codes)
+                + sum(column.itemsize * len(column)
+                      for column in self.columns.values()))
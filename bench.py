@@ -0,0 +1,989 @@
+"""Замеры производительности модуля фитнес-трекера.
+
+Запуск: `python bench.py <замер> [параметры]`.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import bisect
+import io
+import json
+import math
+import os
+import pickle
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from itertools import cycle, islice
+from typing import Callable, Iterator
+
+import packets
+from backfill import Backfill
+from batch import TrainingStore, compute_batch
+from cache import PackageCache
+from columnar import ColumnarReader, ColumnarWriter
+from daemon import DaemonClient
+from history import WorkoutStore
+from homework import (KERNELS, MESSAGE_FIELDS, TRAININGS, InfoMessage,
+                      Running, SportsWalking, Swimming, Training,
+                      compute_rows, read_package, write_messages)
+from ingest import Ingestor
+from lookup import CalorieTable, walking_rate
+from parallel import process_packets_parallel
+from server import PacketClient, PacketServer
+from sink import MessageSink
+from sketches import QUANTILES, WorkoutStats
+from validation import validate_packets
+
+
+def synthetic_packets(count: int, seed: int = 0
+                      ) -> Iterator[tuple[str, list[float]]]:
+    """Сгенерировать `count` случайных пакетов всех видов тренировок."""
+    rnd = random.Random(seed)
+    for _ in range(count):
+        workout_type = rnd.choice(('SWM', 'RUN', 'WLK'))
+        action = rnd.randint(100, 30000)
+        duration = round(rnd.uniform(0.25, 3), 3)
+        weight = rnd.randint(40, 120)
+        if workout_type == 'RUN':
+            yield workout_type, [action, duration, weight]
+        elif workout_type == 'WLK':
+            yield workout_type, [action, duration, weight,
+                                 rnd.randint(140, 210)]
+        else:
+            yield workout_type, [action, duration, weight,
+                                 rnd.choice((25, 50)), rnd.randint(1, 80)]
+
+
+def write_dump(path: str, count: int, fmt: str) -> None:
+    """Записать файл с синтетическими пакетами в заданном формате."""
+    if fmt == 'bin':
+        with open(path, 'wb') as stream:
+            packets.write_binary(synthetic_packets(count), stream)
+        return
+    with open(path, 'w', encoding='utf-8') as stream:
+        for workout_type, data in synthetic_packets(count):
+            if fmt == 'csv':
+                stream.write(','.join([workout_type, *map(str, data)]))
+            else:
+                stream.write(f'["{workout_type}", {data}]')
+            stream.write('\n')
+
+
+def bench_stream(sizes: list[int], fmt: str) -> None:
+    """Пиковая память и скорость потоковой обработки файла пакетов."""
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            path = os.path.join(directory, f'packets.{fmt}')
+            write_dump(path, size, fmt)
+            with open(os.devnull, 'w', encoding='utf-8') as output:
+                tracemalloc.start()
+                started = time.perf_counter()
+                for workout_type, data in packets.read_file(path, fmt):
+                    info = read_package(workout_type, data)
+                    output.write(info.show_training_info().get_message())
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            print(f'{fmt:>5} {size:>10} пакетов: {elapsed:8.3f} с, '
+                  f'пик памяти {peak / 1024:8.1f} КиБ')
+
+
+def bench_parse(count: int) -> None:
+    """Скорость разбора файла пакетов в разных форматах."""
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in packets.FORMATS:
+            path = os.path.join(directory, f'packets.{fmt}')
+            if fmt == 'fixed':
+                with open(path, 'wb') as stream:
+                    packets.write_fixed(synthetic_packets(count), stream)
+            else:
+                write_dump(path, count, fmt)
+            started = time.perf_counter()
+            for _ in packets.read_file(path, fmt):
+                pass
+            rate = count / (time.perf_counter() - started)
+            print(f'{fmt:>20}: {rate:12,.0f} пакетов/с')
+        started = time.perf_counter()
+        with packets.FixedPacketFile(path) as fixed:
+            codes, columns = fixed.columns()
+            compute_batch(codes, columns)
+        rate = count / (time.perf_counter() - started)
+        print(f'{"fixed + compute_batch":>20}: {rate:12,.0f} пакетов/с')
+
+
+def bench_memory(count: int) -> None:
+    """Память под `count` тренировок: объекты `Training` и хранилище."""
+    source = list(synthetic_packets(count))
+    tracemalloc.start()
+    # Показатели разбираются заново, как при чтении пакетов из файла,
+    # чтобы объекты владели своими числами.
+    trainings = [read_package(workout_type, [float(x) for x in data])
+                 for workout_type, data in source]
+    objects, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del trainings
+    tracemalloc.start()
+    store = TrainingStore()
+    store.extend(source)
+    columns, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'Training: {objects / count:7.1f} байт на запись')
+    print(f'TrainingStore: {columns / count:7.1f} байт на запись '
+          f'({store.nbytes() / count:.1f} байт данных)')
+    print(f'Выигрыш: {objects / columns:.1f}x')
+
+
+def bench_format(count: int) -> None:
+    """Скорость форматирования сообщений: словарь, `get_message`, пачкой."""
+    infos = [read_package(workout_type, data).show_training_info()
+             for workout_type, data in synthetic_packets(count)]
+
+    def with_dict() -> None:
+        stream = io.StringIO()
+        for info in infos:
+            values = {name: getattr(info, name) for name in MESSAGE_FIELDS}
+            stream.write(info.message.format(**values) + '\n')
+
+    def with_get_message() -> None:
+        stream = io.StringIO()
+        for info in infos:
+            stream.write(info.get_message() + '\n')
+
+    def with_write_messages() -> None:
+        write_messages(infos, io.StringIO())
+
+    def with_tuples() -> None:
+        write_messages(((info.training_type, info.duration, info.distance,
+                         info.speed, info.calories) for info in infos),
+                       io.StringIO())
+
+    for name, func in (('dict + format', with_dict),
+                       ('get_message', with_get_message),
+                       ('write_messages', with_write_messages),
+                       ('write_messages (кортежи)', with_tuples)):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        print(f'{name:>26}: {count / elapsed:12,.0f} сообщений/с')
+
+
+def bench_parallel(count: int, workers: list[int], chunk_size: int) -> None:
+    """Пропускная способность `process_packets_parallel` по числу процессов."""
+    source = list(synthetic_packets(count))
+    baseline = None
+    for worker_count in workers:
+        started = time.perf_counter()
+        for _ in process_packets_parallel(source, worker_count, chunk_size):
+            pass
+        rate = count / (time.perf_counter() - started)
+        baseline = baseline or rate
+        print(f'{worker_count:>3} процессов: {rate:12,.0f} пакетов/с '
+              f'(x{rate / baseline:.2f})')
+
+
+def bench_sink(count: int, producers: list[int]) -> None:
+    """Вывод сообщений из нескольких потоков: `print` и `MessageSink`."""
+    infos = [read_package(workout_type, data).show_training_info()
+             for workout_type, data in synthetic_packets(count)]
+
+    def timed(target: Callable[[list[InfoMessage]], None], threads: int,
+              finish: Callable[[], None] = lambda: None) -> float:
+        parts = [infos[index::threads] for index in range(threads)]
+        workers = [threading.Thread(target=target, args=(part,))
+                   for part in parts]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        finish()
+        return count / (time.perf_counter() - started)
+
+    with open(os.devnull, 'w', encoding='utf-8') as output:
+        def direct(part: list[InfoMessage]) -> None:
+            for info in part:
+                print(info.get_message(), file=output)
+
+        for threads in producers:
+            printed = timed(direct, threads)
+            sink = MessageSink(output)
+            queued = timed(sink.submit_many, threads, sink.close)
+            print(f'{threads:>3} потоков: print {printed:10,.0f}, '
+                  f'MessageSink {queued:10,.0f} сообщений/с')
+
+
+def bench_lookup(points: int) -> None:
+    """Таблица калорий ходьбы: построение, загрузка, расчёт в точках."""
+    started = time.perf_counter()
+    table = CalorieTable.build('WLK', weight=(40, 120, 1),
+                               height=(140, 210, 1), speed=(0, 10, 0.05))
+    print(f'построение {len(table.values):,} узлов: '
+          f'{time.perf_counter() - started:.2f} с, '
+          f'погрешность не больше {table.max_error:.4f} ккал/ч')
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'walking.clt')
+        table.save(path)
+        started = time.perf_counter()
+        CalorieTable.load(path)
+        print(f'загрузка с диска: {time.perf_counter() - started:.3f} с')
+    rnd = random.Random(0)
+    grid = [(rnd.uniform(40, 120), rnd.uniform(140, 210),
+             rnd.uniform(0, 10)) for _ in range(points)]
+    for name, func in (
+            ('SportsWalking', lambda w, h, s: SportsWalking(
+                s * 1000 / 0.65, 1, w, h).get_spent_calories()),
+            ('формула', walking_rate),
+            ('таблица', table.rate)):
+        started = time.perf_counter()
+        for point in grid:
+            func(*point)
+        elapsed = time.perf_counter() - started
+        print(f'{name:>14}: {elapsed / points * 1e9:8.0f} нс/точку')
+
+
+BROKEN_PACKETS: tuple[tuple[object, object], ...] = (
+    ('XXX', [1, 1, 1]),
+    ('RUN', [15000, 1]),
+    ('RUN', [15000, 0, 75]),
+    ('WLK', [3000, 1, 75, 0]),
+    ('SWM', [720, 1, 80, 'x', 40]),
+    ('RUN', [15000, float('nan'), 75]),
+)
+
+
+def bench_validate(count: int, fraction: float) -> None:
+    """Проверка пакетов: годные отдельно, проверка набора, try/except."""
+    rnd = random.Random(1)
+    good = list(synthetic_packets(count))
+    source = [rnd.choice(BROKEN_PACKETS) if rnd.random() < fraction
+              else package for package in good]
+
+    def process(packages: list) -> int:
+        for workout_type, data in packages:
+            read_package(workout_type, data).show_training_info()
+        return len(packages)
+
+    def guarded() -> int:
+        for workout_type, data in source:
+            try:
+                read_package(workout_type, data).show_training_info()
+            except (KeyError, TypeError, ValueError, ZeroDivisionError):
+                pass
+        return len(source)
+
+    result = validate_packets(source)
+    valid = result.valid
+    print(f'пакетов {count:,}, отклонено {len(result.rejected):,}')
+    for name, func in (
+            ('только годные', lambda: process(valid)),
+            ('проверка', lambda: len(validate_packets(source).mask)),
+            ('проверка+расчёт',
+             lambda: process(validate_packets(source).valid)),
+            ('try/except', guarded)):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        print(f'{name:>16}: {elapsed:.3f} с, '
+              f'{count / elapsed:12,.0f} пакетов/с')
+
+
+class CountedFloat(float):
+    """Число, которое считает арифметические операции с собой."""
+    operations = 0
+
+    @classmethod
+    def _count(cls, result: float) -> CountedFloat:
+        cls.operations += 1
+        return cls(result)
+
+    def __add__(self, other: float) -> CountedFloat:
+        return CountedFloat._count(float(self) + other)
+
+    def __radd__(self, other: float) -> CountedFloat:
+        return CountedFloat._count(other + float(self))
+
+    def __mul__(self, other: float) -> CountedFloat:
+        return CountedFloat._count(float(self) * other)
+
+    def __rmul__(self, other: float) -> CountedFloat:
+        return CountedFloat._count(other * float(self))
+
+    def __truediv__(self, other: float) -> CountedFloat:
+        return CountedFloat._count(float(self) / other)
+
+    def __rtruediv__(self, other: float) -> CountedFloat:
+        return CountedFloat._count(other / float(self))
+
+    def __pow__(self, other: float) -> CountedFloat:
+        return CountedFloat._count(float(self) ** other)
+
+
+def uncached(training: Training) -> Training:
+    """Отключить запоминание показателей у объекта тренировки."""
+    training._inputs = lambda self: object()  # type: ignore[misc]
+    return training
+
+
+def bench_metrics(count: int) -> None:
+    """Запоминание показателей: операции и время `show_training_info`."""
+    pool = list(synthetic_packets(count))
+    for code, training_class in TRAININGS.items():
+        data = next(data for workout_type, data in pool
+                    if workout_type == code)
+        counts = []
+        for prepare in (uncached, lambda training: training):
+            training = prepare(training_class(*map(CountedFloat, data)))
+            CountedFloat.operations = 0
+            training.show_training_info()
+            counts.append(CountedFloat.operations)
+        print(f'{training_class.__name__:>14}: операций на сообщение '
+              f'{counts[0]} без запоминания, {counts[1]} с запоминанием')
+    trainings = [read_package(*packet) for packet in pool]
+    for name in ('первый вызов', 'повторный вызов'):
+        started = time.perf_counter()
+        for training in trainings:
+            training.show_training_info()
+        elapsed = time.perf_counter() - started
+        print(f'{name:>16}: {elapsed / count * 1e9:6.0f} нс/сообщение')
+
+
+def bench_kernels(count: int) -> None:
+    """Ядра формул: время на вызов против методов классов."""
+    pool = list(synthetic_packets(count))
+    print(f'{"":>14}  {"методы":>8} {"ядро":>8} {"ядро":>8} '
+          f'{"compute_rows":>12}')
+    for code, training_class in TRAININGS.items():
+        rows = [data for workout_type, data in pool if workout_type == code]
+        kernel = training_class.__dict__['_kernel']
+        timings = []
+        try:
+            for enabled in (None, kernel):
+                training_class._kernel = enabled
+                trainings = [training_class(*row) for row in rows]
+                started = time.perf_counter()
+                for training in trainings:
+                    training.get_spent_calories()
+                timings.append(time.perf_counter() - started)
+        finally:
+            training_class._kernel = kernel
+        flat = KERNELS[code]
+        started = time.perf_counter()
+        for row in rows:
+            flat(*row)
+        timings.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        for _ in compute_rows(code, rows):
+            pass
+        timings.append(time.perf_counter() - started)
+        per_call = ' '.join(f'{elapsed / len(rows) * 1e9:8.0f}'
+                            for elapsed in timings)
+        print(f'{training_class.__name__:>14}: {per_call} нс/вызов, '
+              f'ускорение {timings[0] / timings[1]:.1f}x')
+    print('методы и ядро — первый `get_spent_calories` у нового объекта; '
+          'затем ядро напрямую и `compute_rows`')
+
+
+def bench_backfill(count: int, chunk_size: int,
+                   intervals: list[int]) -> None:
+    """Цена контрольных точек обработки дампа в зависимости от частоты."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'dump.csv')
+        write_dump(path, count, 'csv')
+        for every in intervals:
+            elapsed = saving = math.inf
+            for _ in range(3):
+                checkpoint = os.path.join(directory, 'state.json')
+                if os.path.exists(checkpoint):
+                    os.remove(checkpoint)
+                runner = Backfill([path], checkpoint,
+                                  os.path.join(directory, 'results.txt'),
+                                  chunk_size=min(chunk_size, every),
+                                  every=every)
+                started = time.perf_counter()
+                runner.run()
+                elapsed = min(elapsed, time.perf_counter() - started)
+                saving = min(saving, runner.checkpoint_time)
+            print(f'точка каждые {every:>9,} пакетов: {elapsed:.2f} с, '
+                  f'{count / elapsed:,.0f} пакетов/с, точек '
+                  f'{runner.checkpoints:,}, на них {saving:.3f} с '
+                  f'({saving / (elapsed - saving):.1%}), '
+                  f'{saving / runner.checkpoints * 1e3:.2f} мс на точку')
+
+
+def bench_columnar(count: int, row_group_size: int) -> None:
+    """Колоночный файл против текста: время, размер и пиковая память."""
+    pool = [read_package(*packet).show_training_info()
+            for packet in synthetic_packets(10_000)]
+    with tempfile.TemporaryDirectory() as directory:
+        text = os.path.join(directory, 'results.txt')
+        table = os.path.join(directory, 'results.tcol')
+
+        def write_text() -> None:
+            with open(text, 'w', encoding='utf-8') as stream:
+                write_messages(islice(cycle(pool), count), stream)
+
+        def write_table() -> None:
+            with ColumnarWriter(table, row_group_size) as writer:
+                writer.extend(islice(cycle(pool), count))
+
+        def read_table() -> None:
+            with ColumnarReader(table) as reader:
+                for _ in reader.iter_row_groups():
+                    pass
+
+        for name, func, path in (('текст', write_text, text),
+                                 ('колонки', write_table, table),
+                                 ('чтение колонок', read_table, table)):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            tracemalloc.start()
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f'{name:>15}: {elapsed:7.2f} с, '
+                  f'{count / elapsed:12,.0f} строк/с, '
+                  f'файл {os.path.getsize(path) / 2**20:8.1f} МиБ, '
+                  f'пик памяти {peak / 2**20:6.1f} МиБ')
+
+
+def bench_startup(runs: int) -> None:
+    """Время запуска команды целиком: пустой Python, `cli`, `homework`."""
+    packet = ['RUN', '15000', '1', '75']
+    commands = (('python -c pass', ['-c', 'pass']),
+                ('python cli.py', ['cli.py', *packet]),
+                ('python -m cli', ['-m', 'cli', *packet]),
+                ('python homework.py', ['homework.py']))
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    with tempfile.TemporaryDirectory() as cache:
+        for name, args in commands:
+            command = [sys.executable, '-X', f'pycache_prefix={cache}',
+                       *args]
+            subprocess.run(command, cwd=root, env=env, check=True,
+                           stdout=subprocess.DEVNULL)
+            best = float('inf')
+            for _ in range(runs):
+                started = time.perf_counter()
+                subprocess.run(command, cwd=root, env=env, check=True,
+                               stdout=subprocess.DEVNULL)
+                best = min(best, time.perf_counter() - started)
+            print(f'{name:>20}: {best * 1000:7.1f} мс')
+
+
+def bench_daemon(count: int, runs: int) -> None:
+    """Задержка на пакет: новый процесс против клиента демона."""
+    packet = ['RUN', '15000', '1', '75']
+    line = ','.join(packet)
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'fitness.sock')
+        env['FITNESS_SOCKET'] = path
+        prefix = [sys.executable, '-X', f'pycache_prefix={directory}']
+        daemon = subprocess.Popen([*prefix, 'daemon.py', 'serve'],
+                                  cwd=root, env=env,
+                                  stdout=subprocess.PIPE)
+        try:
+            # Ждём строку о готовности: файл сокета есть уже до listen().
+            if not daemon.stdout.readline():  # type: ignore[union-attr]
+                raise RuntimeError('Демон не запустился')
+            for name, command, stdin in (
+                    ('python homework.py -', ['homework.py', '-f', 'csv',
+                                              '-'], line),
+                    ('python cli.py', ['cli.py', *packet], None),
+                    ('python daemon.py', ['daemon.py', *packet], None)):
+                best = float('inf')
+                for _ in range(runs + 1):
+                    started = time.perf_counter()
+                    subprocess.run([*prefix, *command], cwd=root, env=env,
+                                   input=stdin, text=True, check=True,
+                                   stdout=subprocess.DEVNULL)
+                    best = min(best, time.perf_counter() - started)
+                print(f'{name:>26}: {best * 1e6:10.0f} мкс/пакет')
+            lines = [','.join([workout_type, *map(str, data)])
+                     for workout_type, data in synthetic_packets(count)]
+            with DaemonClient(path) as client:
+                started = time.perf_counter()
+                for request in lines:
+                    client.request([request])
+                single = (time.perf_counter() - started) / count
+                started = time.perf_counter()
+                client.request(lines)
+                batched = (time.perf_counter() - started) / count
+            print(f'{"клиент, пакет за запросом":>26}: '
+                  f'{single * 1e6:10.0f} мкс/пакет')
+            print(f'{"клиент, пачки по 100":>26}: '
+                  f'{batched * 1e6:10.0f} мкс/пакет')
+        finally:
+            daemon.terminate()
+            daemon.wait()
+            daemon.stdout.close()  # type: ignore[union-attr]
+
+
+def bench_history(count: int, users: int, queries: int) -> None:
+    """История тренировок: скорость вставки и задержка выборок."""
+    rnd = random.Random(2)
+    pool = [read_package(*packet).show_training_info()
+            for packet in synthetic_packets(10_000)]
+    year = 365 * 86400
+    start = 1_704_067_200
+    names = [f'user{index}' for index in range(users)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'history.db')
+        with WorkoutStore(path, batch_size=50_000) as store:
+            started = time.perf_counter()
+            store.extend((rnd.choice(names), info,
+                          start + rnd.randrange(year))
+                         for info in islice(cycle(pool), count))
+            store.flush()
+            elapsed = time.perf_counter() - started
+            print(f'вставка {count:,} строк: {elapsed:.1f} с, '
+                  f'{count / elapsed:,.0f} строк/с, файл '
+                  f'{os.path.getsize(path) / 2**20:,.0f} МиБ')
+            store.connection.execute('ANALYZE')
+            month = 30 * 86400
+            for name, func in (
+                    ('заплывы > 2 км за месяц', lambda at: sum(
+                        1 for _ in store.query('Swimming', start=at,
+                                               end=at + month,
+                                               min_distance=2))),
+                    ('тренировки пользователя за месяц', lambda at: sum(
+                        1 for _ in store.query(None,
+                                               user=rnd.choice(names),
+                                               start=at, end=at + month))),
+                    ('10 самых длинных забегов', lambda at: len(
+                        store.top(10, 'distance', 'Running'))),
+                    ('10 самых длинных за месяц', lambda at: len(
+                        store.top(10, 'distance', start=at,
+                                  end=at + month)))):
+                latencies = []
+                rows = 0
+                for _ in range(queries):
+                    at = start + rnd.randrange(year - month)
+                    began = time.perf_counter()
+                    rows += func(at)
+                    latencies.append(time.perf_counter() - began)
+                latencies.sort()
+                p50 = percentile(latencies, 0.5) * 1e3
+                p99 = percentile(latencies, 0.99) * 1e3
+                print(f'{name:>33}: p50 {p50:8.2f} мс, p99 {p99:8.2f} мс, '
+                      f'строк в среднем {rows / queries:,.0f}')
+
+
+def bench_sketches(count: int) -> None:
+    """Квантили по сводкам: стоимость учёта, размер и точность."""
+    infos = [read_package(*packet).show_training_info()
+             for packet in synthetic_packets(count)]
+    stats = WorkoutStats()
+    started = time.perf_counter()
+    stats.extend(infos)
+    elapsed = time.perf_counter() - started
+    print(f'учёт в сводках: {elapsed / count * 1e6:.2f} мкс/тренировка, '
+          f'размер {len(pickle.dumps(stats)) / 1024:,.0f} КиБ')
+    started = time.perf_counter()
+    exact = {(info.training_type, metric): [] for info in infos[:100]
+             for metric in stats.metrics}
+    for info in infos:
+        for metric in stats.metrics:
+            exact[info.training_type, metric].append(getattr(info, metric))
+    for values in exact.values():
+        values.sort()
+    elapsed = time.perf_counter() - started
+    print(f'точно, с сортировкой: {elapsed / count * 1e6:.2f} '
+          f'мкс/тренировка, все значения в памяти')
+    for (training_type, metric), values in sorted(exact.items()):
+        estimates = stats.quantiles(metric, training_type)
+        ranks = {q: bisect.bisect_left(values, estimate) / len(values)
+                 for q, estimate in estimates.items()}
+        errors = ', '.join(f'p{q * 100:g} {estimates[q]:10.3f} '
+                           f'({ranks[q] - q:+.4f})' for q in QUANTILES)
+        print(f'{training_type:>13} {metric:>8}: {errors}')
+
+
+def bench_ingest(count: int, duplicates: float, reorder: float,
+                 window: int) -> None:
+    """Приём с отсевом повторов и упорядочиванием: скорость и память."""
+    rnd = random.Random(3)
+    source = list(synthetic_packets(count))
+    arrivals = []
+    for packet_id, (workout_type, data) in enumerate(source):
+        delay = rnd.uniform(0, window) if rnd.random() < reorder else 0
+        arrivals.append((packet_id + delay, packet_id, workout_type, data))
+        if rnd.random() < duplicates:
+            arrivals.append((packet_id + rnd.expovariate(1e-5), packet_id,
+                             workout_type, data))
+    arrivals.sort(key=lambda arrival: arrival[0])
+    stream = [arrival[1:] for arrival in arrivals]
+    print(f'{count:,} пакетов, повторов {len(stream) - count:,}, '
+          f'переставлено ~{reorder:.0%} в окне {window}')
+    started = time.perf_counter()
+    for workout_type, data in source:
+        read_package(workout_type, data).show_training_info()
+    compute = (time.perf_counter() - started) / count
+    print(f'{"расчёт read_package":>22}: {compute * 1e6:6.2f} мкс/пакет')
+    for name, size in (('только повторы', 0), ('повторы и порядок', window)):
+        ingestor = Ingestor(window=size)
+        started = time.perf_counter()
+        forwarded = sum(1 for _ in ingestor.ingest(stream))
+        elapsed = (time.perf_counter() - started) / len(stream)
+        stats = ingestor.stats
+        print(f'{name:>22}: {elapsed * 1e6:6.2f} мкс/пакет, выдано '
+              f'{forwarded:,}, отсеяно {stats.duplicates:,}, '
+              f'потеряно {count - forwarded}, опоздали {stats.late}')
+    tracemalloc.start()
+    ingestor = Ingestor(window=window)
+    for _ in ingestor.ingest(stream):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f'{"пиковая память":>22}: {peak / 2**20:.1f} МиБ')
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Перцентиль отсортированного списка значений."""
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def load_server(count: int, clients: int) -> list[float]:
+    """Отправить `count` пакетов с `clients` соединений, вернуть задержки."""
+    server = PacketServer(max_connections=clients)
+    await server.start_tcp()
+    source = list(synthetic_packets(count))
+    latencies: list[float] = []
+
+    async def client_loop(part: list[tuple[str, list[float]]]) -> None:
+        client = await PacketClient.connect(*server.address)
+        for workout_type, data in part:
+            started = time.perf_counter()
+            await client.send(workout_type, data)
+            latencies.append(time.perf_counter() - started)
+        await client.close()
+
+    await asyncio.gather(*(client_loop(source[index::clients])
+                           for index in range(clients)))
+    await server.shutdown()
+    return latencies
+
+
+def bench_server(count: int, clients: list[int]) -> None:
+    """Задержка (p50/p99) и пропускная способность сервера пакетов."""
+    for client_count in clients:
+        started = time.perf_counter()
+        latencies = sorted(asyncio.run(load_server(count, client_count)))
+        rate = count / (time.perf_counter() - started)
+        print(f'{client_count:>4} клиентов: {rate:10,.0f} пакетов/с, '
+              f'p50 {percentile(latencies, 0.5) * 1e6:8.1f} мкс, '
+              f'p99 {percentile(latencies, 0.99) * 1e6:8.1f} мкс')
+
+
+def bench_cache(count: int, unique: int, max_entries: int) -> None:
+    """Скорость обработки пакетов с повторами: без кэша и с кэшем."""
+    distinct = list(synthetic_packets(unique))
+    rnd = random.Random(1)
+    source = [rnd.choice(distinct) for _ in range(count)]
+    started = time.perf_counter()
+    for workout_type, data in source:
+        read_package(workout_type, data).show_training_info().get_message()
+    plain = count / (time.perf_counter() - started)
+    cache = PackageCache(max_entries=max_entries)
+    started = time.perf_counter()
+    for workout_type, data in source:
+        cache.get_message(workout_type, data)
+    cached = count / (time.perf_counter() - started)
+    print(f'без кэша: {plain:12,.0f} пакетов/с')
+    print(f'с кэшем:  {cached:12,.0f} пакетов/с (x{cached / plain:.2f}), '
+          f'попаданий {cache.stats.hit_rate:.1%}, '
+          f'вытеснено {cache.stats.evictions}')
+
+
+def read_package_dict(workout_type: str, data: list[float]) -> Training:
+    """Прежняя версия `read_package` со словарём внутри функции."""
+    trainings: dict[str, type[Training]] = {'SWM': Swimming,
+                                            'RUN': Running,
+                                            'WLK': SportsWalking}
+    if workout_type not in trainings:
+        raise KeyError('Код тренировки не существует')
+    return trainings[workout_type](*data)
+
+
+def bench_registry(count: int) -> None:
+    """Время `count` вызовов `read_package`: словарь в функции и реестр."""
+    source = list(synthetic_packets(1000))
+    rounds = max(1, count // len(source))
+    for name, func in (('словарь в функции', read_package_dict),
+                       ('реестр', read_package)):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for workout_type, data in source:
+                func(workout_type, data)
+        elapsed = time.perf_counter() - started
+        print(f'{name:>18}: {elapsed:7.2f} с, '
+              f'{elapsed / (rounds * len(source)) * 1e9:6.0f} нс/вызов')
+
+
+def measure(func: Callable[[], int], repeat: int) -> float:
+    """Лучшее из `repeat` время одной операции в наносекундах.
+
+    `func` выполняет операции и возвращает их число.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        ops = func()
+        best = min(best, (time.perf_counter() - started) / ops)
+    return best * 1e9
+
+
+def _construct_stage(training_class: type[Training],
+                     datas: list[list[float]],
+                     rounds: int) -> Callable[[], int]:
+    def construct() -> int:
+        for _ in range(rounds):
+            for data in datas:
+                training_class(*data)
+        return rounds * len(datas)
+    return construct
+
+
+def _method_stage(method: Callable[[Training], object],
+                  trainings: list[Training],
+                  rounds: int) -> Callable[[], int]:
+    def call() -> int:
+        for _ in range(rounds):
+            for training in trainings:
+                training._metrics = None
+                method(training)
+        return rounds * len(trainings)
+    return call
+
+
+def suite_stages(pool: list[tuple[str, list[float]]],
+                 rounds: int) -> dict[str, Callable[[], int]]:
+    """Этапы расчёта: создание объектов, методы, `read_package`.
+
+    Перед каждым вызовом метода кэш показателей объекта сбрасывается:
+    замеряется расчёт по формулам, как при первом вызове, а не выдача
+    запомненного значения.
+    """
+    stages: dict[str, Callable[[], int]] = {}
+    for code, training_class in TRAININGS.items():
+        name = training_class.__name__
+        datas = [data for workout_type, data in pool if workout_type == code]
+        trainings = [training_class(*data) for data in datas]
+        stages[f'{name}.__init__'] = _construct_stage(training_class,
+                                                      datas, rounds)
+        for method in ('get_distance', 'get_mean_speed',
+                       'get_spent_calories', 'show_training_info'):
+            stages[f'{name}.{method}'] = _method_stage(
+                getattr(training_class, method), trainings, rounds)
+    infos = [read_package(*packet).show_training_info() for packet in pool]
+
+    def read() -> int:
+        for _ in range(rounds):
+            for workout_type, data in pool:
+                read_package(workout_type, data)
+        return rounds * len(pool)
+
+    def message() -> int:
+        for _ in range(rounds):
+            for info in infos:
+                info.get_message()
+        return rounds * len(infos)
+
+    stages['read_package'] = read
+    stages['InfoMessage.get_message'] = message
+    return stages
+
+
+def end_to_end(pool: list[tuple[str, list[float]]],
+               size: int) -> Callable[[], int]:
+    """Полный путь пакета до строки сообщения для `size` пакетов."""
+    def func() -> int:
+        output = io.StringIO()
+        for workout_type, data in islice(cycle(pool), size):
+            output.write(read_package(workout_type, data)
+                         .show_training_info().get_message())
+            if output.tell() > 1 << 20:
+                output.seek(0)
+                output.truncate()
+        return size
+    return func
+
+
+def run_suite(sizes: list[int], rounds: int, repeat: int,
+              pool_size: int = 3000) -> dict[str, float]:
+    """Выполнить все замеры, вернуть наносекунды на операцию."""
+    pool = list(synthetic_packets(pool_size))
+    stages = suite_stages(pool, rounds)
+    for size in sizes:
+        stages[f'end_to_end.{size}'] = end_to_end(pool, size)
+    results = {}
+    for name, func in stages.items():
+        results[name] = measure(
+            func, 1 if name.startswith('end_to_end.') else repeat)
+        print(f'{name:<36} {results[name]:10.1f} нс/оп', flush=True)
+    return results
+
+
+# Растёт, когда этапы набора начинают замерять другое; базовый замер
+# другой версии нужно записать заново.
+SUITE_VERSION: int = 2
+
+
+def compare(results: dict[str, float], baseline: dict[str, float],
+            threshold: float) -> list[str]:
+    """Этапы, ставшие медленнее базового замера больше чем на `threshold`."""
+    return [f'{name}: {baseline[name]:.1f} -> {value:.1f} нс/оп '
+            f'(+{value / baseline[name] - 1:.0%})'
+            for name, value in results.items()
+            if name in baseline and value > baseline[name] * (1 + threshold)]
+
+
+def bench_suite(args: argparse.Namespace) -> int:
+    """Все этапы расчёта; сравнение с базовым замером."""
+    results = run_suite(args.sizes, args.rounds, args.repeat)
+    report = {'suite': SUITE_VERSION, 'python': platform.python_version(),
+              'machine': platform.machine(), 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            json.dump(report, stream, indent=2)
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding='utf-8') as stream:
+        baseline = json.load(stream)
+    if baseline.get('suite', 1) != SUITE_VERSION:
+        print('Базовый замер записан другой версией набора этапов, '
+              'запишите его заново (--output)')
+        return 2
+    regressions = compare(results, baseline['results'], args.threshold)
+    for line in regressions:
+        print(f'Замедление: {line}')
+    return 1 if regressions else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest='command', required=True)
+    stream = commands.add_parser('stream', help=bench_stream.__doc__)
+    stream.add_argument('--sizes', type=int, nargs='+',
+                        default=[1_000, 10_000, 100_000])
+    stream.add_argument('--format', choices=packets.FORMATS, default='csv')
+    stream.set_defaults(run=lambda args: bench_stream(args.sizes,
+                                                      args.format))
+    parse = commands.add_parser('parse', help=bench_parse.__doc__)
+    parse.add_argument('--count', type=int, default=500_000)
+    parse.set_defaults(run=lambda args: bench_parse(args.count))
+    output = commands.add_parser('sink', help=bench_sink.__doc__)
+    output.add_argument('--count', type=int, default=200_000)
+    output.add_argument('--producers', type=int, nargs='+',
+                        default=[1, 2, 4, 8, 16])
+    output.set_defaults(run=lambda args: bench_sink(args.count,
+                                                    args.producers))
+    table = commands.add_parser('lookup', help=bench_lookup.__doc__)
+    table.add_argument('--points', type=int, default=200_000)
+    table.set_defaults(run=lambda args: bench_lookup(args.points))
+    columns = commands.add_parser('columnar', help=bench_columnar.__doc__)
+    columns.add_argument('--count', type=int, default=1_000_000)
+    columns.add_argument('--row-group-size', type=int, default=65_536)
+    columns.set_defaults(run=lambda args: bench_columnar(
+        args.count, args.row_group_size))
+    resumable = commands.add_parser('backfill', help=bench_backfill.__doc__)
+    resumable.add_argument('--count', type=int, default=500_000)
+    resumable.add_argument('--chunk-size', type=int, default=10_000)
+    resumable.add_argument('--intervals', type=int, nargs='+',
+                           default=[1_000_000, 100_000, 10_000, 1_000])
+    resumable.set_defaults(run=lambda args: bench_backfill(
+        args.count, args.chunk_size, args.intervals))
+    compiled = commands.add_parser('kernels', help=bench_kernels.__doc__)
+    compiled.add_argument('--count', type=int, default=300_000)
+    compiled.set_defaults(run=lambda args: bench_kernels(args.count))
+    received = commands.add_parser('ingest', help=bench_ingest.__doc__)
+    received.add_argument('--count', type=int, default=1_000_000)
+    received.add_argument('--duplicates', type=float, default=0.1,
+                          help='доля пакетов, присланных повторно')
+    received.add_argument('--reorder', type=float, default=0.2,
+                          help='доля пакетов, пришедших не по порядку')
+    received.add_argument('--window', type=int, default=64)
+    received.set_defaults(run=lambda args: bench_ingest(
+        args.count, args.duplicates, args.reorder, args.window))
+    summary = commands.add_parser('sketches', help=bench_sketches.__doc__)
+    summary.add_argument('--count', type=int, default=1_000_000)
+    summary.set_defaults(run=lambda args: bench_sketches(args.count))
+    stored = commands.add_parser('history', help=bench_history.__doc__)
+    stored.add_argument('--count', type=int, default=1_000_000)
+    stored.add_argument('--users', type=int, default=10_000)
+    stored.add_argument('--queries', type=int, default=50)
+    stored.set_defaults(run=lambda args: bench_history(
+        args.count, args.users, args.queries))
+    warm = commands.add_parser('daemon', help=bench_daemon.__doc__)
+    warm.add_argument('--count', type=int, default=20_000)
+    warm.add_argument('--runs', type=int, default=10)
+    warm.set_defaults(run=lambda args: bench_daemon(args.count, args.runs))
+    start = commands.add_parser('startup', help=bench_startup.__doc__)
+    start.add_argument('--runs', type=int, default=20)
+    start.set_defaults(run=lambda args: bench_startup(args.runs))
+    cached = commands.add_parser('metrics', help=bench_metrics.__doc__)
+    cached.add_argument('--count', type=int, default=200_000)
+    cached.set_defaults(run=lambda args: bench_metrics(args.count))
+    check = commands.add_parser('validate', help=bench_validate.__doc__)
+    check.add_argument('--count', type=int, default=300_000)
+    check.add_argument('--fraction', type=float, default=0.05,
+                       help='доля неверных пакетов')
+    check.set_defaults(run=lambda args: bench_validate(args.count,
+                                                       args.fraction))
+    memory = commands.add_parser('memory', help=bench_memory.__doc__)
+    memory.add_argument('--count', type=int, default=1_000_000)
+    memory.set_defaults(run=lambda args: bench_memory(args.count))
+    message = commands.add_parser('format', help=bench_format.__doc__)
+    message.add_argument('--count', type=int, default=200_000)
+    message.set_defaults(run=lambda args: bench_format(args.count))
+    scaling = commands.add_parser('parallel', help=bench_parallel.__doc__)
+    scaling.add_argument('--count', type=int, default=1_000_000)
+    scaling.add_argument('--workers', type=int, nargs='+',
+                         default=[1, 2, 4, 8])
+    scaling.add_argument('--chunk-size', type=int, default=5000)
+    scaling.set_defaults(run=lambda args: bench_parallel(
+        args.count, args.workers, args.chunk_size))
+    load = commands.add_parser('server', help=bench_server.__doc__)
+    load.add_argument('--count', type=int, default=50_000)
+    load.add_argument('--clients', type=int, nargs='+', default=[1, 10, 100])
+    load.set_defaults(run=lambda args: bench_server(args.count,
+                                                    args.clients))
+    repeats = commands.add_parser('cache', help=bench_cache.__doc__)
+    repeats.add_argument('--count', type=int, default=500_000)
+    repeats.add_argument('--unique', type=int, default=5_000)
+    repeats.add_argument('--max-entries', type=int, default=10_000)
+    repeats.set_defaults(run=lambda args: bench_cache(
+        args.count, args.unique, args.max_entries))
+    dispatch = commands.add_parser('registry', help=bench_registry.__doc__)
+    dispatch.add_argument('--count', type=int, default=10_000_000)
+    dispatch.set_defaults(run=lambda args: bench_registry(args.count))
+    suite = commands.add_parser('suite', help=bench_suite.__doc__)
+    suite.add_argument('--sizes', type=int, nargs='+',
+                       default=[1_000, 100_000, 10_000_000],
+                       help='число пакетов для сквозных замеров')
+    suite.add_argument('--rounds', type=int, default=30,
+                       help='проходов по набору пакетов в одном замере')
+    suite.add_argument('--repeat', type=int, default=5,
+                       help='повторов замера, берётся лучший')
+    suite.add_argument('--output', help='записать результаты в JSON')
+    suite.add_argument('--baseline', help='JSON с базовым замером')
+    suite.add_argument('--threshold', type=float, default=0.2,
+                       help='допустимое замедление, доля')
+    suite.set_defaults(run=bench_suite)
+    args = parser.parse_args()
+    sys.exit(args.run(args))
+
+
+if __name__ == '__main__':
+    main()
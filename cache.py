@@ -0,0 +1,132 @@
+"""Кэш результатов для повторяющихся пакетов.
+
+Устройства при повторной отправке присылают одинаковые пакеты; кэш
+возвращает для них уже рассчитанные `InfoMessage` и строку сообщения
+вместо нового расчёта. Ключ кэша — `(workout_type, tuple(data))`,
+вытеснение — по давности использования (LRU) и, при заданном `ttl`,
+по времени.
+"""
+from __future__ import annotations
+
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable, Sequence
+
+from homework import InfoMessage, read_package
+
+Key = tuple[str, tuple[Hashable, ...]]
+
+
+@dataclass
+class CacheStats:
+    """Счётчики работы кэша."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля попаданий среди всех обращений."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def entry_size(key: Key, info: InfoMessage) -> int:
+    """Оценить объём памяти под запись кэша в байтах."""
+    workout_type, data = key
+    return (sys.getsizeof(key) + sys.getsizeof(workout_type)
+            + sys.getsizeof(data) + sum(map(sys.getsizeof, data))
+            + sys.getsizeof(info) + sys.getsizeof(info.training_type)
+            + 4 * sys.getsizeof(0.0))
+
+
+class PackageCache:
+    """LRU-кэш результатов `read_package(...).show_training_info()`.
+
+    Размер ограничивается числом записей `max_entries` и (или)
+    оценкой занятой памяти `max_bytes`; записи старше `ttl` секунд
+    считаются устаревшими.
+    """
+
+    def __init__(self, max_entries: int | None = 10_000,
+                 max_bytes: int | None = None,
+                 ttl: float | None = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        if max_entries is None and max_bytes is None:
+            raise ValueError('Нужно ограничить кэш по числу записей '
+                             'или по объёму')
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        self.nbytes = 0
+        self._entries: OrderedDict[Key, tuple[InfoMessage, str,
+                                              float, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Key) -> bool:
+        return key in self._entries
+
+    def get_info(self, workout_type: str,
+                 data: Sequence[float]) -> InfoMessage:
+        """Вернуть сообщение о тренировке, рассчитав его при промахе.
+
+        Возвращаемый объект общий для всех одинаковых пакетов, его
+        нельзя изменять.
+        """
+        return self._lookup(workout_type, data)[0]
+
+    def get_message(self, workout_type: str, data: Sequence[float]) -> str:
+        """Вернуть строку сообщения о тренировке."""
+        return self._lookup(workout_type, data)[1]
+
+    def _lookup(self, workout_type: str,
+                data: Sequence[float]) -> tuple[InfoMessage, str]:
+        key = (workout_type, tuple(data))
+        entry = self._entries.get(key)
+        if entry is not None:
+            info, message, expires, _ = entry
+            if expires >= self.clock():
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return info, message
+            self._remove(key)
+            self.stats.expirations += 1
+        self.stats.misses += 1
+        info = read_package(workout_type, list(data)).show_training_info()
+        message = info.get_message()
+        self._add(key, info, message)
+        return info, message
+
+    def clear(self) -> None:
+        """Очистить кэш, не сбрасывая счётчики."""
+        self._entries.clear()
+        self.nbytes = 0
+
+    def _add(self, key: Key, info: InfoMessage, message: str) -> None:
+        size = entry_size(key, info) + sys.getsizeof(message)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        expires = (self.clock() + self.ttl if self.ttl is not None
+                   else float('inf'))
+        self._entries[key] = (info, message, expires, size)
+        self.nbytes += size
+        while self._overflow():
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def _overflow(self) -> bool:
+        return ((self.max_entries is not None
+                 and len(self._entries) > self.max_entries)
+                or (self.max_bytes is not None
+                    and self.nbytes > self.max_bytes))
+
+    def _remove(self, key: Key) -> None:
+        _, _, _, size = self._entries.pop(key)
+        self.nbytes -= size
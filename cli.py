@@ -0,0 +1,52 @@
+"""Короткая команда для разовых запусков: пакеты прямо в аргументах.
+
+    python -m cli RUN 15000 1 75 SWM 720 1 80 25 40
+
+Каждый пакет — код тренировки и следом его показатели. Команда
+загружает только `homework`, без argparse, модулей форматов и
+обработчиков, поэтому запускается почти так же быстро, как пустой
+интерпретатор. Если первый аргумент не код тренировки, аргументы
+целиком передаются полной команде `homework.run` (файлы, процессы,
+кэш, профиль).
+"""
+from __future__ import annotations
+
+import sys
+
+from daemon import split_packets
+from homework import TRAININGS, parse_number, read_package
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import TextIO
+
+
+def parse_argv(argv: list[str]) -> list[tuple[str, list[float]]]:
+    """Разбить аргументы на пакеты по кодам тренировок."""
+    return [(code, [parse_number(token) for token in values])
+            for code, *values in split_packets(argv)]
+
+
+def main(argv: list[str] | None = None,
+         stream: TextIO | None = None) -> int:
+    """Вывести сообщения о тренировках из аргументов, вернуть код выхода."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in TRAININGS:
+        import homework
+        homework.run(argv)
+        return 0
+    stream = sys.stdout if stream is None else stream
+    try:
+        lines = []
+        for workout_type, data in parse_argv(argv):
+            lines.append(read_package(workout_type, data)
+                         .show_training_info().get_message())
+    except (KeyError, TypeError, ValueError, ArithmeticError) as error:
+        print(f'Ошибка: {error}', file=sys.stderr)
+        return 2
+    stream.write('\n'.join(lines) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
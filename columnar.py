@@ -0,0 +1,353 @@
+"""Колоночный файл результатов тренировок.
+
+Вместо строк `get_message` поля `InfoMessage` (`MESSAGE_FIELDS`)
+пишутся колонками: тип тренировки — номером в словаре названий (один
+байт), остальные поля — числами double. Строки копятся в буферах
+колонок и сбрасываются на диск группами по `row_group_size`, поэтому
+память не растёт с числом строк.
+
+Устройство файла:
+
+    MAGIC
+    группа строк 0: колонка 0, колонка 1, ...
+    группа строк 1: ...
+    оглавление — JSON: колонки, словарь названий, смещения групп
+    длина оглавления (uint32) и MAGIC
+
+Числа записываются в порядке little-endian. Оглавление в конце
+позволяет читать отдельные группы, не просматривая весь файл.
+"""
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from array import array
+from itertools import islice
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator, Mapping, Sequence
+
+from homework import MESSAGE_FIELDS, InfoMessage
+
+MAGIC: bytes = b'TCL1'
+EXTENSION: str = '.tcol'
+FOOTER_SIZE = struct.Struct('<I')
+TYPE_CODE = 'B'
+NUMBER_FIELDS: tuple[str, ...] = MESSAGE_FIELDS[1:]
+SCHEMA: tuple[tuple[str, str], ...] = (
+    (MESSAGE_FIELDS[0], 'dictionary<uint8, string>'),
+    *((name, 'float64') for name in NUMBER_FIELDS),
+)
+
+
+def _to_bytes(column: array) -> bytes:
+    if sys.byteorder == 'big' and column.itemsize > 1:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _check_width(row: Sequence[Any]) -> None:
+    if len(row) != len(MESSAGE_FIELDS):
+        raise ValueError(f'Нужно {len(MESSAGE_FIELDS)} полей '
+                         f'{MESSAGE_FIELDS}, получено {len(row)}')
+
+
+def _from_bytes(typecode: str, data: bytes) -> array:
+    column = array(typecode, data)
+    if sys.byteorder == 'big' and column.itemsize > 1:
+        column.byteswap()
+    return column
+
+
+class ColumnarWriter:
+    """Запись результатов тренировок в колоночный файл группами строк.
+
+    Оглавление пишется только при закрытии без ошибки: если блок `with`
+    прерван исключением, файл остаётся без оглавления, и
+    `ColumnarReader` не примет его за целый.
+    """
+
+    def __init__(self, destination: str | Path | BinaryIO,
+                 row_group_size: int = 65_536) -> None:
+        if row_group_size < 1:
+            raise ValueError('row_group_size должен быть положительным')
+        if isinstance(destination, (str, Path)):
+            self.stream: BinaryIO = open(destination, 'wb')
+            self._owns_stream = True
+        else:
+            self.stream = destination
+            self._owns_stream = False
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self.dictionary: list[str] = []
+        self._codes: dict[str, int] = {}
+        self._row_groups: list[dict[str, Any]] = []
+        self._types = array(TYPE_CODE)
+        self._numbers = [array('d') for _ in NUMBER_FIELDS]
+        self._closed = False
+        self.stream.write(MAGIC)
+        self._offset = len(MAGIC)
+
+    def _code(self, training_type: str) -> int:
+        code = self._codes.get(training_type)
+        if code is None:
+            if len(self.dictionary) > 0xFF:
+                raise ValueError('Слишком много типов тренировок')
+            code = self._codes[training_type] = len(self.dictionary)
+            self.dictionary.append(training_type)
+        return code
+
+    def append(self, message: InfoMessage | Sequence[Any]) -> None:
+        """Добавить результат: `InfoMessage` или кортеж его полей."""
+        if isinstance(message, InfoMessage):
+            message = (message.training_type, message.duration,
+                       message.distance, message.speed, message.calories)
+        else:
+            _check_width(message)
+        training_type, *numbers = message
+        size = len(self._types)
+        try:
+            self._types.append(self._code(training_type))
+            for column, value in zip(self._numbers, numbers):
+                column.append(value)
+        except BaseException:
+            self._truncate(size)
+            raise
+        if len(self._types) >= self.row_group_size:
+            self.flush()
+
+    def extend(self, messages: Iterable[InfoMessage | Sequence[Any]]
+               ) -> int:
+        """Добавить несколько результатов, вернуть их количество.
+
+        Результаты раскладываются по колонкам кусками до заполнения
+        группы строк, а не по одному.
+        """
+        iterator = iter(messages)
+        count = 0
+        while True:
+            chunk = list(islice(iterator,
+                                self.row_group_size - len(self._types)))
+            if not chunk:
+                return count
+            rows = [(message.training_type, message.duration,
+                     message.distance, message.speed, message.calories)
+                    if isinstance(message, InfoMessage) else message
+                    for message in chunk]
+            if set(map(len, rows)) != {len(MESSAGE_FIELDS)}:
+                for row in rows:
+                    _check_width(row)
+            types, *numbers = zip(*rows)
+            size = len(self._types)
+            try:
+                self._append_types(types)
+                for buffer, column in zip(self._numbers, numbers):
+                    buffer.extend(column)
+            except BaseException:
+                self._truncate(size)
+                raise
+            count += len(chunk)
+            if len(self._types) >= self.row_group_size:
+                self.flush()
+
+    def _truncate(self, size: int) -> None:
+        """Откатить колонки к `size` строкам, если добавление не удалось.
+
+        Иначе колонки разойдутся по длине и строки в файле смешаются.
+        """
+        del self._types[size:]
+        for buffer in self._numbers:
+            del buffer[size:]
+
+    def _append_types(self, types: Sequence[str]) -> None:
+        for training_type in dict.fromkeys(types):
+            self._code(training_type)
+        self._types.extend(map(self._codes.__getitem__, types))
+
+    def append_columns(self, columns: Mapping[str, Any]) -> None:
+        """Добавить результаты колонками `MESSAGE_FIELDS`.
+
+        Числовые колонки могут быть списками, `array('d')` или
+        массивами NumPy — например, результатом `batch.compute_batch`.
+        """
+        types = columns[MESSAGE_FIELDS[0]]
+        numbers = [columns[name] for name in NUMBER_FIELDS]
+        if any(len(column) != len(types) for column in numbers):
+            raise ValueError('Колонки разной длины')
+        start = 0
+        while start < len(types):
+            stop = start + self.row_group_size - len(self._types)
+            size = len(self._types)
+            try:
+                self._append_types(types[start:stop])
+                for buffer, column in zip(self._numbers, numbers):
+                    part = column[start:stop]
+                    if hasattr(part, 'astype'):
+                        buffer.frombytes(part.astype('=f8').tobytes())
+                    else:
+                        buffer.extend(part)
+            except BaseException:
+                self._truncate(size)
+                raise
+            start = stop
+            if len(self._types) >= self.row_group_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """Записать накопленные строки отдельной группой."""
+        if not self._types:
+            return
+        offsets = []
+        for column in (self._types, *self._numbers):
+            data = _to_bytes(column)
+            self.stream.write(data)
+            offsets.append([self._offset, len(data)])
+            self._offset += len(data)
+        self._row_groups.append({'rows': len(self._types),
+                                 'columns': offsets})
+        self.rows += len(self._types)
+        self._types = array(TYPE_CODE)
+        self._numbers = [array('d') for _ in NUMBER_FIELDS]
+
+    def close(self) -> None:
+        """Дописать последнюю группу и оглавление."""
+        if self._closed:
+            return
+        self._closed = True
+        self.flush()
+        footer = json.dumps({
+            'columns': [list(column) for column in SCHEMA],
+            'dictionary': self.dictionary,
+            'rows': self.rows,
+            'row_groups': self._row_groups,
+        }).encode('utf-8')
+        self.stream.write(footer + FOOTER_SIZE.pack(len(footer)) + MAGIC)
+        if self._owns_stream:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+    def abort(self) -> None:
+        """Закрыть файл без оглавления: он останется недописанным."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._owns_stream:
+            self.stream.close()
+
+    def __enter__(self) -> ColumnarWriter:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None,
+                 *args: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ColumnarReader:
+    """Чтение колоночного файла, записанного `ColumnarWriter`."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.stream = open(path, 'rb')
+        try:
+            tail = len(MAGIC) + FOOTER_SIZE.size
+            if self.stream.read(len(MAGIC)) != MAGIC:
+                raise ValueError('Файл не является колоночным файлом')
+            size = self.stream.seek(0, 2)
+            if size < len(MAGIC) + tail:
+                raise ValueError('Колоночный файл обрезан')
+            self.stream.seek(size - tail)
+            ending = self.stream.read(tail)
+            if ending[FOOTER_SIZE.size:] != MAGIC:
+                raise ValueError('Колоночный файл обрезан')
+            footer_size, = FOOTER_SIZE.unpack(ending[:FOOTER_SIZE.size])
+            self.stream.seek(size - tail - footer_size)
+            footer = json.loads(self.stream.read(footer_size))
+        except BaseException:
+            self.stream.close()
+            raise
+        self.schema = tuple(tuple(column) for column in footer['columns'])
+        self.dictionary: list[str] = footer['dictionary']
+        self.rows: int = footer['rows']
+        self.row_groups: list[dict[str, Any]] = footer['row_groups']
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _read(self, offset: int, length: int) -> bytes:
+        self.stream.seek(offset)
+        return self.stream.read(length)
+
+    def read_row_group(self, index: int) -> dict[str, Any]:
+        """Колонки одной группы строк.
+
+        Тип тренировки — номера в `dictionary` (`array('B')`), числа —
+        `array('d')`.
+        """
+        group = self.row_groups[index]
+        types, *numbers = group['columns']
+        columns: dict[str, Any] = {
+            MESSAGE_FIELDS[0]: _from_bytes(TYPE_CODE, self._read(*types))}
+        for name, location in zip(NUMBER_FIELDS, numbers):
+            columns[name] = _from_bytes('d', self._read(*location))
+        return columns
+
+    def iter_row_groups(self) -> Iterator[dict[str, Any]]:
+        """Колонки всех групп строк по очереди."""
+        for index in range(len(self.row_groups)):
+            yield self.read_row_group(index)
+
+    def iter_rows(self) -> Iterator[tuple[Any, ...]]:
+        """Строки как кортежи значений `MESSAGE_FIELDS`.
+
+        Кортежи можно сразу передавать в `homework.write_messages`.
+        """
+        dictionary = self.dictionary
+        for columns in self.iter_row_groups():
+            types = [dictionary[code] for code in columns[MESSAGE_FIELDS[0]]]
+            yield from zip(types, *(columns[name] for name in NUMBER_FIELDS))
+
+    def read_numpy(self, index: int) -> dict[str, Any]:
+        """Колонки группы строк как массивы NumPy без копирования."""
+        import numpy
+        group = self.row_groups[index]
+        dtypes = ('u1', *('<f8' for _ in NUMBER_FIELDS))
+        return {name: numpy.frombuffer(self._read(*location), dtype=dtype)
+                for name, dtype, location
+                in zip(MESSAGE_FIELDS, dtypes, group['columns'])}
+
+    def to_arrow(self) -> Any:
+        """Таблица `pyarrow.Table`; тип тренировки — словарная колонка."""
+        import pyarrow
+        dictionary = pyarrow.array(self.dictionary, pyarrow.string())
+        batches = []
+        for columns in self.iter_row_groups():
+            arrays = [pyarrow.DictionaryArray.from_arrays(
+                pyarrow.array(columns[MESSAGE_FIELDS[0]], pyarrow.uint8()),
+                dictionary)]
+            arrays.extend(pyarrow.array(columns[name], pyarrow.float64())
+                          for name in NUMBER_FIELDS)
+            batches.append(pyarrow.RecordBatch.from_arrays(
+                arrays, names=list(MESSAGE_FIELDS)))
+        if not batches:
+            return pyarrow.table({name: [] for name in MESSAGE_FIELDS})
+        return pyarrow.Table.from_batches(batches)
+
+    def close(self) -> None:
+        self.stream.close()
+
+    def __enter__(self) -> ColumnarReader:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def write_parquet(source: str | Path, destination: str | Path) -> None:
+    """Переписать колоночный файл в Parquet (нужен pyarrow)."""
+    import pyarrow.parquet
+    with ColumnarReader(source) as reader:
+        pyarrow.parquet.write_table(reader.to_arrow(), str(destination))
@@ -0,0 +1,208 @@
+"""Постоянно работающий обработчик пакетов на Unix-сокете.
+
+Запуск процесса Python на каждый пакет дороже самого расчёта. Демон
+один раз загружает классы тренировок и отвечает на пакеты через
+Unix-сокет (`server.PacketServer`), а клиент — лёгкий: он не
+импортирует ни asyncio, ни `homework`, только открывает сокет.
+
+    python daemon.py serve [--socket ПУТЬ]
+    python daemon.py RUN 15000 1 75 SWM 720 1 80 25 40
+
+Клиент отправляет пакеты по `BATCH_SIZE` в строке и не ждёт ответа
+на каждую строку перед отправкой следующей.
+"""
+from __future__ import annotations
+
+import os
+import sys
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Iterable, Sequence
+
+# Совпадают с `server.ERROR_PREFIX`, `server.BATCH_SEPARATOR` и
+# `server.MAX_LINE`; клиент
+# не импортирует `server`, чтобы не загружать asyncio.
+ERROR_PREFIX: str = 'Ошибка: '
+BATCH_SEPARATOR: str = ';'
+MAX_LINE: int = 4096
+BATCH_SIZE: int = 100
+WINDOW: int = 16
+
+
+def socket_path() -> str:
+    """Путь к сокету демона: `FITNESS_SOCKET` или каталог пользователя."""
+    path = os.environ.get('FITNESS_SOCKET')
+    if path:
+        return path
+    directory = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    return os.path.join(directory, f'fitness-{os.getuid()}.sock')
+
+
+def split_packets(argv: Sequence[str]) -> list[list[str]]:
+    """Разбить аргументы `КОД показатели КОД ...` на пакеты.
+
+    Код тренировки — слово из заглавных букв; каждый пакет — список
+    из кода и следующих за ним показателей.
+    """
+    packets: list[list[str]] = []
+    for token in argv:
+        if token.isalpha() and token.isupper():
+            packets.append([token])
+        elif not packets:
+            raise ValueError(f'Ожидался код тренировки, получено {token!r}')
+        else:
+            packets[-1].append(token)
+    return packets
+
+
+def packet_lines(argv: Sequence[str]) -> list[str]:
+    """Собрать строки CSV из аргументов `КОД показатели КОД ...`."""
+    return [','.join(packet) for packet in split_packets(argv)]
+
+
+def split_batches(lines: Iterable[str], batch_size: int = BATCH_SIZE,
+                  max_line: int = MAX_LINE) -> list[list[str]]:
+    """Разбить строки пакетов на пачки, каждая — одна строка протокола.
+
+    В пачке не больше `batch_size` пакетов, и вместе с разделителями и
+    переводом строки она занимает не больше `max_line` байт — иначе
+    сервер её не примет. Пакет длиннее `max_line` уходит один, и
+    сервер отвечает на него ошибкой.
+    """
+    batches: list[list[str]] = []
+    batch: list[str] = []
+    size = 0
+    for line in lines:
+        # Байт на разделитель пакетов или на перевод строки.
+        length = len(line.encode()) + 1
+        if batch and (len(batch) >= batch_size
+                      or size + length > max_line):
+            batches.append(batch)
+            batch = []
+            size = 0
+        batch.append(line)
+        size += length
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class DaemonClient:
+    """Синхронный клиент демона."""
+
+    def __init__(self, path: str | None = None,
+                 timeout: float | None = 10.0) -> None:
+        # socket тянет selectors и enum; `cli` импортирует этот модуль
+        # ради `split_packets`, и ему сокет не нужен.
+        import socket
+
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.settimeout(timeout)
+        try:
+            self.socket.connect(path or socket_path())
+        except OSError:
+            self.socket.close()
+            raise
+        self._tail = b''
+
+    def request(self, lines: Iterable[str],
+                batch_size: int = BATCH_SIZE,
+                window: int = WINDOW,
+                max_line: int = MAX_LINE) -> list[str]:
+        """Отправить строки пакетов, вернуть ответы в том же порядке.
+
+        В пути одновременно не больше `window` строк по `batch_size`
+        пакетов, чтобы ни клиент, ни демон не упёрлись в буфер сокета.
+        Строка не длиннее `max_line` байт (см. `split_batches`).
+        """
+        batches = split_batches(lines, batch_size, max_line)
+        replies: list[str] = []
+        for start in range(0, len(batches), window):
+            group = batches[start:start + window]
+            self.socket.sendall(b''.join(
+                (BATCH_SEPARATOR.join(batch) + '\n').encode()
+                for batch in group))
+            self._receive(sum(map(len, group)), replies)
+        return replies
+
+    def _receive(self, count: int, replies: list[str]) -> None:
+        while count:
+            chunk = self.socket.recv(65536)
+            if not chunk:
+                raise ConnectionError('Демон закрыл соединение')
+            *lines, self._tail = (self._tail + chunk).split(b'\n')
+            replies.extend(line.decode() for line in lines)
+            count -= len(lines)
+
+    def send(self, workout_type: str, data: Sequence[float]) -> str:
+        """Отправить один пакет и дождаться ответа."""
+        line = ','.join([workout_type, *map(str, data)])
+        reply, = self.request([line])
+        return reply
+
+    def close(self) -> None:
+        self.socket.close()
+
+    def __enter__(self) -> DaemonClient:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def serve(path: str, max_connections: int = 100) -> None:
+    """Работать демоном на Unix-сокете до SIGINT/SIGTERM."""
+    import asyncio
+    import signal
+
+    import server
+
+    async def run() -> None:
+        if os.path.exists(path):
+            os.unlink(path)
+        packet_server = server.PacketServer(max_connections)
+        await packet_server.start_unix(path)
+        print(f'Демон слушает {path}', flush=True)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        try:
+            await stop.wait()
+        finally:
+            await packet_server.shutdown()
+            if os.path.exists(path):
+                os.unlink(path)
+
+    asyncio.run(run())
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Запустить демон или отправить ему пакеты из аргументов."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'serve':
+        import argparse
+        parser = argparse.ArgumentParser(prog='daemon.py serve')
+        parser.add_argument('--socket', default=socket_path())
+        parser.add_argument('--max-connections', type=int, default=100)
+        args = parser.parse_args(argv[1:])
+        serve(args.socket, args.max_connections)
+        return 0
+    if not argv:
+        print(__doc__, file=sys.stderr)
+        return 2
+    try:
+        lines = packet_lines(argv)
+        with DaemonClient() as client:
+            replies = client.request(lines)
+    except (OSError, ValueError) as error:
+        print(f'{ERROR_PREFIX}{error}', file=sys.stderr)
+        return 2
+    sys.stdout.write('\n'.join(replies) + '\n')
+    return 1 if any(reply.startswith(ERROR_PREFIX)
+                    for reply in replies) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
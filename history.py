@@ -0,0 +1,290 @@
+"""История тренировок в SQLite с индексами для выборок.
+
+Результаты тренировок (поля `InfoMessage`) хранятся вместе с
+пользователем и временем в одной таблице. Названия видов тренировок
+и пользователи вынесены в справочники, в строке лежат только их
+номера. Индексы по виду и времени, по виду и дистанции и по
+пользователю и времени позволяют выбирать диапазоны и лучшие
+тренировки без просмотра всей таблицы.
+
+История только пополняется: изменение и удаление строк запрещены
+триггерами. Записи копятся в памяти и пишутся пачками по
+`batch_size` в одной транзакции.
+"""
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from homework import InfoMessage, Training
+
+SCHEMA: str = '''
+CREATE TABLE IF NOT EXISTS training_types (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS workouts (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users (id),
+    type_id INTEGER NOT NULL REFERENCES training_types (id),
+    time INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    distance REAL NOT NULL,
+    speed REAL NOT NULL,
+    calories REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS workouts_type_time ON workouts (type_id, time);
+CREATE INDEX IF NOT EXISTS workouts_type_distance
+    ON workouts (type_id, distance);
+CREATE INDEX IF NOT EXISTS workouts_time ON workouts (time);
+CREATE INDEX IF NOT EXISTS workouts_user_time ON workouts (user_id, time);
+CREATE TRIGGER IF NOT EXISTS workouts_no_update BEFORE UPDATE ON workouts
+BEGIN
+    SELECT RAISE(ABORT, 'история тренировок только пополняется');
+END;
+CREATE TRIGGER IF NOT EXISTS workouts_no_delete BEFORE DELETE ON workouts
+BEGIN
+    SELECT RAISE(ABORT, 'история тренировок только пополняется');
+END;
+'''
+ORDER_FIELDS: tuple[str, ...] = ('duration', 'distance', 'speed',
+                                 'calories', 'time')
+SELECT: str = ('SELECT users.name, training_types.name, time, duration, '
+               'distance, speed, calories FROM workouts '
+               'JOIN users ON users.id = user_id '
+               'JOIN training_types ON training_types.id = type_id')
+
+
+def timestamp(when: date | datetime | float) -> int:
+    """Время в секундах от начала эпохи; время без пояса считается UTC."""
+    if isinstance(when, datetime):
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return int(when.timestamp())
+    if isinstance(when, date):
+        return int(datetime(when.year, when.month, when.day,
+                            tzinfo=timezone.utc).timestamp())
+    return int(when)
+
+
+@dataclass(frozen=True, slots=True)
+class Workout:
+    """Тренировка из истории."""
+    user: str
+    training_type: str
+    when: datetime
+    duration: float
+    distance: float
+    speed: float
+    calories: float
+
+    @classmethod
+    def from_row(cls, row: tuple[Any, ...]) -> Workout:
+        user, training_type, time, *values = row
+        return cls(user, training_type,
+                   datetime.fromtimestamp(time, timezone.utc), *values)
+
+    def info(self) -> InfoMessage:
+        """Информационное сообщение о тренировке."""
+        return InfoMessage(self.training_type, self.duration, self.distance,
+                           self.speed, self.calories)
+
+
+class WorkoutStore:
+    """История тренировок в файле SQLite (или `':memory:'`)."""
+
+    def __init__(self, path: str | Path = ':memory:',
+                 batch_size: int = 10_000) -> None:
+        if batch_size < 1:
+            raise ValueError('batch_size должен быть положительным')
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(str(path))
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.execute('PRAGMA synchronous = NORMAL')
+        self.connection.executescript(SCHEMA)
+        self._ids: dict[str, dict[str, int]] = {
+            table: dict(self.connection.execute(
+                f'SELECT name, id FROM {table}'))
+            for table in ('users', 'training_types')}
+        self._pending: list[tuple[Any, ...]] = []
+
+    def _id(self, table: str, name: str) -> int:
+        ids = self._ids[table]
+        row_id = ids.get(name)
+        if row_id is None:
+            cursor = self.connection.execute(
+                f'INSERT INTO {table} (name) VALUES (?)', (name,))
+            row_id = ids[name] = cursor.lastrowid  # type: ignore
+        return row_id
+
+    def add(self, user: str, result: InfoMessage | Training,
+            when: date | datetime | float) -> None:
+        """Добавить тренировку пользователя `user`, прошедшую `when`."""
+        if isinstance(result, Training):
+            result = result.show_training_info()
+        self._pending.append((
+            self._id('users', user), self._id('training_types',
+                                              result.training_type),
+            timestamp(when), result.duration, result.distance,
+            result.speed, result.calories))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def extend(self, results: Iterable[tuple[str, InfoMessage | Training,
+                                             date | datetime | float]]
+               ) -> int:
+        """Добавить тренировки `(user, result, when)`, вернуть их число."""
+        count = 0
+        for user, result, when in results:
+            self.add(user, result, when)
+            count += 1
+        return count
+
+    def flush(self) -> None:
+        """Записать накопленные тренировки одной транзакцией.
+
+        Пачка упорядочивается по времени: так новые ключи индексов по
+        времени ложатся в соседние страницы, и вставка быстрее.
+        """
+        self._pending.sort(key=itemgetter(2))
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO workouts (user_id, type_id, time, duration, '
+                'distance, speed, calories) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                self._pending)
+        self._pending.clear()
+
+    def _where(self, training_type: str | None, user: str | None,
+               start: date | datetime | float | None,
+               end: date | datetime | float | None,
+               min_distance: float | None, max_distance: float | None
+               ) -> tuple[str, list[Any]] | None:
+        """Условия выборки; None, если выборка заведомо пуста."""
+        conditions: list[str] = []
+        params: list[Any] = []
+        for table, column, name in (('training_types', 'type_id',
+                                     training_type),
+                                    ('users', 'user_id', user)):
+            if name is not None:
+                row_id = self._ids[table].get(name)
+                if row_id is None:
+                    return None
+                conditions.append(f'{column} = ?')
+                params.append(row_id)
+        for condition, value in (('time >= ?', start), ('time < ?', end)):
+            if value is not None:
+                conditions.append(condition)
+                params.append(timestamp(value))
+        for condition, value in (('distance >= ?', min_distance),
+                                 ('distance <= ?', max_distance)):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+        return where, params
+
+    def _query_sql(self, training_type: str | None = None,
+                   user: str | None = None,
+                   start: date | datetime | float | None = None,
+                   end: date | datetime | float | None = None,
+                   min_distance: float | None = None,
+                   max_distance: float | None = None,
+                   limit: int | None = None
+                   ) -> tuple[str, list[Any]] | None:
+        where = self._where(training_type, user, start, end,
+                            min_distance, max_distance)
+        if where is None:
+            return None
+        sql, params = where
+        sql = f'{SELECT}{sql} ORDER BY time'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return sql, params
+
+    def _top_sql(self, k: int, by: str = 'distance',
+                 training_type: str | None = None, user: str | None = None,
+                 start: date | datetime | float | None = None,
+                 end: date | datetime | float | None = None
+                 ) -> tuple[str, list[Any]] | None:
+        if by not in ORDER_FIELDS:
+            raise ValueError(f'Нельзя упорядочить по {by}')
+        where = self._where(training_type, user, start, end, None, None)
+        if where is None:
+            return None
+        sql, params = where
+        return f'{SELECT}{sql} ORDER BY {by} DESC LIMIT ?', [*params, k]
+
+    def query(self, training_type: str | None = None,
+              user: str | None = None,
+              start: date | datetime | float | None = None,
+              end: date | datetime | float | None = None,
+              min_distance: float | None = None,
+              max_distance: float | None = None,
+              limit: int | None = None) -> Iterator[Workout]:
+        """Тренировки в диапазоне времени `[start, end)` по времени.
+
+        Например, заплывы больше 2 км за март:
+        `query('Swimming', start=date(2024, 3, 1), end=date(2024, 4, 1),
+        min_distance=2)`.
+        """
+        self.flush()
+        query = self._query_sql(training_type, user, start, end,
+                                min_distance, max_distance, limit)
+        if query is None:
+            return iter(())
+        return map(Workout.from_row, self.connection.execute(*query))
+
+    def top(self, k: int, by: str = 'distance',
+            training_type: str | None = None, user: str | None = None,
+            start: date | datetime | float | None = None,
+            end: date | datetime | float | None = None) -> list[Workout]:
+        """`k` тренировок с наибольшим значением поля `by`."""
+        self.flush()
+        query = self._top_sql(k, by, training_type, user, start, end)
+        if query is None:
+            return []
+        return [Workout.from_row(row)
+                for row in self.connection.execute(*query)]
+
+    def count(self, training_type: str | None = None,
+              user: str | None = None,
+              start: date | datetime | float | None = None,
+              end: date | datetime | float | None = None,
+              min_distance: float | None = None,
+              max_distance: float | None = None) -> int:
+        """Число тренировок, подходящих под условия `query`."""
+        self.flush()
+        where = self._where(training_type, user, start, end,
+                            min_distance, max_distance)
+        if where is None:
+            return 0
+        sql, params = where
+        (count,), = self.connection.execute(
+            f'SELECT count(*) FROM workouts{sql}', params)
+        return count
+
+    def explain(self, sql: str, params: Iterable[Any] = ()) -> list[str]:
+        """План выполнения запроса SQLite — какие индексы он использует."""
+        return [row[-1] for row in self.connection.execute(
+            f'EXPLAIN QUERY PLAN {sql}', list(params))]
+
+    def close(self) -> None:
+        """Записать накопленное, обновить статистику индексов и закрыть."""
+        self.flush()
+        self.connection.execute('PRAGMA optimize')
+        self.connection.close()
+
+    def __enter__(self) -> WorkoutStore:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
@@ -1,30 +1,286 @@
 from __future__ import annotations
-from dataclasses import asdict, dataclass
+
+from itertools import starmap
+from operator import attrgetter
+
+# Модуль запускается как короткая команда много раз подряд, поэтому
+# при импорте не загружаются typing, dataclasses и string: вместе с
+# ними подтягиваются re, enum и inspect, а это больше половины времени
+# запуска. Аннотации не вычисляются, typing нужен только анализаторам.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable, Iterable, Iterator, TextIO, TypeVar
+
+    Kernel = Callable[..., tuple[float, float, float]]
+
+MESSAGE_FIELDS: tuple[str, ...] = ('training_type', 'duration', 'distance',
+                                   'speed', 'calories')
+MESSAGE_TEMPLATE: str = ('Тип тренировки: {training_type}; '
+                         'Длительность: {duration:.3f} ч.; '
+                         'Дистанция: {distance:.3f} км; '
+                         'Ср. скорость: {speed:.3f} км/ч; '
+                         'Потрачено ккал: {calories:.3f}.')
+
+
+def compile_template(template: str) -> Callable[..., str]:
+    """Заранее разобрать шаблон сообщения с именованными полями.
+
+    Возвращает функцию, которая принимает значения полей
+    `MESSAGE_FIELDS` по порядку и возвращает готовую строку.
+    """
+    from string import Formatter
+
+    parts: list[str] = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        parts.append(literal.replace('{', '{{').replace('}', '}}'))
+        if field is None:
+            continue
+        parts.append('{%d' % MESSAGE_FIELDS.index(field))
+        if conversion:
+            parts.append('!' + conversion)
+        if spec:
+            parts.append(':' + spec)
+        parts.append('}')
+    return ''.join(parts).format
+
+
+_render: Callable[..., str] | None = None
+
+
+def render_message(*values: Any) -> str:
+    """Строка сообщения по значениям полей `MESSAGE_FIELDS` по порядку.
+
+    Шаблон разбирается при первом вызове: модуль `string` загружается
+    долго, а короткой команде он не нужен, пока нет сообщений.
+    """
+    global _render
+    if _render is None:
+        _render = compile_template(MESSAGE_TEMPLATE)
+    return _render(*values)
 
 
-@dataclass
 class InfoMessage:
     """Информационное сообщение о тренировке."""
-    training_type: str
-    duration: float
-    distance: float
-    speed: float
-    calories: float
-    message: str = ('Тип тренировки: {training_type}; '
-                    'Длительность: {duration:.3f} ч.; '
-                    'Дистанция: {distance:.3f} км; '
-                    'Ср. скорость: {speed:.3f} км/ч; '
-                    'Потрачено ккал: {calories:.3f}.')
+    __slots__ = ('training_type', 'duration', 'distance', 'speed',
+                 'calories', 'message')
+
+    def __init__(self, training_type: str, duration: float,
+                 distance: float, speed: float, calories: float,
+                 message: str = MESSAGE_TEMPLATE) -> None:
+        self.training_type = training_type
+        self.duration = duration
+        self.distance = distance
+        self.speed = speed
+        self.calories = calories
+        self.message = message
+
+    def _values(self) -> tuple[Any, ...]:
+        return (self.training_type, self.duration, self.distance,
+                self.speed, self.calories, self.message)
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._values() == other._values()  # type: ignore
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return (f'{self.__class__.__qualname__}('
+                + ', '.join(f'{name}={value!r}' for name, value
+                            in zip(self.__slots__, self._values()))
+                + ')')
 
     def get_message(self) -> str:
-        return (self.message).format(**asdict(self))
+        if self.message is MESSAGE_TEMPLATE:
+            return render_message(self.training_type, self.duration,
+                                  self.distance, self.speed, self.calories)
+        return self.message.format(training_type=self.training_type,
+                                   duration=self.duration,
+                                   distance=self.distance,
+                                   speed=self.speed,
+                                   calories=self.calories)
+
+
+def render_messages(messages: Iterable[InfoMessage | tuple[Any, ...]
+                                       | str]) -> Iterator[str]:
+    """Получить строки сообщений для объектов `InfoMessage`.
+
+    Вместо `InfoMessage` можно передавать кортежи значений полей
+    `MESSAGE_FIELDS` — тогда объекты сообщений не создаются вовсе —
+    или уже готовые строки, которые отдаются как есть.
+    """
+    for info in messages:
+        if isinstance(info, str):
+            yield info
+        elif isinstance(info, tuple):
+            yield render_message(*info)
+        else:
+            yield info.get_message()
+
+
+def write_messages(messages: Iterable[InfoMessage | tuple[Any, ...] | str],
+                   stream: TextIO, batch_size: int = 1024) -> int:
+    """Записать сообщения в поток построчно, вернуть их количество.
+
+    Строки копятся пачками по `batch_size` и пишутся одним вызовом.
+    """
+    written = 0
+    batch: list[str] = []
+    for line in render_messages(messages):
+        batch.append(line)
+        if len(batch) >= batch_size:
+            stream.write('\n'.join(batch) + '\n')
+            written += len(batch)
+            batch.clear()
+    if batch:
+        stream.write('\n'.join(batch) + '\n')
+        written += len(batch)
+    return written
+
+
+METRICS: tuple[str, ...] = ('get_distance', 'get_mean_speed',
+                            'get_spent_calories')
+_MISSING = object()
+# CO_VARARGS | CO_VARKEYWORDS: флаги `*args` и `**kwargs` объекта кода.
+_CO_VARIADIC: int = 0x04 | 0x08
+
+
+def _code_fields(training_class: type) -> tuple[str, ...] | None:
+    """Параметры `__init__` по объекту кода, без модуля inspect.
+
+    None, если так их не узнать: у `__init__` есть `*args`,
+    `**kwargs` или только именованные параметры, либо он обёрнут
+    декоратором.
+    """
+    init = training_class.__init__
+    code = getattr(init, '__code__', None)
+    if (code is None or hasattr(init, '__wrapped__')
+            or code.co_flags & _CO_VARIADIC or code.co_kwonlyargcount):
+        return None
+    return code.co_varnames[1:code.co_argcount]
+
+
+def init_fields(training_class: type) -> tuple[str, ...]:
+    """Названия параметров `__init__` класса тренировки."""
+    fields = _code_fields(training_class)
+    if fields is not None:
+        return fields
+    from inspect import Parameter, signature
+
+    init = signature(training_class.__init__)
+    parameters = list(init.parameters.values())[1:]
+    if any(parameter.kind not in (Parameter.POSITIONAL_ONLY,
+                                  Parameter.POSITIONAL_OR_KEYWORD)
+           for parameter in parameters):
+        raise TypeError(f'Показатели пакета {training_class.__name__} '
+                        'нельзя определить: у __init__ должны быть только '
+                        'позиционные параметры')
+    return tuple(parameter.name for parameter in parameters)
+
+
+def _instance_state(training: Any) -> tuple[tuple[str, Any], ...]:
+    """Снимок атрибутов объекта тренировки без самого кэша."""
+    return tuple(item for item in training.__dict__.items()
+                 if item[0] != '_metrics')
+
+
+def cached_metric(method: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Считать показатель тренировки один раз и хранить на объекте.
+
+    Запомненные значения лежат в `_metrics` вместе со снимком
+    показателей пакета (`_inputs`); если показатели изменились,
+    значения считаются заново. Ключ — полное имя метода, поэтому
+    переопределённый метод и метод базового класса, вызванный через
+    `super()`, не мешают друг другу. Если параметры `__init__` не
+    узнать по объекту кода (`*args`, декоратор), снимок — все атрибуты
+    объекта.
+
+    Если у класса есть ядро (`_kernel`), при первом запросе все три
+    показателя считаются одним его вызовом. Если ядро не может
+    посчитать какой-то показатель (например, при нулевой длительности),
+    показатели считаются по отдельности и ошибку даёт только тот метод,
+    который её дал бы и без ядра.
+    """
+    key = method.__qualname__
+
+    def wrapper(self: Any) -> Any:
+        inputs = self._inputs(self)
+        cache = self._metrics
+        if cache is None or cache[0] != inputs:
+            kernel = self._kernel
+            metrics: dict[str, Any] = {}
+            if kernel is not None:
+                try:
+                    distance, speed, calories = kernel(*inputs)
+                except ArithmeticError:
+                    # Ядро считает все показатели сразу; если один из
+                    # них не считается, остальные считают их методы.
+                    pass
+                else:
+                    keys = self._kernel_keys
+                    metrics = {keys[0]: distance, keys[1]: speed,
+                               keys[2]: calories}
+            cache = self._metrics = (inputs, metrics)
+        metrics = cache[1]
+        value = metrics.get(key, _MISSING)
+        if value is _MISSING:
+            value = metrics[key] = method(self)
+        return value
+
+    wrapper.__name__ = method.__name__
+    wrapper.__qualname__ = method.__qualname__
+    wrapper.__doc__ = method.__doc__
+    wrapper.__wrapped__ = method  # type: ignore[attr-defined]
+    wrapper.cached = True  # type: ignore[attr-defined]
+    return wrapper
 
 
 class Training:
-    """Базовый класс тренировки."""
+    """Базовый класс тренировки.
+
+    Дистанция, скорость и калории считаются при первом запросе и
+    запоминаются до изменения показателей пакета. Методы `METRICS`,
+    переопределённые в подклассах, кэшируются автоматически.
+
+    Подкласс с методом `compile_kernel` при определении получает ядро
+    `_kernel` — функцию от показателей пакета, которая возвращает
+    дистанцию, скорость и калории по тем же формулам, но с
+    константами, подставленными заранее. Ядро не используется, если
+    подкласс ниже по иерархии переопределяет методы `METRICS` или
+    меняет параметры `__init__`.
+    """
     LEN_STEP: float = 0.65
     M_IN_KM: int = 1000
     M_IN_HOUR: int = 60
+    _inputs: Callable[[Any], Any] = attrgetter('action', 'duration',
+                                               'weight')
+    _metrics: tuple[Any, dict[str, Any]] | None = None
+    _kernel: Kernel | None = None
+    _kernel_keys: tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        fields = _code_fields(cls)
+        cls._inputs = (attrgetter(*fields)  # type: ignore[assignment]
+                       if fields else staticmethod(_instance_state))
+        for name in METRICS:
+            method = cls.__dict__.get(name)
+            if callable(method) and not getattr(method, 'cached', False):
+                setattr(cls, name, cached_metric(method))
+        kernel = None
+        for owner in cls.__mro__ if fields else ():
+            if 'compile_kernel' in owner.__dict__:
+                # Ядро принимает показатели класса, где оно определено;
+                # с другими параметрами `__init__` оно не подходит.
+                if _code_fields(owner) == fields:
+                    kernel = staticmethod(cls.compile_kernel())
+                break
+            if any(name in owner.__dict__ for name in METRICS):
+                break
+        cls._kernel = kernel  # type: ignore[assignment]
+        cls._kernel_keys = tuple(getattr(cls, name).__qualname__
+                                 for name in METRICS)
 
     def __init__(self,
                  action: int,
@@ -35,14 +291,17 @@ class Training:
         self.duration = duration
         self.weight = weight
 
+    @cached_metric
     def get_distance(self) -> float:
         """Получить дистанцию в км."""
         return self.action * self.LEN_STEP / self.M_IN_KM
 
+    @cached_metric
     def get_mean_speed(self) -> float:
         """Получить среднюю скорость движения."""
         return self.get_distance() / self.duration
 
+    @cached_metric
     def get_spent_calories(self) -> float:
         """Получить количество затраченных калорий."""
         pass
@@ -55,6 +314,35 @@ class Training:
                            self.get_spent_calories())
 
 
+TRAININGS: dict[str, type[Training]] = {}
+TRAINING_FIELDS: dict[str, tuple[str, ...]] = {}
+KERNELS: dict[str, Kernel] = {}
+_SHAPES: dict[str, tuple[type[Training], int]] = {}
+
+if TYPE_CHECKING:
+    TrainingType = TypeVar('TrainingType', bound=type[Training])
+
+
+def register(workout_type: str) -> Callable[[TrainingType], TrainingType]:
+    """Зарегистрировать класс тренировки под кодом `workout_type`.
+
+    Названия показателей пакета берутся из параметров `__init__`,
+    чтобы `read_package` проверял длину пакета до создания объекта.
+    """
+    def decorator(training_class: TrainingType) -> TrainingType:
+        if workout_type in TRAININGS:
+            raise ValueError(f'Код тренировки {workout_type} уже занят')
+        fields = init_fields(training_class)
+        TRAININGS[workout_type] = training_class
+        TRAINING_FIELDS[workout_type] = fields
+        _SHAPES[workout_type] = (training_class, len(fields))
+        if training_class._kernel is not None:
+            KERNELS[workout_type] = training_class._kernel
+        return training_class
+    return decorator
+
+
+@register('RUN')
 class Running(Training):
     """Тренировка: бег."""
 
@@ -69,7 +357,23 @@ class Running(Training):
         return (mean_speed * self.weight / super().M_IN_KM
                 * duration_in_minutes)
 
+    @classmethod
+    def compile_kernel(cls) -> Kernel:
+        """Ядро бега: формулы методов с подставленными константами."""
+        len_step, m_in_km, m_in_hour = cls.LEN_STEP, cls.M_IN_KM, cls.M_IN_HOUR
+        multiplier = cls.CALORIES_MEAN_SPEED_MULTIPLIER
+        shift = cls.CALORIES_MEAN_SPEED_SHIFT
+
+        def running(action: float, duration: float,
+                    weight: float) -> tuple[float, float, float]:
+            distance = action * len_step / m_in_km
+            speed = distance / duration
+            return distance, speed, ((multiplier * speed + shift) * weight
+                                     / m_in_km * (duration * m_in_hour))
+        return running
+
 
+@register('WLK')
 class SportsWalking(Training):
     """Тренировка: спортивная ходьба."""
     CALORIES_WEIGHT_MULTIPLIER: float = 0.035
@@ -95,7 +399,27 @@ class SportsWalking(Training):
                 * self.CALORIES_HIEGHT_MULTIPLIER * self.weight)
                 * duration_in_minutes)
 
+    @classmethod
+    def compile_kernel(cls) -> Kernel:
+        """Ядро ходьбы: формулы методов с подставленными константами."""
+        len_step, m_in_km, m_in_hour = cls.LEN_STEP, cls.M_IN_KM, cls.M_IN_HOUR
+        weight_multiplier = cls.CALORIES_WEIGHT_MULTIPLIER
+        height_multiplier = cls.CALORIES_HIEGHT_MULTIPLIER
+        speed_multiplier = cls.CALORIES_MEAN_SPEED_MULTIPLIER
+        cm_in_metre = cls.CM_IN_METRE
+
+        def walking(action: float, duration: float, weight: float,
+                    height: float) -> tuple[float, float, float]:
+            distance = action * len_step / m_in_km
+            speed = distance / duration
+            return distance, speed, (
+                (weight_multiplier * weight
+                 + ((speed * speed_multiplier)**2 / (height / cm_in_metre))
+                 * height_multiplier * weight) * (duration * m_in_hour))
+        return walking
+
 
+@register('SWM')
 class Swimming(Training):
     """Тренировка: плавание."""
     LEN_STEP: float = 1.38
@@ -123,15 +447,65 @@ class Swimming(Training):
                              * self.CALORIES_MEAN_SPEED_MULTIPLIER)
         return mean_speed * self.weight * self.duration
 
+    @classmethod
+    def compile_kernel(cls) -> Kernel:
+        """Ядро плавания: формулы методов с подставленными константами."""
+        len_step, m_in_km = cls.LEN_STEP, cls.M_IN_KM
+        shift = cls.CALORIES_MEAN_SPEED_SHIFT
+        multiplier = cls.CALORIES_MEAN_SPEED_MULTIPLIER
+
+        def swimming(action: float, duration: float, weight: float,
+                     length_pool: float, count_pool: float
+                     ) -> tuple[float, float, float]:
+            speed = length_pool * count_pool / m_in_km / duration
+            return (action * len_step / m_in_km, speed,
+                    (speed + shift) * multiplier * weight * duration)
+        return swimming
+
+
+def parse_number(text: str) -> float:
+    """Прочитать показатель датчика, сохранив целые числа целыми."""
+    text = text.strip()
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
 
 def read_package(workout_type: str, data: list[float | int]) -> Training:
     """Прочитать данные полученные от датчиков."""
-    trainings: dict[str, type[Training]] = {'SWM': Swimming,
-                                            'RUN': Running,
-                                            'WLK': SportsWalking}
-    if workout_type not in trainings:
+    shape = _SHAPES.get(workout_type)
+    if shape is None:
         raise KeyError('Код тренировки не существует')
-    return trainings[workout_type](*data)
+    training_class, arity = shape
+    if len(data) != arity:
+        raise ValueError(f'Для {workout_type} нужно {arity} показателей '
+                         f'{TRAINING_FIELDS[workout_type]}, '
+                         f'получено {len(data)}')
+    return training_class(*data)
+
+
+def _get_kernel(workout_type: str) -> Kernel:
+    kernel = KERNELS.get(workout_type)
+    if kernel is None:
+        raise KeyError(f'Нет ядра для кода тренировки {workout_type}')
+    return kernel
+
+
+def compute_rows(workout_type: str, rows: Iterable[Iterable[float]]
+                 ) -> Iterator[tuple[float, float, float]]:
+    """Дистанция, скорость и калории для пакетов одного вида.
+
+    `rows` — показатели пакетов, как в `read_package`; объекты
+    тренировок не создаются.
+    """
+    return starmap(_get_kernel(workout_type), rows)
+
+
+def compute_columns(workout_type: str, *columns: Iterable[float]
+                    ) -> Iterator[tuple[float, float, float]]:
+    """То же, что `compute_rows`, но по колонкам показателей."""
+    return map(_get_kernel(workout_type), *columns)
 
 
 def main(training: Training) -> None:
@@ -140,12 +514,113 @@ def main(training: Training) -> None:
     print(info.get_message())
 
 
+PACKAGES: list[tuple[str, list[float]]] = [('SWM', [720, 1, 80, 25, 40]),
+                                           ('RUN', [15000, 1, 75]),
+                                           ('WLK', [9000, 1, 75, 180])
+                                           ]
+
+
+def parse_args(argv: list[str] | None = None) -> Any:
+    """Разобрать аргументы командной строки."""
+    import argparse
+
+    from packets import FORMATS
+
+    parser = argparse.ArgumentParser(
+        description='Рассчитать результаты тренировок по пакетам датчиков.')
+    parser.add_argument('paths', nargs='*',
+                        help='файлы с пакетами; `-` — стандартный ввод')
+    parser.add_argument('-f', '--format', choices=FORMATS,
+                        help='формат пакетов (по умолчанию — по расширению)')
+    parser.add_argument('-o', '--output',
+                        help='файл для результатов (по умолчанию — stdout); '
+                             '.tcol — колоночный файл')
+    parser.add_argument('-j', '--workers', type=int,
+                        help='обрабатывать пакеты в нескольких процессах')
+    parser.add_argument('--cache', type=int, metavar='SIZE',
+                        help='кэшировать результаты SIZE последних '
+                             'различных пакетов')
+    parser.add_argument('--profile', metavar='PATH',
+                        help='записать профиль этапов при выходе: '
+                             '.json, .prom или таблица; `-` — stderr')
+    parser.add_argument('--skip-invalid', action='store_true',
+                        help='пропускать неверные пакеты, сообщая о них '
+                             'в stderr')
+    parser.add_argument('--dedup', action='store_true',
+                        help='пропускать повторы пакетов с тем же '
+                             'содержимым')
+    args = parser.parse_args(argv)
+    if args.profile and args.workers:
+        # Профилировщик видит только этот процесс, а пакеты считают
+        # процессы-обработчики: профиль вышел бы почти пустым.
+        parser.error('--profile нельзя использовать вместе с -j/--workers')
+    return args
+
+
+def process(args: Any,
+            packages: Iterable[tuple[str, list[float]]],
+            lines: bool = False) -> Iterable[InfoMessage | str]:
+    """Выбрать способ обработки пакетов по аргументам командной строки.
+
+    С `lines` кэш отдаёт готовые строки сообщений, чтобы повторы не
+    форматировались заново.
+    """
+    if args.workers:
+        from parallel import process_packets_parallel
+        return process_packets_parallel(packages, args.workers)
+    if args.cache:
+        from cache import PackageCache
+        cache = PackageCache(max_entries=args.cache)
+        lookup = cache.get_message if lines else cache.get_info
+        return (lookup(workout_type, data)
+                for workout_type, data in packages)
+    return (read_package(workout_type, data).show_training_info()
+            for workout_type, data in packages)
+
+
+def run(argv: list[str] | None = None) -> None:
+    """Обработать пакеты из файлов, указанных в командной строке."""
+    import sys
+
+    args = parse_args(argv)
+    packages: Iterable[tuple[str, list[float]]] = PACKAGES
+    if args.paths:
+        from packets import read_files
+        packages = read_files(args.paths, args.format)
+    if args.skip_invalid:
+        from validation import iter_valid
+        packages = iter_valid(packages, lambda rejection: print(
+            f'Пакет {rejection.index} пропущен: {rejection.reason}',
+            file=sys.stderr))
+    if args.dedup:
+        from ingest import assign_ids, unique_packets
+        packages = unique_packets(assign_ids(packages))
+    profiler = None
+    if args.profile:
+        from profiling import Profiler
+        profiler = Profiler().enable()
+    try:
+        if args.output and args.output.endswith('.tcol'):
+            from columnar import ColumnarWriter
+            with ColumnarWriter(args.output) as writer:
+                writer.extend(process(args, packages))
+            return
+        output: TextIO = sys.stdout
+        if args.output:
+            output = open(args.output, 'w', encoding='utf-8')
+        try:
+            write_messages(process(args, packages, lines=True), output)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump(args.profile)
+
+
 if __name__ == '__main__':
-    packages: list[tuple[str, list[int]]] = [('SWM', [720, 1, 80, 25, 40]),
-                                             ('RUN', [15000, 1, 75]),
-                                             ('WLK', [9000, 1, 75, 180])
-                                             ]
-
-    for workout_type, data in packages:
-        training: Training = read_package(workout_type, data)
-        main(training)
+    # Запуск через модуль `homework`, а не `__main__`: так профилировщик
+    # и процессы-обработчики работают с теми же классами и функциями.
+    import homework
+    homework.run()
@@ -0,0 +1,285 @@
+"""Приём пакетов без повторов и по порядку номеров.
+
+Блок датчиков повторяет пакет, не дождавшись подтверждения, и пакеты
+приходят не по порядку, поэтому одна тренировка может попасть в
+`read_package` несколько раз. Приём работает с конвертами
+`(packet_id, workout_type, data)`:
+
+* повторы отсеивает `Deduplicator`: номера хранятся в двух
+  поколениях фильтра Блума на `capacity` номеров каждое, последние
+  `recent` номеров — ещё и точно. Память постоянна; новый пакет
+  ошибочно считается повтором с вероятностью около `error_rate`;
+* `Ingestor` вдобавок держит до `window` пакетов и выдаёт их по
+  возрастанию номеров. Пакет с номером меньше уже выданного
+  (опоздавший больше чем на окно) выдаётся сразу и учитывается в
+  `IngestStats.late`.
+
+Если датчик не присылает номера, `assign_ids` нумерует пакеты по
+содержимому; тогда окно упорядочивания не нужно (`window=0`).
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import random
+from collections import deque
+from hashlib import blake2b
+from dataclasses import dataclass
+from typing import Hashable, Iterable, Iterator, Sequence
+
+Packet = tuple[str, Sequence[float]]
+Envelope = tuple[Hashable, str, Sequence[float]]
+
+MASK64: int = (1 << 64) - 1
+INT64_MIN: int = -1 << 63
+INT64_MAX: int = (1 << 63) - 1
+BLOCK_BITS: int = 512
+MASK_TABLE_SIZE: int = 4096
+# Ключи ложатся в блоки неравномерно, и у блочного фильтра при той же
+# памяти ложных срабатываний больше, чем у обычного; запас по памяти
+# возвращает долю ложных срабатываний к заданной.
+BLOCK_OVERHEAD: float = 1.75
+_MASK_TABLES: dict[int, list[int]] = {}
+
+
+def _mix(value: int) -> int:
+    """Перемешать биты хеша (финализатор splitmix64)."""
+    value &= MASK64
+    value = (value ^ (value >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+    value = (value ^ (value >> 27)) * 0x94D049BB133111EB & MASK64
+    return value ^ (value >> 31)
+
+
+def _mask_table(bits: int) -> list[int]:
+    """Маски блока, в каждой `bits` случайных единиц.
+
+    Маска ключа — объединение трёх масок из таблицы: это три выборки
+    по индексу вместо цикла по всем хеш-функциям.
+    """
+    table = _MASK_TABLES.get(bits)
+    if table is None:
+        rnd = random.Random(bits)
+        table = _MASK_TABLES[bits] = [
+            sum(1 << position
+                for position in rnd.sample(range(BLOCK_BITS), bits))
+            for _ in range(MASK_TABLE_SIZE)]
+    return table
+
+
+class BloomFilter:
+    """Блочный фильтр Блума: ключ задаёт блок из 512 бит и биты в нём.
+
+    Методы `*_hash` принимают уже перемешанный хеш ключа (`key_hash`),
+    чтобы не считать его дважды.
+    """
+
+    __slots__ = ('capacity', 'error_rate', 'hashes', 'blocks', 'count',
+                 '_size', '_table')
+
+    def __init__(self, capacity: int, error_rate: float = 1e-6) -> None:
+        if capacity < 1:
+            raise ValueError('capacity должен быть положительным')
+        if not 0 < error_rate < 1:
+            raise ValueError('error_rate должен быть от 0 до 1')
+        bits = (-capacity * math.log(error_rate) / math.log(2) ** 2
+                * BLOCK_OVERHEAD)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.hashes = max(2, round(-math.log2(error_rate)))
+        self._size = math.ceil(bits / BLOCK_BITS)
+        self.blocks = [0] * self._size
+        self.count = 0
+        self._table = _mask_table(math.ceil(self.hashes / 3))
+
+    def __len__(self) -> int:
+        """Число добавленных ключей."""
+        return self.count
+
+    def locate(self, digest: int) -> tuple[int, int]:
+        """Номер блока и маска битов ключа с хешем `digest`."""
+        table = self._table
+        mask = (table[digest & 4095] | table[digest >> 12 & 4095]
+                | table[digest >> 24 & 4095])
+        return (digest >> 36) % self._size, mask
+
+    def add_hash(self, digest: int) -> None:
+        index, mask = self.locate(digest)
+        self.blocks[index] |= mask
+        self.count += 1
+
+    def contains_hash(self, digest: int) -> bool:
+        index, mask = self.locate(digest)
+        return self.blocks[index] & mask == mask
+
+    def add(self, key: Hashable) -> None:
+        """Добавить ключ."""
+        self.add_hash(key_hash(key))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.contains_hash(key_hash(key))
+
+
+def key_hash(key: Hashable) -> int:
+    """Перемешанный 64-битный хеш номера пакета.
+
+    `hash()` целого числа берётся по модулю 2**61 - 1, и, например,
+    номера -1 и -2 или `i` и `i + 2**61 - 1` совпадали бы в фильтре
+    всегда, а не с вероятностью `error_rate`. Поэтому 64-битные целые
+    номера перемешиваются целиком (`_mix` — биекция), строки — по
+    `hash()`, а прочие ключи — по `repr` через blake2b.
+    """
+    if type(key) is int and INT64_MIN <= key <= INT64_MAX:
+        return _mix(key)
+    if type(key) is str:
+        return _mix(hash(key))
+    return int.from_bytes(blake2b(repr(key).encode(), digest_size=8)
+                          .digest(), 'little')
+
+
+def content_id(workout_type: str, data: Sequence[float]) -> int:
+    """Номер пакета по его содержимому (в пределах одного процесса)."""
+    return hash((workout_type, *data))
+
+
+def assign_ids(packets: Iterable[Packet]) -> Iterator[Envelope]:
+    """Пронумеровать пакеты по содержимому."""
+    for workout_type, data in packets:
+        yield content_id(workout_type, data), workout_type, data
+
+
+class Deduplicator:
+    """Отсев повторных номеров пакетов в постоянной памяти.
+
+    Новый номер сразу попадает в фильтр Блума. Последние `recent`
+    номеров вдобавок хранятся точно: повторы, присланные вскоре после
+    пакета, — а их большинство — находятся без хеширования.
+    """
+
+    def __init__(self, recent: int = 65_536, capacity: int = 1_000_000,
+                 error_rate: float = 1e-6) -> None:
+        if recent < 1:
+            raise ValueError('recent должен быть положительным')
+        self.recent = recent
+        self._recent: set[Hashable] = set()
+        self._order: deque[Hashable] = deque()
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous = BloomFilter(capacity, error_rate)
+
+    def seen(self, key: Hashable) -> bool:
+        """Проверить, встречался ли номер, и запомнить его."""
+        recent = self._recent
+        if key in recent:
+            return True
+        current = self._current
+        # Поколения фильтра устроены одинаково, и положение ключа
+        # в них совпадает: его достаточно найти один раз.
+        index, mask = current.locate(key_hash(key))
+        blocks = current.blocks
+        if (blocks[index] & mask == mask
+                or self._previous.blocks[index] & mask == mask):
+            return True
+        blocks[index] |= mask
+        current.count += 1
+        if current.count >= current.capacity:
+            self._previous = current
+            self._current = BloomFilter(current.capacity,
+                                        current.error_rate)
+        recent.add(key)
+        order = self._order
+        order.append(key)
+        if len(order) > self.recent:
+            recent.discard(order.popleft())
+        return False
+
+
+@dataclass
+class IngestStats:
+    """Счётчики приёма пакетов."""
+    received: int = 0
+    forwarded: int = 0
+    duplicates: int = 0
+    late: int = 0
+
+
+class Ingestor:
+    """Приём конвертов: отсев повторов и упорядочивание в окне."""
+
+    def __init__(self, window: int = 0, recent: int = 65_536,
+                 capacity: int = 1_000_000,
+                 error_rate: float = 1e-6) -> None:
+        if window < 0:
+            raise ValueError('window не может быть отрицательным')
+        self.window = window
+        self.deduplicator = Deduplicator(recent, capacity, error_rate)
+        self.stats = IngestStats()
+        self._heap: list[tuple[Hashable, int, Envelope]] = []
+        self._arrival = 0
+        self._last: Hashable | None = None
+
+    def push(self, packet_id: Hashable, workout_type: str,
+             data: Sequence[float]) -> list[Envelope]:
+        """Принять пакет, вернуть пакеты, готовые к обработке."""
+        return list(self.ingest([(packet_id, workout_type, data)],
+                                flush=False))
+
+    def flush(self) -> list[Envelope]:
+        """Выдать все пакеты из окна по порядку номеров."""
+        released = [envelope for _, _, envelope in sorted(self._heap)]
+        self._heap.clear()
+        if released:
+            self._last = released[-1][0]
+        self.stats.forwarded += len(released)
+        return released
+
+    def ingest(self, envelopes: Iterable[Envelope],
+               flush: bool = True) -> Iterator[Envelope]:
+        """Выдавать новые пакеты по порядку номеров.
+
+        С `flush=False` пакеты, оставшиеся в окне, ждут следующих
+        вызовов.
+        """
+        seen = self.deduplicator.seen
+        stats = self.stats
+        heap = self._heap
+        window = self.window
+        received = forwarded = duplicates = late = 0
+        try:
+            for envelope in envelopes:
+                received += 1
+                packet_id = envelope[0]
+                if seen(packet_id):
+                    duplicates += 1
+                    continue
+                if not window:
+                    forwarded += 1
+                    yield envelope
+                    continue
+                if self._last is not None and packet_id < self._last:
+                    late += 1
+                    forwarded += 1
+                    yield envelope
+                    continue
+                self._arrival += 1
+                heapq.heappush(heap, (packet_id, self._arrival, envelope))
+                if len(heap) > window:
+                    envelope = heapq.heappop(heap)[2]
+                    self._last = envelope[0]
+                    forwarded += 1
+                    yield envelope
+        finally:
+            stats.received += received
+            stats.forwarded += forwarded
+            stats.duplicates += duplicates
+            stats.late += late
+        if flush:
+            yield from self.flush()
+
+
+def unique_packets(envelopes: Iterable[Envelope],
+                   **options: int | float) -> Iterator[Packet]:
+    """Пакеты для `read_package` без повторов и по порядку номеров.
+
+    `options` передаются в `Ingestor`.
+    """
+    for _, workout_type, data in Ingestor(**options).ingest(envelopes):
+        yield workout_type, data
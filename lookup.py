@@ -0,0 +1,237 @@
+"""Таблицы расхода калорий для расчётов по сеткам показателей.
+
+Для ходьбы и бега расход калорий равен «расходу за час» — функции
+веса, средней скорости и (для ходьбы) роста — умноженному на
+длительность. `CalorieTable` заранее считает расход за час в узлах
+равномерной сетки и дальше находит его полилинейной интерполяцией.
+Вне сетки расход считается точно по формуле.
+
+Погрешность полилинейной интерполяции в ячейке не больше
+`1/8 * сумма(h_i**2 * max|d2f/dx_i2|)`, где `h_i` — шаг сетки по оси.
+Вторые производные формул известны, поэтому при построении таблица
+вычисляет гарантированную границу погрешности `max_error`.
+"""
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from itertools import product
+from pathlib import Path
+from typing import Callable, Sequence
+
+from homework import Running, SportsWalking, Training
+
+MAGIC: bytes = b'CLT1'
+HEADER_SIZE = struct.Struct('<I')
+
+
+@dataclass(frozen=True)
+class Axis:
+    """Равномерная ось сетки: `count` узлов от `start` с шагом `step`."""
+    name: str
+    start: float
+    step: float
+    count: int
+
+    @property
+    def stop(self) -> float:
+        return self.start + self.step * (self.count - 1)
+
+    @classmethod
+    def between(cls, name: str, start: float, stop: float,
+                step: float) -> Axis:
+        """Ось от `start` до `stop` с шагом не больше `step`."""
+        if stop <= start or step <= 0:
+            raise ValueError(f'Неверный диапазон оси {name}')
+        count = int(-(-(stop - start) // step)) + 1
+        return cls(name, start, (stop - start) / (count - 1), count)
+
+
+def running_rate(weight: float, speed: float) -> float:
+    """Расход калорий за час бега."""
+    return ((Running.CALORIES_MEAN_SPEED_MULTIPLIER * speed
+             + Running.CALORIES_MEAN_SPEED_SHIFT)
+            * weight / Training.M_IN_KM * Training.M_IN_HOUR)
+
+
+def running_curvature(low: Sequence[float],
+                      high: Sequence[float]) -> tuple[float, ...]:
+    """Расход за час бега линеен по весу и по скорости."""
+    return (0.0, 0.0)
+
+
+def walking_rate(weight: float, height: float, speed: float) -> float:
+    """Расход калорий за час спортивной ходьбы."""
+    mean_speed = speed * SportsWalking.CALORIES_MEAN_SPEED_MULTIPLIER
+    height_in_meters = height / SportsWalking.CM_IN_METRE
+    return ((SportsWalking.CALORIES_WEIGHT_MULTIPLIER * weight
+             + (mean_speed**2 / height_in_meters)
+             * SportsWalking.CALORIES_HIEGHT_MULTIPLIER * weight)
+            * Training.M_IN_HOUR)
+
+
+def walking_curvature(low: Sequence[float],
+                      high: Sequence[float]) -> tuple[float, ...]:
+    """Наибольшие |d2f/dx2| расхода за час ходьбы в ячейке сетки."""
+    weight, speed = high[0], max(abs(low[2]), abs(high[2]))
+    height = low[1]
+    factor = (2 * SportsWalking.CALORIES_MEAN_SPEED_MULTIPLIER**2
+              * SportsWalking.CM_IN_METRE
+              * SportsWalking.CALORIES_HIEGHT_MULTIPLIER
+              * Training.M_IN_HOUR)
+    return (0.0,
+            factor * weight * speed**2 / height**3,
+            factor * weight / height)
+
+
+@dataclass(frozen=True)
+class CalorieFormula:
+    """Формула расхода за час, её оси и вторые производные."""
+    axes: tuple[str, ...]
+    rate: Callable[..., float]
+    curvature: Callable[[Sequence[float], Sequence[float]],
+                        tuple[float, ...]]
+
+
+FORMULAS: dict[str, CalorieFormula] = {
+    'RUN': CalorieFormula(('weight', 'speed'), running_rate,
+                          running_curvature),
+    'WLK': CalorieFormula(('weight', 'height', 'speed'), walking_rate,
+                          walking_curvature),
+}
+
+
+class CalorieTable:
+    """Таблица расхода калорий за час в узлах сетки."""
+
+    def __init__(self, workout_type: str, axes: Sequence[Axis],
+                 values: array | None = None,
+                 max_error: float | None = None) -> None:
+        if workout_type not in FORMULAS:
+            raise KeyError(f'Нет формулы расхода для {workout_type}')
+        self.workout_type = workout_type
+        self.formula = FORMULAS[workout_type]
+        self.axes = tuple(axes)
+        if tuple(axis.name for axis in self.axes) != self.formula.axes:
+            raise ValueError(f'Для {workout_type} нужны оси '
+                             f'{self.formula.axes}')
+        if values is None:
+            values = array('d', (
+                self.formula.rate(*point)
+                for point in product(*(self._nodes(axis)
+                                       for axis in self.axes))))
+        size = 1
+        for axis in self.axes:
+            size *= axis.count
+        if len(values) != size:
+            raise ValueError('Размер таблицы не совпадает с сеткой')
+        self.values = values
+        self._strides = self._make_strides()
+        self.max_error = (self._error_bound() if max_error is None
+                          else max_error)
+
+    @classmethod
+    def build(cls, workout_type: str,
+              **ranges: tuple[float, float, float]) -> CalorieTable:
+        """Построить таблицу по диапазонам `ось=(начало, конец, шаг)`."""
+        formula = FORMULAS[workout_type]
+        if set(ranges) != set(formula.axes):
+            raise ValueError(f'Для {workout_type} нужны оси '
+                             f'{formula.axes}')
+        return cls(workout_type, [Axis.between(name, *ranges[name])
+                                  for name in formula.axes])
+
+    @staticmethod
+    def _nodes(axis: Axis) -> list[float]:
+        return [axis.start + axis.step * index
+                for index in range(axis.count)]
+
+    def _make_strides(self) -> tuple[int, ...]:
+        strides = []
+        stride = 1
+        for axis in reversed(self.axes):
+            strides.append(stride)
+            stride *= axis.count
+        return tuple(reversed(strides))
+
+    def _error_bound(self) -> float:
+        """Граница погрешности по наибольшим вторым производным в сетке.
+
+        Шаг по каждой оси постоянный, поэтому граница для всей сетки
+        не меньше границы для любой её ячейки.
+        """
+        low = [axis.start for axis in self.axes]
+        high = [axis.stop for axis in self.axes]
+        curvature = self.formula.curvature(low, high)
+        return sum(axis.step**2 * second
+                   for axis, second in zip(self.axes, curvature)) / 8
+
+    def rate(self, *point: float) -> float:
+        """Расход калорий за час в точке; вне сетки — точный."""
+        offset = 0
+        weights = [1.0]
+        offsets = [0]
+        for axis, stride, value in zip(self.axes, self._strides, point):
+            position = (value - axis.start) / axis.step
+            if not 0 <= position <= axis.count - 1:
+                return self.formula.rate(*point)
+            index = min(int(position), axis.count - 2)
+            fraction = position - index
+            offset += index * stride
+            weights = [weight * share for weight in weights
+                       for share in (1 - fraction, fraction)]
+            offsets = [delta + step for delta in offsets
+                       for step in (0, stride)]
+        values = self.values
+        return sum(weight * values[offset + delta]
+                   for weight, delta in zip(weights, offsets))
+
+    def spent_calories(self, duration: float, **inputs: float) -> float:
+        """Потраченные калории по показателям тренировки."""
+        point = (inputs[name] for name in self.formula.axes)
+        return self.rate(*point) * duration
+
+    def training_calories(self, training: Training) -> float:
+        """Потраченные калории для объекта тренировки."""
+        inputs = {'weight': training.weight,
+                  'speed': training.get_mean_speed()}
+        if 'height' in self.formula.axes:
+            inputs['height'] = getattr(training, 'height')
+        return self.spent_calories(training.duration, **inputs)
+
+    def error_bound(self, duration: float) -> float:
+        """Наибольшая погрешность калорий внутри сетки."""
+        return self.max_error * duration
+
+    def save(self, path: str | Path) -> None:
+        """Записать таблицу в файл."""
+        header = json.dumps({
+            'workout_type': self.workout_type,
+            'axes': [[axis.name, axis.start, axis.step, axis.count]
+                     for axis in self.axes],
+            'max_error': self.max_error,
+        }).encode('utf-8')
+        values = array('d', self.values)
+        if sys.byteorder == 'big':
+            values.byteswap()
+        with open(path, 'wb') as stream:
+            stream.write(MAGIC + HEADER_SIZE.pack(len(header)) + header)
+            values.tofile(stream)
+
+    @classmethod
+    def load(cls, path: str | Path) -> CalorieTable:
+        """Прочитать таблицу из файла, записанного `save`."""
+        with open(path, 'rb') as stream:
+            if stream.read(len(MAGIC)) != MAGIC:
+                raise ValueError('Файл не является таблицей калорий')
+            size, = HEADER_SIZE.unpack(stream.read(HEADER_SIZE.size))
+            header = json.loads(stream.read(size))
+            values = array('d', stream.read())
+        if sys.byteorder == 'big':
+            values.byteswap()
+        axes = [Axis(*axis) for axis in header['axes']]
+        return cls(header['workout_type'], axes, values,
+                   header['max_error'])
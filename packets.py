@@ -0,0 +1,290 @@
+"""Потоковое чтение пакетов от блока датчиков.
+
+Пакеты читаются из файлов лениво, по одному, и отдаются в виде
+кортежей `(workout_type, data)`, которые принимает `read_package`.
+Поддерживаются форматы:
+
+- `csv` — строка `SWM,720,1,80,25,40`;
+- `jsonl` — строка `["SWM", [720, 1, 80, 25, 40]]` или
+  `{"workout_type": "SWM", "data": [720, 1, 80, 25, 40]}`;
+- `bin` — запись из кода тренировки (3 байта), числа показателей
+  (1 байт) и самих показателей (float64, little-endian);
+- `fixed` — заголовок `FIXED_MAGIC` и записи постоянной длины
+  `FIXED_RECORD`: код, число показателей и пять показателей float64
+  (недостающие — нули). Такой файл читается через `mmap` без
+  копирования, в том числе как структурированный массив NumPy.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator, TextIO
+
+from homework import parse_number
+
+Packet = tuple[str, list[float]]
+
+FORMATS: tuple[str, ...] = ('csv', 'jsonl', 'bin', 'fixed')
+EXTENSIONS: dict[str, str] = {'.csv': 'csv', '.txt': 'csv',
+                              '.jsonl': 'jsonl', '.ndjson': 'jsonl',
+                              '.json': 'jsonl', '.bin': 'bin',
+                              '.fixed': 'fixed'}
+RECORD_HEADER = struct.Struct('<3sB')
+VALUE = struct.Struct('<d')
+FIXED_MAGIC: bytes = b'FTR1'
+FIXED_VALUES: int = 5
+FIXED_RECORD = struct.Struct(f'<3sB{FIXED_VALUES}d')
+FIXED_DTYPE: list[tuple[Any, ...]] = [('code', 'S3'), ('count', 'u1'),
+                                      ('values', '<f8', (FIXED_VALUES,))]
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[Packet]:
+    """Читать пакеты из строк CSV, пропуская пустые строки."""
+    for row in csv.reader(lines):
+        if not row or not row[0].strip():
+            continue
+        yield row[0].strip(), [parse_number(value) for value in row[1:]]
+
+
+def read_jsonl(lines: Iterable[str]) -> Iterator[Packet]:
+    """Читать пакеты из строк JSON, по одному пакету в строке."""
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if isinstance(record, dict):
+            yield record['workout_type'], list(record['data'])
+        else:
+            workout_type, data = record
+            yield workout_type, list(data)
+
+
+def read_binary(stream: BinaryIO) -> Iterator[Packet]:
+    """Читать пакеты из двоичного потока."""
+    while True:
+        header = stream.read(RECORD_HEADER.size)
+        if not header:
+            return
+        if len(header) < RECORD_HEADER.size:
+            raise ValueError('Двоичный пакет обрезан')
+        code, count = RECORD_HEADER.unpack(header)
+        body = stream.read(VALUE.size * count)
+        if len(body) < VALUE.size * count:
+            raise ValueError('Двоичный пакет обрезан')
+        yield (code.decode('ascii'),
+               [value for value, in VALUE.iter_unpack(body)])
+
+
+def write_binary(packets: Iterable[Packet], stream: BinaryIO) -> int:
+    """Записать пакеты в двоичный поток, вернуть число записей."""
+    written = 0
+    for workout_type, data in packets:
+        stream.write(RECORD_HEADER.pack(workout_type.encode('ascii'),
+                                        len(data)))
+        stream.write(struct.pack(f'<{len(data)}d', *data))
+        written += 1
+    return written
+
+
+def pack_fixed(workout_type: str, data: list[float]) -> bytes:
+    """Упаковать пакет в запись постоянной длины."""
+    if len(data) > FIXED_VALUES:
+        raise ValueError(f'В записи помещается не больше {FIXED_VALUES} '
+                         f'показателей, получено {len(data)}')
+    padded = [*data, *[0.0] * (FIXED_VALUES - len(data))]
+    return FIXED_RECORD.pack(workout_type.encode('ascii'), len(data),
+                             *padded)
+
+
+def unpack_fixed(records: Any) -> Iterator[Packet]:
+    """Читать пакеты из буфера с записями постоянной длины."""
+    for code, count, *values in FIXED_RECORD.iter_unpack(records):
+        yield code.decode('ascii'), values[:count]
+
+
+def write_fixed(packets: Iterable[Packet], stream: BinaryIO) -> int:
+    """Записать заголовок и пакеты постоянной длины, вернуть их число."""
+    stream.write(FIXED_MAGIC)
+    written = 0
+    for workout_type, data in packets:
+        stream.write(pack_fixed(workout_type, data))
+        written += 1
+    return written
+
+
+def read_fixed(stream: BinaryIO) -> Iterator[Packet]:
+    """Читать записи постоянной длины из потока, где нет `mmap`."""
+    if stream.read(len(FIXED_MAGIC)) != FIXED_MAGIC:
+        raise ValueError('Файл не в формате записей постоянной длины')
+    while True:
+        chunk = stream.read(FIXED_RECORD.size * 1024)
+        if not chunk:
+            return
+        if len(chunk) % FIXED_RECORD.size:
+            raise ValueError('Запись постоянной длины обрезана')
+        yield from unpack_fixed(chunk)
+
+
+class FixedPacketFile:
+    """Файл записей постоянной длины, отображённый в память.
+
+    Записи доступны через `memoryview` без копирования: по одной
+    (`record`), итерацией в виде пакетов для `read_package`, как
+    структурированный массив NumPy (`to_numpy`) или колонками для
+    `batch.compute_batch` (`columns`).
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        with open(path, 'rb') as stream:
+            if not os.fstat(stream.fileno()).st_size:
+                raise ValueError('Файл не в формате записей постоянной '
+                                 'длины')
+            self._mmap: mmap.mmap | None = mmap.mmap(
+                stream.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        if self._view[:len(FIXED_MAGIC)] != FIXED_MAGIC:
+            self.close()
+            raise ValueError('Файл не в формате записей постоянной длины')
+        self.records = self._view[len(FIXED_MAGIC):]
+        if len(self.records) % FIXED_RECORD.size:
+            self.close()
+            raise ValueError('Запись постоянной длины обрезана')
+
+    def __enter__(self) -> FixedPacketFile:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.records) // FIXED_RECORD.size
+
+    def __iter__(self) -> Iterator[Packet]:
+        return unpack_fixed(self.records)
+
+    def record(self, index: int) -> Packet:
+        """Вернуть пакет с номером `index`."""
+        if not 0 <= index < len(self):
+            raise IndexError('Номер записи вне файла')
+        start = index * FIXED_RECORD.size
+        return next(unpack_fixed(
+            self.records[start:start + FIXED_RECORD.size]))
+
+    def to_numpy(self) -> Any:
+        """Записи как структурированный массив NumPy поверх `mmap`."""
+        import numpy
+        return numpy.frombuffer(self.records, dtype=numpy.dtype(FIXED_DTYPE))
+
+    def columns(self) -> tuple[list[str], dict[str, Any]]:
+        """Коды и колонки показателей для `batch.compute_batch`.
+
+        Четвёртый показатель — это рост для ходьбы и длина бассейна для
+        плавания, поэтому колонки `height` и `length_pool` совпадают:
+        расчёт берёт из них только строки своего вида тренировки. С
+        NumPy колонки — представления массива без копирования.
+        """
+        names = ('action', 'duration', 'weight', 'height', 'count_pool')
+        try:
+            records = self.to_numpy()
+        except ImportError:
+            codes: list[str] = []
+            values: list[list[float]] = [[] for _ in names]
+            for code, _, *row in FIXED_RECORD.iter_unpack(self.records):
+                codes.append(code.decode('ascii'))
+                for column, value in zip(values, row):
+                    column.append(value)
+            columns = dict(zip(names, values))
+        else:
+            codes = records['code'].astype('U3').tolist()
+            columns = {name: records['values'][:, index]
+                       for index, name in enumerate(names)}
+        columns['length_pool'] = columns['height']
+        return codes, columns
+
+    def close(self) -> None:
+        """Отпустить отображение файла.
+
+        Отображение закрывается, когда исчезнет последнее представление
+        записей: массивы `to_numpy` и `columns` и начатые итераторы
+        остаются рабочими и после `close`.
+        """
+        self.records = self._view = memoryview(b'')
+        self._mmap = None
+
+
+def detect_format(path: str | Path) -> str:
+    """Определить формат файла с пакетами по расширению."""
+    suffix = Path(path).suffix.lower()
+    if suffix not in EXTENSIONS:
+        raise ValueError(f'Неизвестный формат файла пакетов: {path}')
+    return EXTENSIONS[suffix]
+
+
+def read_stream(stream: TextIO | BinaryIO, fmt: str) -> Iterator[Packet]:
+    """Читать пакеты из открытого потока в заданном формате."""
+    if fmt == 'csv':
+        return read_csv(stream)
+    if fmt == 'jsonl':
+        return read_jsonl(stream)
+    if fmt == 'bin':
+        return read_binary(stream)
+    if fmt == 'fixed':
+        return read_fixed(stream)
+    raise ValueError(f'Неизвестный формат пакетов: {fmt}')
+
+
+def read_file(path: str | Path, fmt: str | None = None) -> Iterator[Packet]:
+    """Лениво читать пакеты из файла; `-` означает стандартный ввод."""
+    if str(path) == '-':
+        fmt = fmt or 'csv'
+        binary = fmt in ('bin', 'fixed')
+        stream = sys.stdin.buffer if binary else sys.stdin
+        yield from read_stream(stream, fmt)
+        return
+    fmt = fmt or detect_format(path)
+    if fmt == 'fixed':
+        with FixedPacketFile(path) as packets:
+            yield from packets
+    elif fmt == 'bin':
+        with open(path, 'rb') as stream:
+            yield from read_stream(stream, fmt)
+    else:
+        with open(path, encoding='utf-8', newline='') as stream:
+            yield from read_stream(stream, fmt)
+
+
+def read_files(paths: Iterable[str | Path],
+               fmt: str | None = None) -> Iterator[Packet]:
+    """Лениво читать пакеты из нескольких файлов подряд."""
+    for path in paths:
+        yield from read_file(path, fmt)
+
+
+def convert(sources: Iterable[str | Path], destination: str | Path,
+            fmt: str | None = None) -> int:
+    """Переписать пакеты из файлов в файл записей постоянной длины."""
+    with open(destination, 'wb') as stream:
+        return write_fixed(read_files(sources, fmt), stream)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Перевести файлы пакетов в формат записей постоянной '
+                    'длины для чтения через mmap.')
+    parser.add_argument('sources', nargs='+')
+    parser.add_argument('-o', '--output', required=True)
+    parser.add_argument('-f', '--format', choices=FORMATS)
+    args = parser.parse_args()
+    written = convert(args.sources, args.output, args.format)
+    print(f'Записано пакетов: {written}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Параллельная обработка пакетов в нескольких процессах.
+
+Пакеты делятся на куски по `chunk_size` и отправляются в
+`ProcessPoolExecutor`, чтобы сериализация шла кусками, а не поштучно.
+В процессах-обработчиках вызываются `read_package` и
+`show_training_info`, обратно возвращаются объекты `InfoMessage`.
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import (FIRST_COMPLETED, Future,
+                                ProcessPoolExecutor, as_completed, wait)
+from itertools import islice
+from typing import Iterable, Iterator, Sequence
+
+from homework import InfoMessage, read_package
+
+Packet = tuple[str, Sequence[float]]
+
+
+def process_chunk(chunk: list[Packet]) -> list[InfoMessage]:
+    """Обработать кусок пакетов в процессе-обработчике."""
+    return [read_package(workout_type, data).show_training_info()
+            for workout_type, data in chunk]
+
+
+def chunked(packets: Iterable[Packet],
+            chunk_size: int) -> Iterator[list[Packet]]:
+    """Разбить пакеты на списки длиной `chunk_size`."""
+    iterator = iter(packets)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def process_packets_parallel(packets: Iterable[Packet],
+                             workers: int | None = None,
+                             chunk_size: int = 1000,
+                             ordered: bool = True,
+                             ) -> Iterator[InfoMessage]:
+    """Обработать пакеты в `workers` процессах.
+
+    Результаты возвращаются в порядке пакетов, а при `ordered=False` —
+    в порядке готовности кусков, что быстрее при неравных кусках.
+    Одновременно в работе не больше `2 * workers` кусков, поэтому
+    пакеты можно передавать ленивым итератором.
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size должен быть положительным')
+    workers = workers or os.cpu_count() or 1
+    limit = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = chunked(packets, chunk_size)
+        if ordered:
+            pending: list[Future[list[InfoMessage]]] = []
+            for chunk in chunks:
+                pending.append(executor.submit(process_chunk, chunk))
+                if len(pending) >= limit:
+                    yield from pending.pop(0).result()
+            for future in pending:
+                yield from future.result()
+            return
+        running: set[Future[list[InfoMessage]]] = set()
+        for chunk in chunks:
+            running.add(executor.submit(process_chunk, chunk))
+            if len(running) >= limit:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        for future in as_completed(running):
+            yield from future.result()
@@ -0,0 +1,224 @@
+"""Профилирование этапов расчёта тренировок.
+
+`Profiler.enable()` подменяет `read_package`, методы `get_*` и
+`show_training_info` классов тренировок и `InfoMessage.get_message`
+обёртками, которые считают вызовы и время, и отключает ядра классов
+тренировок, чтобы показатели считались методами. `disable()`
+возвращает исходные функции и ядра, поэтому выключенный профилировщик
+ничего не стоит.
+Время вложенных вызовов входит во время вызывающего этапа.
+"""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+
+import homework
+
+BUCKETS: tuple[float, ...] = (1e-7, 2.5e-7, 5e-7, 1e-6, 2.5e-6, 5e-6,
+                              1e-5, 2.5e-5, 5e-5, 1e-4, 1e-3, 1e-2, 1e-1)
+METHODS: tuple[str, ...] = ('get_distance', 'get_mean_speed',
+                            'get_spent_calories', 'show_training_info')
+METRIC: str = 'fitness_stage_seconds'
+
+
+@dataclass
+class StageStats:
+    """Число вызовов, суммарное время и гистограмма задержек этапа."""
+    buckets: tuple[float, ...] = BUCKETS
+    calls: int = 0
+    total: float = 0.0
+    counts: list[int] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    @property
+    def mean(self) -> float:
+        """Среднее время вызова в секундах."""
+        return self.total / self.calls if self.calls else 0.0
+
+    def record(self, elapsed: float) -> None:
+        """Учесть один вызов длительностью `elapsed` секунд."""
+        self.calls += 1
+        self.total += elapsed
+        self.counts[bisect_left(self.buckets, elapsed)] += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {'calls': self.calls, 'total': self.total, 'mean': self.mean,
+                'buckets': dict(zip([*map(str, self.buckets), '+Inf'],
+                                    self.counts))}
+
+
+class Profiler:
+    """Сборщик статистики по этапам расчёта."""
+
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS) -> None:
+        self.buckets = buckets
+        self.stages: dict[str, StageStats] = {}
+        self._originals: list[tuple[Any, str, Any]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._originals)
+
+    def record(self, stage: str, elapsed: float) -> None:
+        """Учесть вызов этапа `stage` длительностью `elapsed` секунд."""
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats(self.buckets)
+            stats.record(elapsed)
+
+    def _timed(self, func: Callable[..., Any],
+               stage: Callable[..., str]) -> Callable[..., Any]:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(stage(*args),
+                            time.perf_counter() - started)
+        return wrapper
+
+    def _patch(self, owner: Any, name: str,
+               stage: Callable[..., str]) -> None:
+        original = owner.__dict__[name]
+        self._originals.append((owner, name, original))
+        setattr(owner, name, self._timed(original, stage))
+
+    def enable(self) -> Profiler:
+        """Подменить этапы расчёта обёртками с замером времени."""
+        if self.enabled:
+            return self
+        self._patch(homework, 'read_package',
+                    lambda *args: 'read_package')
+        classes = {homework.Training, *homework.TRAININGS.values()}
+        for training_class in classes:
+            for name in METHODS:
+                if name in training_class.__dict__:
+                    self._patch(training_class, name, self._method_stage(name))
+            if training_class.__dict__.get('_kernel') is not None:
+                self._originals.append(
+                    (training_class, '_kernel',
+                     training_class.__dict__['_kernel']))
+                training_class._kernel = None
+        self._patch(homework.InfoMessage, 'get_message',
+                    lambda *args: 'InfoMessage.get_message')
+        return self
+
+    @staticmethod
+    def _method_stage(name: str) -> Callable[..., str]:
+        return lambda training, *args: f'{type(training).__name__}.{name}'
+
+    def disable(self) -> None:
+        """Вернуть исходные функции."""
+        while self._originals:
+            owner, name, original = self._originals.pop()
+            setattr(owner, name, original)
+
+    def __enter__(self) -> Profiler:
+        return self.enable()
+
+    def __exit__(self, *args: Any) -> None:
+        self.disable()
+
+    def reset(self) -> None:
+        """Сбросить собранную статистику."""
+        with self._lock:
+            self.stages.clear()
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {stage: stats.to_dict()
+                    for stage, stats in sorted(self.stages.items())}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Статистика в текстовом формате Prometheus."""
+        lines = [f'# HELP {METRIC} Время этапов расчёта тренировок.',
+                 f'# TYPE {METRIC} histogram']
+        for stage, stats in self.to_dict().items():
+            label = f'stage="{stage}"'
+            cumulative = 0
+            for bound, count in stats['buckets'].items():
+                cumulative += count
+                lines.append(f'{METRIC}_bucket{{{label},le="{bound}"}} '
+                             f'{cumulative}')
+            lines.append(f'{METRIC}_sum{{{label}}} {stats["total"]!r}')
+            lines.append(f'{METRIC}_count{{{label}}} {stats["calls"]}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> str:
+        """Таблица этапов по убыванию суммарного времени."""
+        rows = sorted(self.to_dict().items(),
+                      key=lambda item: item[1]['total'], reverse=True)
+        lines = [f'{"этап":<34} {"вызовов":>10} {"всего, с":>10} '
+                 f'{"среднее, мкс":>13}']
+        for stage, stats in rows:
+            lines.append(f'{stage:<34} {stats["calls"]:>10} '
+                         f'{stats["total"]:>10.4f} '
+                         f'{stats["mean"] * 1e6:>13.3f}')
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path: str) -> None:
+        """Записать статистику: `.json`, `.prom` или таблица; `-` — stderr."""
+        if path.endswith('.json'):
+            text = self.to_json()
+        elif path.endswith('.prom'):
+            text = self.to_prometheus()
+        else:
+            text = self.summary()
+        if path == '-':
+            sys.stderr.write(text)
+            return
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(text)
+
+    def serve(self, host: str = '127.0.0.1',
+              port: int = 0) -> ThreadingHTTPServer:
+        """Отдавать статистику по HTTP в фоновом потоке.
+
+        `/metrics` — формат Prometheus, `/json` — JSON. Сервер
+        останавливается вызовом `shutdown()`.
+        """
+        profiler = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path == '/metrics':
+                    body = profiler.to_prometheus()
+                    content_type = 'text/plain; version=0.0.4'
+                elif self.path == '/json':
+                    body = profiler.to_json()
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type',
+                                 f'{content_type}; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        http_server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=http_server.serve_forever,
+                         daemon=True).start()
+        return http_server
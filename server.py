@@ -0,0 +1,233 @@
+"""Сервер asyncio для пакетов, поступающих от устройств в реальном времени.
+
+Устройство присылает пакеты строками в формате CSV
+(`SWM,720,1,80,25,40`), сервер отвечает строкой `get_message()`
+или строкой с ошибкой, начинающейся с `ERROR_PREFIX`. В одной строке
+можно прислать несколько пакетов через `BATCH_SEPARATOR` — ответы
+на них приходят отдельными строками в том же порядке и пишутся
+в сокет одним вызовом.
+
+Запуск: `python server.py --port 8765` или `python server.py --unix путь`.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import signal
+from typing import Iterable, Sequence
+
+from daemon import split_batches
+from homework import read_package
+from packets import read_csv
+
+ERROR_PREFIX: str = 'Ошибка: '
+MAX_LINE: int = 4096
+BATCH_SEPARATOR: str = ';'
+
+
+def handle_line(line: str) -> str:
+    """Обработать строку с пакетом и вернуть строку ответа."""
+    try:
+        parsed = list(read_csv([line]))
+        if len(parsed) != 1:
+            raise ValueError('пустой пакет')
+        workout_type, data = parsed[0]
+        return read_package(workout_type, data).show_training_info(
+        ).get_message()
+    except (KeyError, TypeError, ValueError, ArithmeticError) as error:
+        return f'{ERROR_PREFIX}{error!r}'
+
+
+def handle_batch(line: str) -> str:
+    """Обработать строку с пакетами через `BATCH_SEPARATOR`.
+
+    Возвращает ответы на пакеты, по строке на каждый.
+    """
+    return '\n'.join(map(handle_line, line.split(BATCH_SEPARATOR)))
+
+
+class PacketServer:
+    """Сервер пакетов с ограничением числа одновременных соединений.
+
+    Соединения сверх `max_connections` ждут своей очереди. Ответ
+    пишется с ожиданием `drain()`, поэтому медленный клиент не копит
+    ответы в памяти сервера.
+    """
+
+    def __init__(self, max_connections: int = 100,
+                 max_line: int = MAX_LINE) -> None:
+        self.max_line = max_line
+        self._slots = asyncio.Semaphore(max_connections)
+        self._server: asyncio.AbstractServer | None = None
+        self._busy: dict[asyncio.Task[None], bool] = {}
+
+    async def start_tcp(self, host: str = '127.0.0.1',
+                        port: int = 0) -> asyncio.AbstractServer:
+        """Начать принимать соединения по TCP."""
+        self._server = await asyncio.start_server(
+            self._handle, host, port, limit=self.max_line)
+        return self._server
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        """Начать принимать соединения через Unix-сокет."""
+        self._server = await asyncio.start_unix_server(
+            self._handle, path, limit=self.max_line)
+        return self._server
+
+    @property
+    def address(self) -> tuple[str, int] | str:
+        """Адрес, на котором слушает сервер."""
+        if self._server is None:
+            raise RuntimeError('Сервер не запущен')
+        return self._server.sockets[0].getsockname()
+
+    async def _handle(self, reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._busy[task] = False
+        try:
+            async with self._slots:
+                await self._serve(reader, writer, task)
+        except (asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            self._busy.pop(task, None)
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter,
+                     task: asyncio.Task[None]) -> None:
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                writer.write(f'{ERROR_PREFIX}слишком длинный пакет\n'
+                             .encode())
+                await writer.drain()
+                return
+            if not line:
+                return
+            self._busy[task] = True
+            reply = handle_batch(line.decode('utf-8', errors='replace'))
+            writer.write(reply.encode() + b'\n')
+            await writer.drain()
+            self._busy[task] = False
+
+    async def shutdown(self, timeout: float = 5.0) -> None:
+        """Остановить сервер, дождавшись ответов на принятые пакеты.
+
+        Простаивающие соединения закрываются сразу, занятые получают
+        `timeout` секунд на то, чтобы дописать ответ.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task, busy in list(self._busy.items()):
+            if not busy:
+                task.cancel()
+        tasks = list(self._busy)
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+class PacketClient:
+    """Клиент сервера пакетов."""
+
+    def __init__(self, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host: str, port: int) -> PacketClient:
+        """Подключиться к серверу по TCP."""
+        return cls(*await asyncio.open_connection(host, port))
+
+    @classmethod
+    async def connect_unix(cls, path: str) -> PacketClient:
+        """Подключиться к серверу через Unix-сокет."""
+        return cls(*await asyncio.open_unix_connection(path))
+
+    async def send(self, workout_type: str, data: Sequence[float]) -> str:
+        """Отправить пакет и дождаться ответа сервера."""
+        line = ','.join([workout_type, *map(str, data)])
+        self.writer.write(line.encode() + b'\n')
+        await self.writer.drain()
+        reply = await self.reader.readline()
+        if not reply:
+            raise ConnectionError('Сервер закрыл соединение')
+        return reply.decode().rstrip('\n')
+
+    async def send_many(self, packages: Iterable[tuple[str, Sequence[float]]],
+                        batch_size: int = 100,
+                        max_line: int = MAX_LINE) -> list[str]:
+        """Отправить пакеты по `batch_size` в строке, не дожидаясь ответов.
+
+        Строка не длиннее `max_line` байт (см. `daemon.split_batches`).
+        Ответы читаются одновременно с отправкой, чтобы ни клиент,
+        ни сервер не упёрлись в заполненный буфер сокета.
+        """
+        lines = [','.join([workout_type, *map(str, data)])
+                 for workout_type, data in packages]
+        replies = asyncio.ensure_future(self._read_replies(len(lines)))
+        try:
+            for batch in split_batches(lines, batch_size, max_line):
+                self.writer.write(
+                    BATCH_SEPARATOR.join(batch).encode() + b'\n')
+                await self.writer.drain()
+        except BaseException:
+            replies.cancel()
+            raise
+        return await replies
+
+    async def _read_replies(self, count: int) -> list[str]:
+        replies = []
+        for _ in range(count):
+            reply = await self.reader.readline()
+            if not reply:
+                raise ConnectionError('Сервер закрыл соединение')
+            replies.append(reply.decode().rstrip('\n'))
+        return replies
+
+    async def close(self) -> None:
+        """Закрыть соединение."""
+        self.writer.close()
+        with contextlib.suppress(ConnectionError):
+            await self.writer.wait_closed()
+
+
+async def serve(args: argparse.Namespace) -> None:
+    """Работать до сигнала SIGINT/SIGTERM, затем остановиться."""
+    server = PacketServer(args.max_connections)
+    if args.unix:
+        await server.start_unix(args.unix)
+    else:
+        await server.start_tcp(args.host, args.port)
+    print(f'Сервер слушает {server.address}', flush=True)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    await stop.wait()
+    await server.shutdown(args.shutdown_timeout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='путь к Unix-сокету вместо TCP')
+    parser.add_argument('--max-connections', type=int, default=100)
+    parser.add_argument('--shutdown-timeout', type=float, default=5.0)
+    asyncio.run(serve(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
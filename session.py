@@ -0,0 +1,110 @@
+"""Показатели тренировки в реальном времени по замерам датчиков.
+
+Устройство присылает замеры раз в несколько секунд: сколько прошло
+времени, сколько сделано шагов или гребков и (для плавания) сколько
+проплыто бассейнов. `TrainingSession` копит суммы и после каждого
+замера за постоянное время возвращает дистанцию, среднюю скорость,
+потраченные калории и скорость за последние `window` секунд.
+
+Итоги считаются тем же классом тренировки из `TRAININGS` по накопленным
+показателям, поэтому совпадают с расчётом по целой тренировке.
+"""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+
+from homework import TRAINING_FIELDS, TRAININGS, InfoMessage, Training
+
+SEC_IN_HOUR: int = 3600
+ACCUMULATED: tuple[str, ...] = ('action', 'duration', 'count_pool')
+
+
+@dataclass(frozen=True, slots=True)
+class SessionPoint:
+    """Показатели тренировки после очередного замера."""
+    elapsed: float
+    distance: float
+    mean_speed: float
+    calories: float
+    window_speed: float
+
+
+class TrainingSession:
+    """Тренировка, показатели которой обновляются по замерам.
+
+    Постоянные показатели пакета (вес, рост, длина бассейна)
+    передаются именованными аргументами, накапливаемые — `action`,
+    длительность и `count_pool` — приходят в замерах.
+    """
+
+    def __init__(self, workout_type: str, window: float = 60.0,
+                 **constants: float) -> None:
+        if workout_type not in TRAININGS:
+            raise KeyError('Код тренировки не существует')
+        fields = TRAINING_FIELDS[workout_type]
+        required = {name for name in fields if name not in ACCUMULATED}
+        if set(constants) != required:
+            raise ValueError(f'Для {workout_type} нужны показатели '
+                             f'{sorted(required)}, получены '
+                             f'{sorted(constants)}')
+        if window <= 0:
+            raise ValueError('Окно скорости должно быть положительным')
+        self.workout_type = workout_type
+        self.training_class: type[Training] = TRAININGS[workout_type]
+        self.fields = fields
+        self.constants = constants
+        self.window = window
+        self.seconds = 0.0
+        self.action = 0.0
+        self.count_pool = 0.0
+        self._recent: deque[tuple[float, float]] = deque()
+        self._recent_seconds = 0.0
+        self._recent_distance = 0.0
+
+    def _step_distance(self, action: float, count_pool: float) -> float:
+        """Дистанция замера в км, по которой считается скорость."""
+        if 'count_pool' in self.fields:
+            return (self.constants['length_pool'] * count_pool
+                    / Training.M_IN_KM)
+        return action * self.training_class.LEN_STEP / Training.M_IN_KM
+
+    def add_sample(self, seconds: float, action: float,
+                   count_pool: float = 0) -> SessionPoint:
+        """Учесть замер за `seconds` секунд и вернуть показатели."""
+        if seconds <= 0:
+            raise ValueError('Длительность замера должна быть '
+                             'положительной')
+        self.seconds += seconds
+        self.action += action
+        self.count_pool += count_pool
+        step = self._step_distance(action, count_pool)
+        self._recent.append((seconds, step))
+        self._recent_seconds += seconds
+        self._recent_distance += step
+        while self._recent_seconds - self._recent[0][0] >= self.window:
+            old_seconds, old_step = self._recent.popleft()
+            self._recent_seconds -= old_seconds
+            self._recent_distance -= old_step
+        training = self.training()
+        return SessionPoint(self.seconds, training.get_distance(),
+                            training.get_mean_speed(),
+                            training.get_spent_calories(),
+                            self.window_speed())
+
+    def window_speed(self) -> float:
+        """Средняя скорость за последние `window` секунд, км/ч."""
+        if not self._recent_seconds:
+            return 0.0
+        return self._recent_distance / (self._recent_seconds / SEC_IN_HOUR)
+
+    def training(self) -> Training:
+        """Тренировка с показателями, накопленными к этому моменту."""
+        values = {'action': self.action,
+                  'duration': self.seconds / SEC_IN_HOUR,
+                  'count_pool': self.count_pool, **self.constants}
+        return self.training_class(*(values[name] for name in self.fields))
+
+    def show_training_info(self) -> InfoMessage:
+        """Вернуть информационное сообщение о тренировке на этот момент."""
+        return self.training().show_training_info()
@@ -0,0 +1,100 @@
+"""Общий вывод сообщений для нескольких потоков-производителей.
+
+Потоки отдают сообщения в `MessageSink.submit`, который только
+кладёт их в очередь `queue.SimpleQueue`. Пишет в поток вывода один
+поток-писатель: он собирает сообщения пачками по `batch_size` и
+сбрасывает их не реже чем раз в `flush_interval` секунд. Очередь
+общая и упорядоченная, поэтому сообщения одного производителя
+выводятся в том порядке, в котором он их отдал, а строки разных
+производителей не перемешиваются.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Any, Iterable, TextIO
+
+from homework import InfoMessage, write_messages
+
+Message = InfoMessage | tuple[Any, ...]
+
+_STOP = object()
+
+
+class MessageSink:
+    """Очередь сообщений с единственным потоком-писателем."""
+
+    def __init__(self, stream: TextIO, batch_size: int = 1024,
+                 flush_interval: float = 0.1) -> None:
+        if batch_size < 1:
+            raise ValueError('batch_size должен быть положительным')
+        self.stream = stream
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.error: BaseException | None = None
+        self._queue: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop,
+                                        name='message-sink', daemon=True)
+        self._writer.start()
+
+    def submit(self, message: Message) -> None:
+        """Отдать сообщение на вывод."""
+        if self._closed:
+            raise RuntimeError('Вывод сообщений закрыт')
+        if self.error is not None:
+            raise RuntimeError('Ошибка записи сообщений') from self.error
+        self._queue.put(message)
+
+    def submit_many(self, messages: Iterable[Message]) -> None:
+        """Отдать на вывод несколько сообщений подряд."""
+        for message in messages:
+            self.submit(message)
+
+    def close(self) -> None:
+        """Дописать все отданные сообщения и остановить писателя."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._writer.join()
+        if self.error is not None:
+            raise RuntimeError('Ошибка записи сообщений') from self.error
+
+    def __enter__(self) -> MessageSink:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _write_loop(self) -> None:
+        batch: list[Message] = []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(
+                    timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                stopping = True
+            elif item is not None:
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+            if batch or stopping:
+                self._flush(batch)
+                batch = []
+            deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, batch: list[Message]) -> None:
+        if self.error is not None:
+            return
+        try:
+            self.written += write_messages(batch, self.stream,
+                                           self.batch_size)
+            self.stream.flush()
+        except BaseException as error:
+            self.error = error
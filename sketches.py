@@ -0,0 +1,343 @@
+"""Приближённые квантили и гистограммы показателей тренировок.
+
+Точные перцентили требуют хранить и сортировать все значения. Здесь
+каждое значение учитывается за постоянное (в среднем) время в
+структурах фиксированного размера:
+
+* `TDigest` — t-digest (вариант со слиянием): значения копятся в
+  буфере и вливаются в центроиды, число которых ограничено
+  `compression`. Точность выше всего на краях распределения, то есть
+  для p95 и p99;
+* `Histogram` — счётчики по заданным границам корзин.
+
+Обе структуры складываются `merge`, так что сводки, собранные в
+разных процессах (и переданные через pickle), объединяются без
+потери точности. `WorkoutStats` ведёт их по видам тренировок.
+"""
+from __future__ import annotations
+
+import math
+from bisect import bisect_right
+from typing import Iterable, Mapping, Sequence
+
+from homework import InfoMessage, Training
+
+SKETCH_METRICS: tuple[str, ...] = ('speed', 'calories')
+QUANTILES: tuple[float, ...] = (0.5, 0.95, 0.99)
+
+
+class TDigest:
+    """Сжатое представление распределения для оценки квантилей."""
+
+    __slots__ = ('compression', 'buffer_size', 'means', 'weights',
+                 'total', 'min', 'max', '_buffer')
+
+    def __init__(self, compression: float = 200,
+                 buffer_size: int | None = None) -> None:
+        if compression < 10:
+            raise ValueError('compression должен быть не меньше 10')
+        self.compression = compression
+        self.buffer_size = buffer_size or int(compression) * 10
+        self.means: list[float] = []
+        self.weights: list[float] = []
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: list[float] = []
+
+    def __len__(self) -> int:
+        """Число учтённых значений."""
+        return int(self.total) + len(self._buffer)
+
+    def add(self, value: float) -> None:
+        """Учесть значение."""
+        buffer = self._buffer
+        buffer.append(value)
+        if len(buffer) >= self.buffer_size:
+            self._compress()
+
+    def extend(self, values: Iterable[float]) -> None:
+        """Учесть несколько значений."""
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: TDigest) -> None:
+        """Добавить распределение, собранное другим дайджестом."""
+        other._compress()
+        self._compress(other)
+
+    def _compress(self, other: TDigest | None = None) -> None:
+        """Влить буфер и центроиды дайджеста `other` в свои центроиды.
+
+        Соседние центроиды объединяются, пока вес объединённого не
+        выходит за предел масштабной функции k1: у краёв предел мал,
+        и крайние квантили остаются почти точными.
+        """
+        buffer = self._buffer
+        if not buffer and (other is None or not other.means):
+            return
+        points = [*zip(self.means, self.weights),
+                  *zip(buffer, [1.0] * len(buffer))]
+        total = self.total + len(buffer)
+        if buffer:
+            self.min = min(self.min, min(buffer))
+            self.max = max(self.max, max(buffer))
+            buffer.clear()
+        if other is not None and other.means:
+            points.extend(zip(other.means, other.weights))
+            total += other.total
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        points.sort()
+        self.total = total
+        scale = self.compression / (2 * math.pi)
+        half = self.compression / 4
+        new_means: list[float] = []
+        new_weights: list[float] = []
+        mean, weight = points[0]
+        done = 0.0
+        limit = total * _next_quantile(0.0, scale, half)
+        for point_mean, point_weight in points[1:]:
+            if done + weight + point_weight <= limit:
+                weight += point_weight
+                mean += (point_mean - mean) * point_weight / weight
+            else:
+                new_means.append(mean)
+                new_weights.append(weight)
+                done += weight
+                limit = total * _next_quantile(done / total, scale, half)
+                mean, weight = point_mean, point_weight
+        new_means.append(mean)
+        new_weights.append(weight)
+        self.means = new_means
+        self.weights = new_weights
+
+    def quantile(self, q: float) -> float:
+        """Оценка квантиля `q` из `[0, 1]`; nan, если значений нет."""
+        if not 0 <= q <= 1:
+            raise ValueError('Квантиль должен быть от 0 до 1')
+        self._compress()
+        means, weights = self.means, self.weights
+        if not means:
+            return math.nan
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+        index = q * self.total
+        done = weights[0] / 2
+        if index < done:
+            if weights[0] == 1:
+                return means[0]
+            return self.min + (means[0] - self.min) * index / done
+        for position in range(len(means) - 1):
+            step = (weights[position] + weights[position + 1]) / 2
+            if done + step > index:
+                left, right = means[position], means[position + 1]
+                return left + (right - left) * (index - done) / step
+            done += step
+        if weights[-1] == 1:
+            return means[-1]
+        tail = weights[-1] / 2
+        return means[-1] + (self.max - means[-1]) * min(
+            1.0, (index - done) / tail)
+
+    def quantiles(self, qs: Iterable[float] = QUANTILES
+                  ) -> dict[float, float]:
+        """Оценки нескольких квантилей."""
+        return {q: self.quantile(q) for q in qs}
+
+
+def _next_quantile(q: float, scale: float, half: float) -> float:
+    """Доля, до которой можно копить центроид, начатый на доле `q`."""
+    k = scale * math.asin(2 * q - 1) + 1
+    if k >= half:
+        return 1.0
+    return (math.sin(k / scale) + 1) / 2
+
+
+def linear_edges(low: float, high: float, count: int) -> tuple[float, ...]:
+    """Границы `count` равных корзин от `low` до `high`."""
+    step = (high - low) / count
+    return tuple(low + step * index for index in range(count + 1))
+
+
+def geometric_edges(low: float, high: float,
+                    count: int) -> tuple[float, ...]:
+    """Границы `count` корзин, ширина которых растёт в одно число раз."""
+    if low <= 0:
+        raise ValueError('Нижняя граница должна быть положительной')
+    ratio = (high / low) ** (1 / count)
+    return tuple(low * ratio ** index for index in range(count + 1))
+
+
+class Histogram:
+    """Счётчики значений по корзинам с заданными границами.
+
+    `counts[0]` — значения меньше первой границы, `counts[-1]` — не
+    меньше последней; корзина `i` — полуинтервал
+    `[edges[i - 1], edges[i])`.
+    """
+
+    __slots__ = ('edges', 'counts')
+
+    def __init__(self, edges: Iterable[float]) -> None:
+        self.edges = tuple(edges)
+        if not self.edges or any(
+                left >= right
+                for left, right in zip(self.edges, self.edges[1:])):
+            raise ValueError('Границы корзин должны строго возрастать')
+        self.counts = [0] * (len(self.edges) + 1)
+
+    def __len__(self) -> int:
+        """Число учтённых значений."""
+        return sum(self.counts)
+
+    def add(self, value: float) -> None:
+        """Учесть значение."""
+        self.counts[bisect_right(self.edges, value)] += 1
+
+    def extend(self, values: Iterable[float]) -> None:
+        """Учесть несколько значений."""
+        counts, edges = self.counts, self.edges
+        for value in values:
+            counts[bisect_right(edges, value)] += 1
+
+    def merge(self, other: Histogram) -> None:
+        """Добавить счётчики гистограммы с теми же границами."""
+        if other.edges != self.edges:
+            raise ValueError('Гистограммы собраны по разным границам')
+        self.counts = [mine + theirs
+                       for mine, theirs in zip(self.counts, other.counts)]
+
+    def quantile(self, q: float) -> float:
+        """Оценка квантиля с линейной интерполяцией внутри корзины.
+
+        Значения за крайними границами оцениваются этими границами.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError('Квантиль должен быть от 0 до 1')
+        total = len(self)
+        if not total:
+            return math.nan
+        index = q * total
+        done = 0
+        edges = self.edges
+        for position, count in enumerate(self.counts):
+            if count and done + count >= index:
+                if position == 0:
+                    return edges[0]
+                if position == len(edges):
+                    return edges[-1]
+                left, right = edges[position - 1], edges[position]
+                return left + (right - left) * (index - done) / count
+            done += count
+        return edges[-1]
+
+
+HISTOGRAM_EDGES: dict[str, tuple[float, ...]] = {
+    'duration': linear_edges(0, 24, 96),
+    'distance': geometric_edges(0.01, 1000, 100),
+    'speed': geometric_edges(0.01, 100, 100),
+    'calories': geometric_edges(0.1, 100_000, 120),
+}
+
+
+class WorkoutStats:
+    """Квантили и гистограммы показателей по видам тренировок.
+
+    `metrics` — поля `InfoMessage`; гистограммы ведутся для тех из них,
+    для которых в `edges` заданы границы.
+    """
+
+    def __init__(self, metrics: Sequence[str] = SKETCH_METRICS,
+                 compression: float = 200,
+                 edges: Mapping[str, Iterable[float]] | None = None) -> None:
+        self.metrics = tuple(metrics)
+        self.compression = compression
+        self.edges = {metric: tuple(bounds) for metric, bounds in (
+            HISTOGRAM_EDGES if edges is None else edges).items()}
+        self.digests: dict[tuple[str, str], TDigest] = {}
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        self._sketches: dict[str, list[tuple[str, TDigest,
+                                             Histogram | None]]] = {}
+
+    def _add_type(self, training_type: str
+                  ) -> list[tuple[str, TDigest, Histogram | None]]:
+        sketches = []
+        for metric in self.metrics:
+            key = (training_type, metric)
+            digest = self.digests[key] = TDigest(self.compression)
+            histogram = None
+            if metric in self.edges:
+                histogram = self.histograms[key] = Histogram(
+                    self.edges[metric])
+            sketches.append((metric, digest, histogram))
+        self._sketches[training_type] = sketches
+        return sketches
+
+    def add(self, result: InfoMessage | Training) -> None:
+        """Учесть одну тренировку."""
+        if isinstance(result, Training):
+            result = result.show_training_info()
+        sketches = self._sketches.get(result.training_type)
+        if sketches is None:
+            sketches = self._add_type(result.training_type)
+        for metric, digest, histogram in sketches:
+            value = getattr(result, metric)
+            digest.add(value)
+            if histogram is not None:
+                histogram.add(value)
+
+    def extend(self, results: Iterable[InfoMessage | Training]) -> None:
+        """Учесть несколько тренировок."""
+        for result in results:
+            self.add(result)
+
+    def merge(self, other: WorkoutStats) -> None:
+        """Добавить сводки, собранные по тем же показателям и границам."""
+        if (other.metrics, other.edges) != (self.metrics, self.edges):
+            raise ValueError('Сводки собраны по разным показателям')
+        for training_type in other._sketches:
+            if training_type not in self._sketches:
+                self._add_type(training_type)
+        for key, digest in other.digests.items():
+            self.digests[key].merge(digest)
+        for key, histogram in other.histograms.items():
+            self.histograms[key].merge(histogram)
+
+    def training_types(self) -> list[str]:
+        """Виды тренировок, по которым есть сводки."""
+        return list(self._sketches)
+
+    def digest(self, metric: str,
+               training_type: str | None = None) -> TDigest:
+        """Дайджест показателя вида тренировок; `None` — всех видов."""
+        if metric not in self.metrics:
+            raise ValueError(f'Показатель {metric} не собирается')
+        if training_type is not None:
+            digest = self.digests.get((training_type, metric))
+            return digest if digest is not None else TDigest(
+                self.compression)
+        combined = TDigest(self.compression)
+        for name in self._sketches:
+            combined.merge(self.digests[name, metric])
+        return combined
+
+    def histogram(self, metric: str,
+                  training_type: str | None = None) -> Histogram:
+        """Гистограмма показателя вида тренировок; `None` — всех видов."""
+        if metric not in self.metrics or metric not in self.edges:
+            raise ValueError(f'Гистограмма {metric} не собирается')
+        combined = Histogram(self.edges[metric])
+        for name in ([training_type] if training_type is not None
+                     else self._sketches):
+            histogram = self.histograms.get((name, metric))
+            if histogram is not None:
+                combined.merge(histogram)
+        return combined
+
+    def quantiles(self, metric: str, training_type: str | None = None,
+                  qs: Iterable[float] = QUANTILES) -> dict[float, float]:
+        """Оценки квантилей показателя, например p50/p95/p99 скорости."""
+        return self.digest(metric, training_type).quantiles(qs)
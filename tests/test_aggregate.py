@@ -0,0 +1,94 @@
+from dataclasses import asdict
+from datetime import date, datetime
+
+import pytest
+
+import homework
+from aggregate import Aggregator, Totals, period_start
+
+RESULTS = [
+    ('anna', ('RUN', [15000, 1, 75]), date(2024, 3, 4)),
+    ('anna', ('RUN', [9000, 1.5, 75]), date(2024, 3, 6)),
+    ('anna', ('SWM', [720, 1, 80, 25, 40]), datetime(2024, 3, 11, 7, 30)),
+    ('oleg', ('WLK', [9000, 1, 75, 180]), date(2024, 4, 1)),
+]
+
+
+def feed(aggregator, results):
+    for user, package, when in results:
+        aggregator.add(user, homework.read_package(*package), when)
+
+
+def infos(*indexes):
+    return [homework.read_package(*RESULTS[index][1]).show_training_info()
+            for index in indexes]
+
+
+@pytest.mark.parametrize('period, when, expected', [
+    ('day', date(2024, 3, 6), date(2024, 3, 6)),
+    ('week', date(2024, 3, 6), date(2024, 3, 4)),
+    ('month', datetime(2024, 3, 6, 23, 59), date(2024, 3, 1)),
+])
+def test_period_start(period, when, expected):
+    assert period_start(period, when) == expected
+
+
+def test_period_start_unknown():
+    with pytest.raises(ValueError):
+        period_start('year', date(2024, 1, 1))
+
+
+def test_weekly_running_totals():
+    aggregator = Aggregator()
+    feed(aggregator, RESULTS)
+    totals = aggregator.get('anna', 'week', date(2024, 3, 10), 'Running')
+    first, second = infos(0, 1)
+    assert totals.count == 2
+    assert totals.distance == first.distance + second.distance
+    assert totals.calories == first.calories + second.calories
+    assert totals.max_speed == first.speed
+    assert totals.min_speed == second.speed
+    assert totals.mean_speed == (first.speed + second.speed) / 2
+    assert totals.overall_speed == totals.distance / 2.5
+
+
+def test_all_types_and_series():
+    aggregator = Aggregator()
+    feed(aggregator, RESULTS)
+    assert aggregator.get('anna', 'month', date(2024, 3, 1)).count == 3
+    assert [(start, totals.count) for start, totals
+            in aggregator.series('anna', 'week')] == [
+        (date(2024, 3, 4), 2), (date(2024, 3, 11), 1)]
+    assert aggregator.get('oleg', 'day', date(2024, 3, 1)) == Totals()
+    assert aggregator.users() == {'anna', 'oleg'}
+
+
+def test_snapshot_is_a_copy():
+    aggregator = Aggregator()
+    feed(aggregator, RESULTS)
+    totals = aggregator.get('anna', 'month', date(2024, 3, 1))
+    totals.count = 100
+    assert aggregator.get('anna', 'month', date(2024, 3, 1)).count == 3
+
+
+def test_merge_equals_single_pass():
+    whole = Aggregator()
+    feed(whole, RESULTS)
+    left, right = Aggregator(), Aggregator()
+    feed(left, RESULTS[::2])
+    feed(right, RESULTS[1::2])
+    left.merge(right)
+    for user, _, when in RESULTS:
+        for period in ('day', 'week', 'month'):
+            assert (asdict(left.get(user, period, when))
+                    == pytest.approx(asdict(whole.get(user, period, when))))
+
+
+def test_merge_rejects_other_periods():
+    with pytest.raises(ValueError):
+        Aggregator().merge(Aggregator(periods=('day',)))
+
+
+def test_unknown_period_query():
+    with pytest.raises(ValueError):
+        Aggregator(periods=('day',)).get('anna', 'week', date(2024, 1, 1))
@@ -0,0 +1,248 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+import backfill
+import homework
+import packets
+from aggregate import Totals
+from backfill import Backfill, Checkpoint, read_chunks
+from bench import synthetic_packets, write_dump
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def write_fixed(path, count):
+    with open(path, 'wb') as stream:
+        packets.write_fixed(synthetic_packets(count), stream)
+
+
+@pytest.fixture(params=['csv', 'jsonl', 'bin', 'fixed'])
+def dumps(request, tmp_path):
+    paths = []
+    for index, count in enumerate((250, 1, 130)):
+        path = str(tmp_path / f'dump{index}.{request.param}')
+        if request.param == 'fixed':
+            write_fixed(path, count)
+        else:
+            write_dump(path, count, request.param)
+        paths.append(path)
+    return paths
+
+
+def reference(paths, tmp_path):
+    output = tmp_path / 'reference.txt'
+    state = Backfill(paths, tmp_path / 'reference.json', output,
+                     chunk_size=1000, every=10**9).run()
+    return output.read_bytes(), state
+
+
+def test_read_chunks_offsets(dumps):
+    path = dumps[0]
+    chunks = list(read_chunks(path, chunk_size=40))
+    assert [len(chunk) for chunk, _ in chunks] == [40] * 6 + [10]
+    assert chunks[-1][1] == os.path.getsize(path)
+    rest = [packet for chunk, _ in read_chunks(path, offset=chunks[2][1],
+                                               chunk_size=40)
+            for packet in chunk]
+    assert rest == [packet for chunk, _ in chunks[3:] for packet in chunk]
+
+
+def test_matches_plain_processing(dumps, tmp_path):
+    data, state = reference(dumps, tmp_path)
+    packages = [packet for path in dumps
+                for chunk, _ in read_chunks(path) for packet in chunk]
+    infos = [homework.read_package(*package).show_training_info()
+             for package in packages]
+    assert data.decode('utf-8').splitlines() == [
+        info.get_message() for info in infos]
+    assert state.done and state.packets == len(packages) == 381
+    assert sum(totals.count for totals in state.totals.values()) == 381
+    assert state.totals['Running'].calories == sum(
+        info.calories for info in infos if info.training_type == 'Running')
+
+
+@pytest.mark.parametrize('crash_at', [1, 2, 5])
+def test_resume_after_crash(dumps, tmp_path, monkeypatch, crash_at):
+    expected, expected_state = reference(dumps, tmp_path)
+    output = tmp_path / 'out.txt'
+    checkpoint = tmp_path / 'state.json'
+    save = Checkpoint.save
+    saves = 0
+
+    def crashing_save(self, path):
+        nonlocal saves
+        saves += 1
+        if saves == crash_at:
+            # Сообщения куска уже записаны, а точка — нет.
+            raise KeyboardInterrupt
+        save(self, path)
+
+    monkeypatch.setattr(Checkpoint, 'save', crashing_save)
+    with pytest.raises(KeyboardInterrupt):
+        Backfill(dumps, checkpoint, output, chunk_size=30, every=60).run()
+    monkeypatch.setattr(Checkpoint, 'save', save)
+    if crash_at > 1:
+        interrupted = Checkpoint.load(checkpoint)
+        assert 0 < interrupted.packets < 381
+        assert output.stat().st_size > interrupted.output_size
+    runner = Backfill(dumps, checkpoint, output, chunk_size=30, every=60)
+    state = runner.run()
+    assert output.read_bytes() == expected
+    assert state.packets == 381
+    assert state.totals == expected_state.totals
+    assert Checkpoint.load(checkpoint) == state
+    # Законченную обработку повторный запуск не трогает.
+    assert Backfill(dumps, checkpoint, output).run() == state
+    assert output.read_bytes() == expected
+
+
+def test_checkpoint_interval(dumps, tmp_path):
+    runner = Backfill(dumps, tmp_path / 'state.json', chunk_size=10,
+                      every=100)
+    runner.run()
+    # 250 пакетов: после 100 и 200, 1 + 130: после 100, и финальная.
+    assert runner.checkpoints == 4
+    runner = Backfill(dumps, tmp_path / 'timed.json', chunk_size=10,
+                      every=10**9, seconds=0)
+    runner.run()
+    assert runner.checkpoints == 40
+
+
+def test_checkpoint_is_atomic_json(tmp_path):
+    path = tmp_path / 'state.json'
+    state = Checkpoint(['a.csv'], file=1, offset=17, packets=3)
+    state.totals['Running'] = Totals()
+    state.totals['Running'].add(
+        homework.read_package('RUN', [15000, 1, 75]).show_training_info())
+    state.save(path)
+    assert not os.path.exists(f'{path}.tmp')
+    assert json.loads(path.read_text())['offset'] == 17
+    assert Checkpoint.load(path) == state
+    assert Checkpoint.load(tmp_path / 'missing.json') is None
+    path.write_text(json.dumps({'version': 0}))
+    with pytest.raises(ValueError):
+        Checkpoint.load(path)
+
+
+def test_rejects_other_inputs(dumps, tmp_path):
+    checkpoint = tmp_path / 'state.json'
+    Backfill(dumps[:1], checkpoint, every=50).run()
+    with pytest.raises(ValueError):
+        Backfill(dumps, checkpoint).run()
+    with pytest.raises(ValueError):
+        Backfill(['-'], checkpoint)
+    with pytest.raises(ValueError):
+        Backfill(dumps, checkpoint, chunk_size=0)
+
+
+def test_resume_after_kill(tmp_path):
+    path = str(tmp_path / 'dump.csv')
+    write_dump(path, 200_000, 'csv')
+    expected, expected_state = reference([path], tmp_path)
+    output = tmp_path / 'out.txt'
+    checkpoint = tmp_path / 'state.json'
+    command = [sys.executable, 'backfill.py', path, '--checkpoint',
+               str(checkpoint), '-o', str(output), '--chunk-size', '500',
+               '--every', '500']
+    process = subprocess.Popen(command, cwd=ROOT,
+                               stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while True:
+        state = Checkpoint.load(checkpoint)
+        if state is not None and state.packets >= 20_000:
+            break
+        assert process.poll() is None and time.monotonic() < deadline
+        time.sleep(0.005)
+    process.send_signal(signal.SIGKILL)
+    assert process.wait(10) == -signal.SIGKILL
+    interrupted = Checkpoint.load(checkpoint)
+    assert not interrupted.done and interrupted.packets < 200_000
+    completed = subprocess.run(command, cwd=ROOT, capture_output=True,
+                               text=True, check=True)
+    assert output.read_bytes() == expected
+    assert Checkpoint.load(checkpoint).totals == expected_state.totals
+    assert 'Running: тренировок' in completed.stdout
+
+
+def poisoned_dumps(tmp_path):
+    good = tmp_path / 'good.csv'
+    write_dump(str(good), 100, 'csv')
+    lines = good.read_text(encoding='utf-8').splitlines(keepends=True)
+    poisoned = tmp_path / 'poisoned.csv'
+    poisoned.write_text(''.join(lines[:40] + ['RUN,15000,1\n']
+                                + lines[40:70] + ['XXX,1,1,1\n',
+                                                  'RUN,15000,0,75\n']
+                                + lines[70:]), encoding='utf-8')
+    return [str(good), str(poisoned)], lines
+
+
+def test_poison_packet_is_skipped(tmp_path, monkeypatch):
+    paths, lines = poisoned_dumps(tmp_path)
+    output = tmp_path / 'out.txt'
+    checkpoint = tmp_path / 'state.json'
+    for _ in range(2):
+        # Без пропуска перезапуск каждый раз упирается в тот же пакет.
+        with pytest.raises(ValueError):
+            Backfill(paths, checkpoint, output, chunk_size=10,
+                     every=10).run()
+        assert Checkpoint.load(checkpoint).packets == 140
+    save = Checkpoint.save
+    saves = 0
+
+    def crashing_save(self, path):
+        nonlocal saves
+        saves += 1
+        if saves == 4:
+            raise KeyboardInterrupt
+        save(self, path)
+
+    monkeypatch.setattr(Checkpoint, 'save', crashing_save)
+    rejected = []
+    with pytest.raises(KeyboardInterrupt):
+        Backfill(paths, checkpoint, output, chunk_size=10, every=10,
+                 skip_invalid=True, on_reject=rejected.append).run()
+    monkeypatch.setattr(Checkpoint, 'save', save)
+    state = Backfill(paths, checkpoint, output, chunk_size=10, every=10,
+                     skip_invalid=True, on_reject=rejected.append).run()
+    assert state.packets == 203
+    assert state.skipped == 3
+    assert [(rejection.index, rejection.workout_type)
+            for rejection in state.rejected] == [
+        (140, 'RUN'), (171, 'XXX'), (172, 'RUN')]
+    assert 'duration' in state.rejected[2].reason
+    assert Checkpoint.load(checkpoint) == state
+    # Сбой случился после отказов 171 и 172, но до точки с ними:
+    # о них сообщается повторно, а в точку они попадают один раз.
+    assert [rejection.index for rejection in rejected] == [
+        140, 171, 172, 171, 172]
+    packages = [packet for path in paths
+                for chunk, _ in read_chunks(path) for packet in chunk]
+    assert output.read_text(encoding='utf-8').splitlines() == [
+        homework.read_package(*package).show_training_info().get_message()
+        for index, package in enumerate(packages)
+        if index not in (140, 171, 172)]
+
+
+def test_main(dumps, tmp_path, capsys):
+    checkpoint = str(tmp_path / 'state.json')
+    assert backfill.main([*dumps, '--checkpoint', checkpoint]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split(':')[0] for line in lines] == [
+        'Running', 'SportsWalking', 'Swimming']
+
+
+def test_main_skip_invalid(tmp_path, capsys):
+    paths, _ = poisoned_dumps(tmp_path)
+    checkpoint = str(tmp_path / 'state.json')
+    assert backfill.main([*paths, '--checkpoint', checkpoint,
+                          '--skip-invalid']) == 0
+    captured = capsys.readouterr()
+    assert captured.err.count('пропущен') == 3
+    assert captured.out.splitlines()[-1] == 'Пропущено неверных пакетов: 3'
@@ -0,0 +1,132 @@
+import random
+
+import pytest
+
+import batch
+import homework
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+    ('RUN', [1206, 12, 6]),
+    ('WLK', [3000.33, 2.512, 75.8, 180.1]),
+    ('SWM', [1206, 12, 6, 12, 6]),
+]
+
+
+def to_columns(packages):
+    columns = {name: [] for name in ('action', 'duration', 'weight',
+                                     'height', 'length_pool', 'count_pool')}
+    for workout_type, data in packages:
+        values = dict(zip(batch.FIELDS[workout_type], data))
+        for name, column in columns.items():
+            column.append(values.get(name, 0))
+    return [code for code, _ in packages], columns
+
+
+def test_compute_batch_matches_scalar():
+    codes, columns = to_columns(PACKAGES)
+    result = batch.compute_batch(codes, columns)
+    for index, (workout_type, data) in enumerate(PACKAGES):
+        training = homework.read_package(workout_type, data)
+        expected = (training.get_distance(), training.get_mean_speed(),
+                    training.get_spent_calories())
+        got = tuple(result[name][index] for name in batch.RESULTS)
+        assert got == pytest.approx(expected, rel=1e-15), (
+            'Пакетный расчёт должен совпадать с методами классов '
+            f'для пакета {workout_type} {data}'
+        )
+
+
+def test_compute_batch_single_code_without_extra_columns():
+    result = batch.compute_batch('RUN', {'action': [15000, 9000],
+                                         'duration': [1, 1],
+                                         'weight': [75, 75]})
+    assert list(result['distance']) == [9.75, 5.85]
+
+
+@pytest.mark.parametrize('workout_type, columns, error', [
+    ('XXX', {'action': [1], 'duration': [1], 'weight': [1]}, KeyError),
+    ('WLK', {'action': [1], 'duration': [1], 'weight': [1]}, KeyError),
+    ('RUN', {'action': [1, 2], 'duration': [1], 'weight': [1]}, ValueError),
+    (['RUN'] * 2, {'action': [1], 'duration': [1], 'weight': [1]},
+     ValueError),
+])
+def test_compute_batch_errors(workout_type, columns, error):
+    with pytest.raises(error):
+        batch.compute_batch(workout_type, columns)
+
+
+def test_training_store_matches_training():
+    store = batch.TrainingStore()
+    store.extend(PACKAGES)
+    assert len(store) == len(PACKAGES)
+    for stored, (workout_type, data) in zip(store, PACKAGES):
+        training = homework.read_package(workout_type, data)
+        assert stored.workout_type == workout_type
+        assert stored.get_distance() == training.get_distance()
+        assert stored.get_mean_speed() == training.get_mean_speed()
+        assert stored.get_spent_calories() == pytest.approx(
+            training.get_spent_calories(), rel=1e-15)
+        assert (stored.show_training_info().get_message()
+                == training.show_training_info().get_message())
+
+
+def test_training_store_compute():
+    store = batch.TrainingStore()
+    store.extend(PACKAGES)
+    result = store.compute()
+    assert list(result['speed']) == [training.get_mean_speed()
+                                     for training in store]
+
+
+@pytest.mark.parametrize('workout_type, data, error', [
+    ('XXX', [1, 1, 1], KeyError),
+    ('RUN', [1, 1], ValueError),
+    ('SWM', [1, 1, 1, 1], ValueError),
+])
+def test_training_store_rejects_bad_packets(workout_type, data, error):
+    store = batch.TrainingStore()
+    with pytest.raises(error):
+        store.append(workout_type, data)
+    assert len(store) == 0
+    with pytest.raises(IndexError):
+        store[0]
+
+
+def test_compute_batch_numpy_matches_python():
+    numpy = pytest.importorskip('numpy')
+    rnd = random.Random(0)
+    packages = PACKAGES + [
+        (code, [rnd.uniform(1, 30000), rnd.uniform(0.1, 5),
+                rnd.uniform(40, 120), rnd.uniform(20, 200),
+                rnd.uniform(1, 80)][:len(batch.FIELDS[code])])
+        for code in rnd.choices(('RUN', 'WLK', 'SWM'), k=300)]
+    codes, columns = to_columns(packages)
+    expected = batch.compute_batch(codes, columns)
+    result = batch.compute_batch(codes, {
+        name: numpy.asarray(column) for name, column in columns.items()})
+    for name in batch.RESULTS:
+        assert isinstance(result[name], numpy.ndarray)
+        assert result[name].tolist() == pytest.approx(
+            list(expected[name]), rel=1e-15)
+
+
+@pytest.mark.parametrize('code, row', [
+    ('RUN', {'action': 15000, 'duration': 0, 'weight': 75}),
+    ('WLK', {'action': 9000, 'duration': 1, 'weight': 75, 'height': 0}),
+    ('SWM', {'action': 720, 'duration': 0, 'weight': 80,
+             'length_pool': 25, 'count_pool': 40}),
+])
+def test_compute_batch_uncomputable_row(code, row):
+    codes, columns = to_columns(PACKAGES)
+    codes.append(code)
+    for name, column in columns.items():
+        column.append(row.get(name, 0))
+    with pytest.raises(ArithmeticError):
+        batch.compute_batch(codes, columns)
+    numpy = pytest.importorskip('numpy')
+    with pytest.raises(ArithmeticError):
+        batch.compute_batch(codes, {name: numpy.asarray(column)
+                                    for name, column in columns.items()})
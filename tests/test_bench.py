@@ -0,0 +1,51 @@
+import argparse
+import json
+
+import bench
+import homework
+
+
+def test_synthetic_packets_are_reproducible():
+    assert list(bench.synthetic_packets(50)) == list(
+        bench.synthetic_packets(50))
+
+
+def test_compare_reports_only_regressions():
+    baseline = {'read_package': 100.0, 'get_message': 100.0,
+                'removed': 100.0}
+    results = {'read_package': 119.0, 'get_message': 121.0, 'new': 500.0}
+    assert [line.split(':')[0] for line in bench.compare(
+        results, baseline, 0.2)] == ['get_message']
+
+
+def test_run_suite_covers_all_stages():
+    results = bench.run_suite([10], rounds=1, repeat=1, pool_size=30)
+    for name in ('Running.__init__', 'SportsWalking.get_spent_calories',
+                 'Swimming.show_training_info', 'read_package',
+                 'InfoMessage.get_message', 'end_to_end.10'):
+        assert results[name] > 0
+
+
+def test_suite_methods_bypass_cache(monkeypatch):
+    calls = 0
+    kernel = homework.Running._kernel
+
+    def counting(*args):
+        nonlocal calls
+        calls += 1
+        return kernel(*args)
+
+    monkeypatch.setattr(homework.Running, '_kernel', staticmethod(counting))
+    pool = [('RUN', [15000, 1, 75]), ('RUN', [9000, 1.5, 80])]
+    stages = bench.suite_stages(pool, rounds=3)
+    calls = 0
+    assert stages['Running.get_distance']() == 6
+    assert calls == 6
+
+
+def test_suite_rejects_stale_baseline(tmp_path):
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps({'results': {'read_package': 1.0}}))
+    args = argparse.Namespace(sizes=[10], rounds=1, repeat=1, output=None,
+                              baseline=str(baseline), threshold=0.2)
+    assert bench.bench_suite(args) == 2
@@ -0,0 +1,97 @@
+import pytest
+
+import homework
+from cache import PackageCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def expected(workout_type, data):
+    return homework.read_package(workout_type, data).show_training_info()
+
+
+def test_cache_hits_and_misses():
+    cache = PackageCache(max_entries=10)
+    first = cache.get_info('RUN', [15000, 1, 75])
+    second = cache.get_info('RUN', [15000, 1, 75])
+    assert first is second
+    assert first == expected('RUN', [15000, 1, 75])
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+    assert cache.stats.hit_rate == 0.5
+    assert cache.get_message('RUN', (15000, 1, 75)) == first.get_message()
+
+
+def test_cache_evicts_least_recently_used():
+    cache = PackageCache(max_entries=2)
+    cache.get_info('RUN', [1, 1, 1])
+    cache.get_info('RUN', [2, 1, 1])
+    cache.get_info('RUN', [1, 1, 1])
+    cache.get_info('RUN', [3, 1, 1])
+    assert ('RUN', (1, 1, 1)) in cache
+    assert ('RUN', (2, 1, 1)) not in cache
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+
+
+def test_cache_max_bytes():
+    cache = PackageCache(max_entries=None, max_bytes=1)
+    cache.get_info('RUN', [1, 1, 1])
+    assert len(cache) == 0
+    cache = PackageCache(max_entries=None, max_bytes=10_000)
+    for action in range(100):
+        cache.get_info('RUN', [action, 1, 1])
+    assert 0 < cache.nbytes <= 10_000
+    assert cache.stats.evictions == 100 - len(cache)
+
+
+def test_cache_ttl():
+    clock = FakeClock()
+    cache = PackageCache(ttl=10, clock=clock)
+    cache.get_info('WLK', [9000, 1, 75, 180])
+    clock.now = 10
+    cache.get_info('WLK', [9000, 1, 75, 180])
+    clock.now = 10.5
+    cache.get_info('WLK', [9000, 1, 75, 180])
+    assert cache.stats.hits == 1
+    assert cache.stats.expirations == 1
+    assert cache.stats.misses == 2
+    assert len(cache) == 1
+
+
+def test_cache_requires_limit():
+    with pytest.raises(ValueError):
+        PackageCache(max_entries=None)
+
+
+def test_cache_does_not_store_errors():
+    cache = PackageCache()
+    with pytest.raises(KeyError):
+        cache.get_info('XXX', [1, 1, 1])
+    assert len(cache) == 0
+
+
+def test_run_with_cache(tmp_path, monkeypatch):
+    source = tmp_path / 'packets.csv'
+    source.write_text('RUN,15000,1,75\n' * 3, encoding='utf-8')
+    output = tmp_path / 'result.txt'
+    get_message = homework.InfoMessage.get_message
+    calls = 0
+
+    def counting_get_message(self):
+        nonlocal calls
+        calls += 1
+        return get_message(self)
+
+    monkeypatch.setattr(homework.InfoMessage, 'get_message',
+                        counting_get_message)
+    homework.run([str(source), '--cache', '10', '-o', str(output)])
+    # Повторы берут из кэша готовую строку и не форматируются заново.
+    assert calls == 1
+    assert output.read_text(encoding='utf-8').splitlines() == [
+        expected('RUN', [15000, 1, 75]).get_message()] * 3
@@ -0,0 +1,137 @@
+import io
+
+import pytest
+
+import batch
+import homework
+from columnar import ColumnarReader, ColumnarWriter
+
+
+def _infos(count):
+    packages = homework.PACKAGES * (count // len(homework.PACKAGES) + 1)
+    return [homework.read_package(*package).show_training_info()
+            for package in packages[:count]]
+
+
+def _fields(info):
+    return (info.training_type, info.duration, info.distance, info.speed,
+            info.calories)
+
+
+@pytest.mark.parametrize('count, row_group_size', [
+    (0, 4), (1, 4), (10, 4), (12, 4), (10, 1000)])
+def test_round_trip(tmp_path, count, row_group_size):
+    infos = _infos(count)
+    path = tmp_path / 'results.tcol'
+    with ColumnarWriter(path, row_group_size) as writer:
+        assert writer.extend(infos) == count
+    with ColumnarReader(path) as reader:
+        assert len(reader) == count
+        assert len(reader.row_groups) == -(-count // row_group_size)
+        assert list(reader.iter_rows()) == [_fields(info) for info in infos]
+        lines = io.StringIO()
+        homework.write_messages(reader.iter_rows(), lines)
+    assert lines.getvalue().splitlines() == [info.get_message()
+                                             for info in infos]
+
+
+def test_writer_keeps_only_one_row_group(tmp_path):
+    with ColumnarWriter(tmp_path / 'results.tcol', 5) as writer:
+        for info in _infos(23):
+            writer.append(info)
+            assert len(writer._types) < 5
+        assert writer.rows == 20
+    assert writer.rows == 23
+
+
+def test_append_columns_from_batch(tmp_path):
+    packages = homework.PACKAGES * 3
+    codes = [code for code, _ in packages]
+    rows = [dict(zip(homework.TRAINING_FIELDS[code], data))
+            for code, data in packages]
+    arrays = {name: [row.get(name, 1.0) for row in rows]
+              for name in batch.COLUMNS}
+    result = batch.compute_batch(codes, arrays)
+    path = tmp_path / 'results.tcol'
+    with ColumnarWriter(path, row_group_size=4) as writer:
+        writer.append_columns({
+            'training_type': [batch.TRAINING_TYPES[code] for code in codes],
+            'duration': arrays['duration'], **result})
+    with ColumnarReader(path) as reader:
+        assert reader.dictionary == ['Swimming', 'Running', 'SportsWalking']
+        for row, package in zip(reader.iter_rows(), packages):
+            expected = _fields(homework.read_package(*package)
+                               .show_training_info())
+            assert row[:2] == expected[:2]
+            assert row[2:] == pytest.approx(expected[2:], rel=1e-15)
+
+
+def test_append_columns_rejects_lengths(tmp_path):
+    with ColumnarWriter(tmp_path / 'results.tcol') as writer:
+        with pytest.raises(ValueError):
+            writer.append_columns({'training_type': ['Running'],
+                                   'duration': [1.0, 2.0], 'distance': [1],
+                                   'speed': [1], 'calories': [1]})
+
+
+def test_error_leaves_file_without_footer(tmp_path):
+    path = tmp_path / 'results.tcol'
+    with pytest.raises(RuntimeError):
+        with ColumnarWriter(path, row_group_size=2) as writer:
+            writer.extend(_infos(5))
+            raise RuntimeError
+    assert path.stat().st_size > 4
+    with pytest.raises(ValueError):
+        ColumnarReader(path)
+
+
+@pytest.mark.parametrize('row', [('Running', 1.0, 2.0, 3.0),
+                                 ('Running', 1.0, 2.0, 3.0, 4.0, 5.0)])
+def test_rejects_rows_of_wrong_width(tmp_path, row):
+    path = tmp_path / 'results.tcol'
+    infos = _infos(3)
+    with ColumnarWriter(path) as writer:
+        with pytest.raises(ValueError):
+            writer.append(row)
+        with pytest.raises(ValueError):
+            writer.extend([_fields(infos[0]), row])
+        writer.extend(infos)
+    with ColumnarReader(path) as reader:
+        assert list(reader.iter_rows()) == [_fields(info) for info in infos]
+
+
+def test_rejected_row_leaves_columns_aligned(tmp_path):
+    path = tmp_path / 'results.tcol'
+    infos = _infos(3)
+    bad = ('Running', 1.0, 'x', 3.0, 4.0)
+    with ColumnarWriter(path) as writer:
+        writer.append(infos[0])
+        with pytest.raises(TypeError):
+            writer.append(bad)
+        with pytest.raises(TypeError):
+            writer.extend([_fields(infos[1]), bad])
+        with pytest.raises(TypeError):
+            writer.append_columns({name: [value] for name, value
+                                   in zip(homework.MESSAGE_FIELDS, bad)})
+        writer.extend(infos[1:])
+    with ColumnarReader(path) as reader:
+        assert reader.rows == 3
+        assert list(reader.iter_rows()) == [_fields(info) for info in infos]
+
+
+@pytest.mark.parametrize('cut', [1, 8])
+def test_reader_rejects_broken_file(tmp_path, cut):
+    path = tmp_path / 'results.tcol'
+    with ColumnarWriter(path) as writer:
+        writer.extend(_infos(3))
+    path.write_bytes(path.read_bytes()[:-cut])
+    with pytest.raises(ValueError):
+        ColumnarReader(path)
+
+
+def test_run_writes_columnar(tmp_path):
+    path = tmp_path / 'results.tcol'
+    homework.run(['-o', str(path)])
+    with ColumnarReader(path) as reader:
+        assert [row[0] for row in reader.iter_rows()] == [
+            'Swimming', 'Running', 'SportsWalking']
@@ -0,0 +1,90 @@
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import daemon
+import homework
+import server
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def expected(package):
+    return homework.read_package(*package).show_training_info().get_message()
+
+
+@pytest.fixture
+def socket_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'fitness.sock')
+    process = subprocess.Popen(
+        [sys.executable, 'daemon.py', 'serve', '--socket', path],
+        cwd=ROOT, stdout=subprocess.PIPE, text=True, encoding='utf-8')
+    # Файл сокета появляется уже после bind(), но до listen(); демон
+    # сообщает о себе, когда принимает соединения.
+    with process.stdout:
+        assert process.stdout.readline() == f'Демон слушает {path}\n'
+        monkeypatch.setenv('FITNESS_SOCKET', path)
+        yield path
+        process.terminate()
+        assert process.wait(10) == 0
+    assert not os.path.exists(path)
+
+
+def test_constants_match_server():
+    assert daemon.ERROR_PREFIX == server.ERROR_PREFIX
+    assert daemon.BATCH_SEPARATOR == server.BATCH_SEPARATOR
+    assert daemon.MAX_LINE == server.MAX_LINE
+
+
+def test_packet_lines():
+    assert daemon.packet_lines(['RUN', '15000', '1', '75', 'SWM', '720']) == [
+        'RUN,15000,1,75', 'SWM,720']
+    with pytest.raises(ValueError):
+        daemon.packet_lines(['15000'])
+
+
+def test_split_batches():
+    lines = ['RUN,15000,1,75'] * 10 + ['X' * 100, 'WLK,9000,1,75,180']
+    batches = daemon.split_batches(lines, batch_size=4, max_line=40)
+    assert [line for batch in batches for line in batch] == lines
+    assert [len(batch) for batch in batches] == [2, 2, 2, 2, 2, 1, 1]
+    for batch in batches[:-2] + batches[-1:]:
+        assert len(daemon.BATCH_SEPARATOR.join(batch)) + 1 <= 40
+    assert len(daemon.split_batches(lines[:10], max_line=1000)[0]) == 10
+
+
+def test_client_default_batch_with_float_packets(socket_path):
+    rnd = random.Random(0)
+    packages = [('SWM', [rnd.uniform(100, 30000), rnd.uniform(0.25, 3),
+                         rnd.uniform(40, 120), 25.0, rnd.uniform(1, 80)])
+                for _ in range(500)]
+    lines = [','.join([code, *map(str, data)]) for code, data in packages]
+    with daemon.DaemonClient() as client:
+        replies = client.request(lines)
+    assert replies == [expected(package) for package in packages]
+
+
+def test_client_pipelines_batches(socket_path):
+    packages = homework.PACKAGES * 500
+    lines = [','.join([code, *map(str, data)]) for code, data in packages]
+    with daemon.DaemonClient() as client:
+        assert client.send(*packages[0]) == expected(packages[0])
+        replies = client.request(lines, batch_size=7, window=3)
+    assert replies == [expected(package) for package in packages]
+
+
+def test_main_prints_replies(socket_path, capsys):
+    assert daemon.main(['RUN', '15000', '1', '75', 'XXX', '1']) == 1
+    replies = capsys.readouterr().out.splitlines()
+    assert replies[0] == expected(('RUN', [15000, 1, 75]))
+    assert replies[1].startswith(daemon.ERROR_PREFIX)
+
+
+def test_main_without_daemon(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv('FITNESS_SOCKET', str(tmp_path / 'missing.sock'))
+    assert daemon.main(['RUN', '15000', '1', '75']) == 2
+    assert capsys.readouterr().err.startswith(daemon.ERROR_PREFIX)
@@ -0,0 +1,87 @@
+import sqlite3
+from datetime import date, datetime, timezone
+
+import pytest
+
+import homework
+from history import WorkoutStore, timestamp
+
+RESULTS = [
+    ('anna', ('SWM', [720, 1, 80, 25, 40]), date(2024, 3, 4)),
+    ('anna', ('SWM', [1800, 1.5, 80, 50, 60]), date(2024, 3, 20)),
+    ('oleg', ('SWM', [2000, 1, 90, 50, 50]), datetime(2024, 4, 2, 7, 30)),
+    ('anna', ('RUN', [15000, 1, 75]), date(2024, 3, 6)),
+    ('oleg', ('WLK', [9000, 1, 75, 180]), date(2024, 3, 31)),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    with WorkoutStore(tmp_path / 'history.db', batch_size=2) as store:
+        for user, package, when in RESULTS:
+            store.add(user, homework.read_package(*package), when)
+        yield store
+
+
+def test_query_range(store):
+    swims = list(store.query('Swimming', start=date(2024, 3, 1),
+                             end=date(2024, 4, 1), min_distance=2))
+    assert [(workout.user, workout.when) for workout in swims] == [
+        ('anna', datetime(2024, 3, 20, tzinfo=timezone.utc))]
+    expected = homework.read_package(*RESULTS[1][1]).show_training_info()
+    assert swims[0].info() == expected
+    assert store.count(user='anna') == 3
+    assert store.count('Cycling') == 0
+    assert list(store.query(user='nobody')) == []
+
+
+def test_top(store):
+    top = store.top(2, 'distance', training_type='Swimming')
+    assert [workout.distance for workout in top] == sorted(
+        (homework.read_package(*package).get_distance()
+         for _, package, _ in RESULTS[:3]), reverse=True)[:2]
+    assert store.top(1, 'calories')[0].training_type == 'Running'
+    with pytest.raises(ValueError):
+        store.top(1, 'user_id; DROP TABLE workouts')
+
+
+def test_queries_use_indexes(store):
+    plans = [
+        store._query_sql('Swimming', start=date(2024, 3, 1),
+                         end=date(2024, 4, 1), min_distance=2),
+        store._query_sql(user='anna', start=date(2024, 3, 1)),
+        store._query_sql(start=date(2024, 3, 1), end=date(2024, 4, 1)),
+        store._top_sql(5, 'distance', 'Swimming'),
+    ]
+    for sql, params in plans:
+        plan = ' '.join(store.explain(sql, params))
+        assert 'USING INDEX workouts_' in plan, plan
+        assert 'SCAN workouts' not in plan, plan
+
+
+def test_history_is_append_only(store):
+    store.flush()
+    for sql in ('UPDATE workouts SET distance = 0',
+                'DELETE FROM workouts'):
+        with pytest.raises(sqlite3.IntegrityError):
+            with store.connection:
+                store.connection.execute(sql)
+    assert store.count() == len(RESULTS)
+
+
+def test_reopen_keeps_history(tmp_path):
+    path = tmp_path / 'history.db'
+    with WorkoutStore(path) as store:
+        assert store.extend(
+            (user, homework.read_package(*package), when)
+            for user, package, when in RESULTS) == len(RESULTS)
+    with WorkoutStore(path) as store:
+        assert store.count('Swimming', user='oleg') == 1
+        store.add('oleg', homework.read_package(*RESULTS[0][1]), 0)
+        assert store.count(user='oleg') == 3
+
+
+def test_timestamp():
+    assert timestamp(date(1970, 1, 2)) == 86400
+    assert timestamp(datetime(1970, 1, 1, 1)) == 3600
+    assert timestamp(12.7) == 12
@@ -0,0 +1,106 @@
+import random
+
+import pytest
+
+import homework
+from ingest import (BloomFilter, Deduplicator, Ingestor, assign_ids,
+                    content_id, unique_packets)
+
+PACKETS = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+]
+
+
+def envelopes(count, seed=0, duplicates=0.3, shift=8, delay=300):
+    """Номера 0..count-1, перемешанные блоками по shift, с повторами."""
+    rnd = random.Random(seed)
+    ids = list(range(count))
+    for start in range(0, count, shift):
+        block = ids[start:start + shift]
+        rnd.shuffle(block)
+        ids[start:start + shift] = block
+    stream = list(ids)
+    for packet_id in ids:
+        if rnd.random() < duplicates:
+            position = stream.index(packet_id) + rnd.randint(1, delay)
+            stream.insert(position, packet_id)
+    return [(packet_id, *PACKETS[packet_id % 3]) for packet_id in stream]
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(1000, 1e-4)
+    for key in range(1000):
+        bloom.add(key)
+    assert len(bloom) == 1000
+    assert all(key in bloom for key in range(1000))
+    assert sum(key in bloom for key in range(10**6, 10**6 + 10**5)) < 50
+    with pytest.raises(ValueError):
+        BloomFilter(0)
+    with pytest.raises(ValueError):
+        BloomFilter(10, 1.5)
+
+
+def test_deduplicator_remembers_beyond_recent_window():
+    deduplicator = Deduplicator(recent=100, capacity=1000)
+    assert not any(deduplicator.seen(key) for key in range(1500))
+    assert len(deduplicator._recent) == 100
+    assert all(deduplicator.seen(key) for key in range(600, 1500))
+    assert deduplicator.seen('a') is False
+    assert deduplicator.seen('a') is True
+
+
+@pytest.mark.parametrize('first, second', [
+    (-1, -2),
+    (5, 5 + 2**61 - 1),
+    (2**70, 2**70 + 2**61 - 1),
+    (('user', -1), ('user', -2)),
+])
+def test_deduplicator_ids_with_equal_builtin_hash(first, second):
+    assert hash(first) == hash(second)
+    deduplicator = Deduplicator(recent=1)
+    assert deduplicator.seen(first) is False
+    assert deduplicator.seen(second) is False
+    assert deduplicator.seen(first) is True
+    assert deduplicator.seen(second) is True
+
+
+def test_ingest_drops_duplicates_and_orders():
+    stream = envelopes(2000)
+    ingestor = Ingestor(window=16, recent=50, capacity=500)
+    forwarded = [packet_id for packet_id, _, _ in ingestor.ingest(stream)]
+    assert forwarded == list(range(2000))
+    stats = ingestor.stats
+    assert stats.received == len(stream)
+    assert stats.forwarded == 2000
+    assert stats.duplicates == len(stream) - 2000
+    assert stats.late == 0
+
+
+def test_late_packets_are_forwarded():
+    ingestor = Ingestor(window=2)
+    released = []
+    for packet_id in (1, 2, 3, 4, 0, 5, 3):
+        released += ingestor.push(packet_id, *PACKETS[1])
+    released += ingestor.flush()
+    assert [packet_id for packet_id, _, _ in released] == [1, 2, 0, 3, 4, 5]
+    assert ingestor.stats.late == 1
+    assert ingestor.stats.duplicates == 1
+
+
+def test_content_ids():
+    stream = [*PACKETS, ('RUN', [15000, 1.0, 75]), *PACKETS[:1]]
+    assert content_id(*PACKETS[1]) == content_id('RUN', (15000, 1.0, 75))
+    assert list(unique_packets(assign_ids(stream))) == PACKETS
+    with pytest.raises(ValueError):
+        Ingestor(window=-1)
+
+
+def test_run_dedup(tmp_path):
+    source = tmp_path / 'packets.csv'
+    source.write_text('RUN,15000,1,75\nSWM,720,1,80,25,40\nRUN,15000,1,75\n',
+                      encoding='utf-8')
+    output = tmp_path / 'result.txt'
+    homework.run([str(source), '-o', str(output), '--dedup'])
+    assert len(output.read_text(encoding='utf-8').splitlines()) == 2
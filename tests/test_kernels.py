@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+import homework
+
+
+def random_packages(count, seed=0):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        for workout_type in homework.KERNELS:
+            size = len(homework.TRAINING_FIELDS[workout_type])
+            yield workout_type, [rnd.choice((rnd.randint(1, 30000),
+                                             rnd.uniform(0.01, 300)))
+                                 for _ in range(size)]
+
+
+def method_results(training):
+    return (training.get_distance(), training.get_mean_speed(),
+            training.get_spent_calories())
+
+
+@pytest.fixture
+def no_kernels(monkeypatch):
+    def disable():
+        for training_class in homework.TRAININGS.values():
+            monkeypatch.setattr(training_class, '_kernel', None)
+    return disable
+
+
+def test_kernels_match_methods_exactly(no_kernels):
+    packages = list(random_packages(2000))
+    fast = [method_results(homework.read_package(*package))
+            for package in packages]
+    no_kernels()
+    for package, results in zip(packages, fast):
+        expected = method_results(homework.read_package(*package))
+        assert results == expected, package
+        assert all(type(value) == float for value in results)
+
+
+def test_builtin_trainings_have_kernels():
+    assert homework.KERNELS == {
+        code: training_class._kernel
+        for code, training_class in homework.TRAININGS.items()}
+    assert homework.Training._kernel is None
+
+
+def test_bulk_apis():
+    rows = [data for workout_type, data in random_packages(50)
+            if workout_type == 'SWM']
+    expected = [method_results(homework.Swimming(*row)) for row in rows]
+    assert list(homework.compute_rows('SWM', rows)) == expected
+    assert list(homework.compute_columns('SWM', *zip(*rows))) == expected
+    with pytest.raises(KeyError):
+        homework.compute_rows('XXX', rows)
+
+
+def test_overridden_formula_disables_kernel():
+    class SlowRunning(homework.Running):
+        def get_distance(self):
+            return 2 * super().get_distance()
+
+    class FastRunning(homework.Running):
+        LEN_STEP = 1.0
+
+    class TrailRunning(homework.Running):
+        def __init__(self, action, duration, weight, elevation):
+            super().__init__(action, duration, weight)
+            self.elevation = elevation
+
+    assert SlowRunning._kernel is None
+    assert TrailRunning._kernel is None
+    trail = TrailRunning(15000, 1, 75, 300)
+    running = homework.Running(15000, 1, 75)
+    assert [getattr(trail, name)() for name in homework.METRICS] == [
+        getattr(running, name)() for name in homework.METRICS]
+    assert SlowRunning(1000, 1, 70).get_distance() == 1.3
+    assert FastRunning._kernel is not None
+    training = FastRunning(1000, 1, 70)
+    assert training.get_distance() == 1.0
+    assert training.get_spent_calories() == (
+        homework.Running.get_spent_calories.__wrapped__(training))
+
+
+@pytest.mark.parametrize('package, distance, failing', [
+    (('RUN', [15000, 0, 75]), 9.75,
+     ('get_mean_speed', 'get_spent_calories')),
+    (('SWM', [9000, 0, 75, 25, 40]), 12.419999999999998,
+     ('get_mean_speed', 'get_spent_calories')),
+    (('WLK', [9000, 1, 75, 0]), 5.85, ('get_spent_calories',)),
+])
+def test_kernel_failure_keeps_method_errors(package, distance, failing):
+    training = homework.read_package(*package)
+    assert training.get_distance() == distance
+    if package[0] == 'WLK':
+        assert training.get_mean_speed() == distance
+    for name in failing:
+        with pytest.raises(ZeroDivisionError):
+            getattr(training, name)()
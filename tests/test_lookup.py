@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+import homework
+from lookup import Axis, CalorieTable, walking_rate
+
+
+@pytest.fixture(scope='module')
+def walking_table():
+    return CalorieTable.build('WLK', weight=(40, 120, 2),
+                              height=(140, 210, 5), speed=(0, 10, 0.25))
+
+
+def random_walks(count, seed=0):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        yield homework.SportsWalking(rnd.randint(100, 30000),
+                                     rnd.uniform(0.5, 3),
+                                     rnd.uniform(40, 120),
+                                     rnd.uniform(140, 210))
+
+
+def test_walking_error_within_bound(walking_table):
+    assert walking_table.max_error > 0
+    worst = 0.0
+    for training in random_walks(2000):
+        exact = training.get_spent_calories()
+        error = abs(walking_table.training_calories(training) - exact)
+        assert error <= walking_table.error_bound(training.duration) + 1e-9
+        worst = max(worst, error / training.duration)
+    assert worst > 0
+
+
+def test_running_interpolation_is_exact():
+    table = CalorieTable.build('RUN', weight=(40, 120, 10),
+                               speed=(0, 20, 1))
+    assert table.max_error == 0
+    for action in (1000, 9000, 15000, 29999):
+        training = homework.Running(action, 1.7, 73.3)
+        assert table.training_calories(training) == pytest.approx(
+            training.get_spent_calories(), rel=1e-12)
+
+
+def test_outside_grid_is_exact(walking_table):
+    training = homework.SportsWalking(9000, 1, 200, 180)
+    assert (walking_table.training_calories(training)
+            == pytest.approx(training.get_spent_calories(), rel=1e-15))
+
+
+def test_grid_nodes_are_exact(walking_table):
+    speed = walking_table.axes[2].start + walking_table.axes[2].step * 20
+    assert walking_table.rate(80, 180, speed) == pytest.approx(
+        walking_rate(80, 180, speed), rel=1e-12)
+    assert walking_table.error_bound(2) == 2 * walking_table.max_error
+
+
+def test_save_and_load(tmp_path, walking_table):
+    path = tmp_path / 'walking.clt'
+    walking_table.save(path)
+    loaded = CalorieTable.load(path)
+    assert loaded.axes == walking_table.axes
+    assert loaded.max_error == walking_table.max_error
+    assert loaded.values == walking_table.values
+    assert loaded.rate(75.5, 181, 5.85) == walking_table.rate(75.5, 181, 5.85)
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.clt'
+    path.write_bytes(b'nope')
+    with pytest.raises(ValueError):
+        CalorieTable.load(path)
+
+
+@pytest.mark.parametrize('workout_type, ranges, error', [
+    ('SWM', {'weight': (40, 120, 1)}, KeyError),
+    ('RUN', {'weight': (40, 120, 1)}, ValueError),
+    ('RUN', {'weight': (120, 40, 1), 'speed': (0, 10, 1)}, ValueError),
+])
+def test_build_errors(workout_type, ranges, error):
+    with pytest.raises(error):
+        CalorieTable.build(workout_type, **ranges)
+
+
+def test_axis_between():
+    axis = Axis.between('speed', 0, 10, 0.3)
+    assert axis.stop == pytest.approx(10)
+    assert axis.step <= 0.3
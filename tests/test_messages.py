@@ -0,0 +1,71 @@
+import io
+import math
+
+import pytest
+
+import homework
+
+ROWS = [
+    ('Swimming', 1, 0.9936, 1.0, 336.0),
+    ('Running', 12, 0.7838999999999999, 0.065325, 12.81208),
+    ('SportsWalking', 2.512, 1.9502145, 0.7763592, 408.42867),
+    ('Running', 0.0005, 123456.78951, -0.0004, math.inf),
+    ('Swimming', 1.5, math.nan, 1e-30, 1e30),
+]
+
+
+def reference_message(row):
+    """Сообщение, собранное напрямую по шаблону."""
+    return homework.MESSAGE_TEMPLATE.format(
+        **dict(zip(homework.MESSAGE_FIELDS, row)))
+
+
+@pytest.mark.parametrize('row', ROWS)
+def test_get_message_matches_template(row):
+    assert homework.InfoMessage(*row).get_message() == reference_message(row)
+
+
+def test_get_message_custom_template():
+    info = homework.InfoMessage('Running', 1, 2, 3, 4,
+                                message='{training_type}: {calories:.1f}')
+    assert info.get_message() == 'Running: 4.0'
+
+
+def test_render_messages_accepts_tuples_objects_and_lines():
+    messages = [ROWS[0], homework.InfoMessage(*ROWS[1]), 'готовая строка']
+    assert list(homework.render_messages(messages)) == [
+        reference_message(ROWS[0]), reference_message(ROWS[1]),
+        'готовая строка']
+
+
+@pytest.mark.parametrize('batch_size', [1, 2, 1024])
+def test_write_messages(batch_size):
+    stream = io.StringIO()
+    written = homework.write_messages(
+        (homework.InfoMessage(*row) for row in ROWS), stream, batch_size)
+    assert written == len(ROWS)
+    assert stream.getvalue() == ''.join(reference_message(row) + '\n'
+                                        for row in ROWS)
+
+
+def test_compile_template_keeps_braces():
+    render = homework.compile_template('{{{speed:.1f}}} {training_type!r}')
+    assert render('Running', 0, 0, 2.25, 0) == "{2.2} 'Running'"
+
+
+def test_render_message_compiles_template_once(monkeypatch):
+    render_message = homework.render_message
+    compile_template = homework.compile_template
+    calls = 0
+
+    def counting_compile(template):
+        nonlocal calls
+        calls += 1
+        return compile_template(template)
+
+    monkeypatch.setattr(homework, '_render', None)
+    monkeypatch.setattr(homework, 'compile_template', counting_compile)
+    # Ссылка, взятая до первого вызова, тоже пользуется готовым шаблоном.
+    for row in ROWS:
+        assert render_message(*row) == reference_message(row)
+    assert calls == 1
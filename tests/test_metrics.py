@@ -0,0 +1,101 @@
+import functools
+import pickle
+
+import pytest
+
+import homework
+
+
+class CountingRunning(homework.Running):
+    distance_calls = 0
+
+    def get_distance(self):
+        CountingRunning.distance_calls += 1
+        return super().get_distance()
+
+
+@pytest.fixture
+def counting():
+    CountingRunning.distance_calls = 0
+    return CountingRunning(15000, 1, 75)
+
+
+def test_metrics_computed_once(counting):
+    first = counting.show_training_info()
+    second = counting.show_training_info()
+    assert CountingRunning.distance_calls == 1
+    assert first == second
+    assert type(counting.get_mean_speed()) == float
+
+
+def test_mutation_invalidates(counting):
+    distance = counting.get_distance()
+    calories = counting.get_spent_calories()
+    counting.action = 30000
+    assert counting.get_distance() == pytest.approx(2 * distance)
+    assert counting.get_spent_calories() != calories
+    assert CountingRunning.distance_calls == 2
+
+
+@pytest.mark.parametrize('field, value', [
+    ('count_pool', 20), ('length_pool', 50), ('duration', 2)])
+def test_swimming_mean_speed_invalidates(field, value):
+    swimming = homework.Swimming(720, 1, 80, 25, 40)
+    swimming.get_spent_calories()
+    setattr(swimming, field, value)
+    expected = homework.Swimming(
+        *(getattr(swimming, name)
+          for name in homework.TRAINING_FIELDS['SWM']))
+    assert swimming.get_mean_speed() == expected.get_mean_speed()
+    assert swimming.get_spent_calories() == expected.get_spent_calories()
+
+
+@pytest.mark.parametrize('package', homework.PACKAGES)
+def test_cached_results_match_formulas(package):
+    training = homework.read_package(*package)
+    for name in homework.METRICS:
+        method = getattr(type(training), name)
+        assert getattr(training, name)() == method.__wrapped__(training)
+
+
+def test_cached_training_pickles():
+    training = homework.read_package('WLK', [9000, 1, 75, 180])
+    info = training.show_training_info()
+    assert pickle.loads(pickle.dumps(training)).show_training_info() == info
+
+
+def test_subclass_with_generic_init():
+    class LoggedRunning(homework.Running):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+
+    training = LoggedRunning(15000, 1, 75)
+    reference = homework.Running(15000, 1, 75)
+    assert [getattr(training, name)() for name in homework.METRICS] == [
+        getattr(reference, name)() for name in homework.METRICS]
+    training.duration = 2
+    assert training.get_mean_speed() == reference.get_mean_speed() / 2
+    with pytest.raises(TypeError):
+        homework.init_fields(LoggedRunning)
+
+
+def test_subclass_with_decorated_init():
+    def logged(init):
+        @functools.wraps(init)
+        def wrapper(self, *args, **kwargs):
+            init(self, *args, **kwargs)
+        return wrapper
+
+    class LoggedWalking(homework.SportsWalking):
+        @logged
+        def __init__(self, action, duration, weight, height):
+            super().__init__(action, duration, weight, height)
+
+    assert homework.init_fields(LoggedWalking) == (
+        homework.TRAINING_FIELDS['WLK'])
+    training = LoggedWalking(9000, 1, 75, 180)
+    assert training.get_spent_calories() == (
+        homework.SportsWalking(9000, 1, 75, 180).get_spent_calories())
+    training.height = 200
+    assert training.get_spent_calories() == (
+        homework.SportsWalking(9000, 1, 75, 200).get_spent_calories())
@@ -0,0 +1,130 @@
+import io
+import json
+
+import pytest
+
+import batch
+import homework
+import packets
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [3000.33, 2.512, 75.8, 180.1]),
+]
+
+
+def test_read_csv():
+    lines = io.StringIO('SWM,720,1,80,25,40\n\nRUN,15000,1,75\n'
+                        'WLK,3000.33,2.512,75.8,180.1\n')
+    assert list(packets.read_csv(lines)) == PACKAGES
+
+
+def test_read_jsonl():
+    lines = io.StringIO(
+        json.dumps(PACKAGES[0]) + '\n'
+        + json.dumps({'workout_type': 'RUN', 'data': [15000, 1, 75]}) + '\n'
+        + json.dumps(PACKAGES[2]) + '\n'
+    )
+    assert list(packets.read_jsonl(lines)) == PACKAGES
+
+
+def test_binary_round_trip():
+    stream = io.BytesIO()
+    assert packets.write_binary(PACKAGES, stream) == len(PACKAGES)
+    stream.seek(0)
+    assert list(packets.read_binary(stream)) == PACKAGES
+
+
+def test_read_binary_truncated():
+    stream = io.BytesIO()
+    packets.write_binary(PACKAGES[:1], stream)
+    with pytest.raises(ValueError):
+        list(packets.read_binary(io.BytesIO(stream.getvalue()[:-1])))
+
+
+def test_read_file_is_lazy(tmp_path):
+    path = tmp_path / 'packets.csv'
+    path.write_text('RUN,15000,1,75\nBROKEN,x\n', encoding='utf-8')
+    reader = packets.read_file(path)
+    assert next(reader) == ('RUN', [15000, 1, 75])
+
+
+def test_unknown_extension():
+    with pytest.raises(ValueError):
+        packets.detect_format('packets.xml')
+
+
+def test_run_streams_file(tmp_path):
+    source = tmp_path / 'packets.bin'
+    with open(source, 'wb') as stream:
+        packets.write_binary(PACKAGES, stream)
+    output = tmp_path / 'result.txt'
+    homework.run([str(source), '-o', str(output)])
+    expected = [homework.read_package(*package).show_training_info()
+                .get_message() for package in PACKAGES]
+    assert output.read_text(encoding='utf-8').splitlines() == expected
+
+
+def test_fixed_round_trip(tmp_path):
+    path = tmp_path / 'packets.fixed'
+    with open(path, 'wb') as stream:
+        assert packets.write_fixed(PACKAGES, stream) == len(PACKAGES)
+    assert list(packets.read_file(path)) == PACKAGES
+    with open(path, 'rb') as stream:
+        assert list(packets.read_fixed(stream)) == PACKAGES
+    with packets.FixedPacketFile(path) as fixed:
+        assert len(fixed) == len(PACKAGES)
+        assert fixed.record(2) == PACKAGES[2]
+        with pytest.raises(IndexError):
+            fixed.record(len(PACKAGES))
+
+
+def _write_csv(tmp_path):
+    path = tmp_path / 'packets.csv'
+    path.write_text(''.join(','.join([code, *map(str, data)]) + '\n'
+                            for code, data in PACKAGES), encoding='utf-8')
+    return path
+
+
+def test_fixed_columns_feed_batch(tmp_path):
+    path = tmp_path / 'packets.fixed'
+    packets.convert([_write_csv(tmp_path)], path)
+    with packets.FixedPacketFile(path) as fixed:
+        codes, columns = fixed.columns()
+        result = batch.compute_batch(codes, columns)
+    for index, package in enumerate(PACKAGES):
+        training = homework.read_package(*package)
+        assert result['calories'][index] == pytest.approx(
+            training.get_spent_calories(), rel=1e-15)
+
+
+@pytest.mark.parametrize('content', [b'', b'XXXX',
+                                     packets.FIXED_MAGIC + b'1'])
+def test_fixed_rejects_broken_file(tmp_path, content):
+    path = tmp_path / 'broken.fixed'
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        packets.FixedPacketFile(path)
+
+
+def test_fixed_numpy_views_outlive_close(tmp_path):
+    pytest.importorskip('numpy')
+    path = tmp_path / 'packets.fixed'
+    with open(path, 'wb') as stream:
+        packets.write_fixed(PACKAGES, stream)
+    with packets.FixedPacketFile(path) as fixed:
+        records = fixed.to_numpy()
+        codes, columns = fixed.columns()
+        rest = iter(fixed)
+        next(rest)
+    assert len(records) == len(PACKAGES)
+    assert list(rest) == PACKAGES[1:]
+    assert codes == [code for code, _ in PACKAGES]
+    assert columns['action'].tolist() == [data[0] for _, data in PACKAGES]
+    assert columns['length_pool'] is columns['height']
+
+
+def test_fixed_too_many_values():
+    with pytest.raises(ValueError):
+        packets.pack_fixed('SWM', [1] * 6)
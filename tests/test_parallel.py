@@ -0,0 +1,52 @@
+import pytest
+
+import homework
+import parallel
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+] * 7
+
+
+def expected_messages(packages):
+    return [homework.read_package(*package).show_training_info()
+            for package in packages]
+
+
+def test_chunked():
+    assert list(parallel.chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+@pytest.mark.parametrize('workers, chunk_size', [(1, 1), (2, 4), (3, 100)])
+def test_process_packets_parallel_ordered(workers, chunk_size):
+    result = list(parallel.process_packets_parallel(
+        iter(PACKAGES), workers=workers, chunk_size=chunk_size))
+    assert result == expected_messages(PACKAGES)
+
+
+def test_process_packets_parallel_unordered():
+    result = parallel.process_packets_parallel(
+        PACKAGES, workers=2, chunk_size=2, ordered=False)
+    key = homework.InfoMessage.get_message
+    assert (sorted(result, key=key)
+            == sorted(expected_messages(PACKAGES), key=key))
+
+
+def test_process_packets_parallel_bad_chunk_size():
+    with pytest.raises(ValueError):
+        list(parallel.process_packets_parallel(PACKAGES, chunk_size=0))
+
+
+def test_process_packets_parallel_reraises_worker_error():
+    with pytest.raises(KeyError):
+        list(parallel.process_packets_parallel([('XXX', [1, 1, 1])],
+                                               workers=1))
+
+
+def test_run_with_workers(tmp_path):
+    output = tmp_path / 'result.txt'
+    homework.run(['-j', '2', '-o', str(output)])
+    assert output.read_text(encoding='utf-8').splitlines() == [
+        info.get_message() for info in expected_messages(homework.PACKAGES)]
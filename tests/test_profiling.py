@@ -0,0 +1,79 @@
+import json
+import urllib.request
+
+import pytest
+
+import homework
+from profiling import Profiler
+
+
+def test_disable_restores_originals():
+    read_package = homework.read_package
+    get_distance = homework.Training.get_distance
+    get_message = homework.InfoMessage.get_message
+    with Profiler() as profiler:
+        assert profiler.enabled
+        assert homework.read_package is not read_package
+    assert not profiler.enabled
+    assert homework.read_package is read_package
+    assert homework.Training.get_distance is get_distance
+    assert homework.InfoMessage.get_message is get_message
+
+
+def test_profiler_counts_stages():
+    with Profiler() as profiler:
+        for package in homework.PACKAGES:
+            homework.read_package(*package).show_training_info().get_message()
+    stages = profiler.to_dict()
+    assert stages['read_package']['calls'] == 3
+    assert stages['InfoMessage.get_message']['calls'] == 3
+    assert stages['Running.get_spent_calories']['calls'] == 1
+    # Скорость запомнена после первого вызова, поэтому расчёт калорий
+    # уже не запрашивает дистанцию.
+    assert stages['Running.get_distance']['calls'] == 2
+    assert stages['Swimming.get_distance']['calls'] == 1
+    for stats in stages.values():
+        assert sum(stats['buckets'].values()) == stats['calls']
+
+
+def test_prometheus_format():
+    profiler = Profiler(buckets=(0.5,))
+    profiler.record('read_package', 0.25)
+    profiler.record('read_package', 1.0)
+    assert profiler.to_prometheus().splitlines()[2:] == [
+        'fitness_stage_seconds_bucket{stage="read_package",le="0.5"} 1',
+        'fitness_stage_seconds_bucket{stage="read_package",le="+Inf"} 2',
+        'fitness_stage_seconds_sum{stage="read_package"} 1.25',
+        'fitness_stage_seconds_count{stage="read_package"} 2',
+    ]
+
+
+def test_serve_metrics():
+    profiler = Profiler()
+    profiler.record('read_package', 1e-6)
+    server = profiler.serve()
+    try:
+        host, port = server.server_address
+        with urllib.request.urlopen(f'http://{host}:{port}/json') as reply:
+            assert json.load(reply)['read_package']['calls'] == 1
+        with urllib.request.urlopen(f'http://{host}:{port}/metrics') as reply:
+            assert b'fitness_stage_seconds_count' in reply.read()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_run_dumps_profile(tmp_path):
+    profile = tmp_path / 'profile.json'
+    homework.run(['-o', str(tmp_path / 'out.txt'), '--profile', str(profile)])
+    stages = json.loads(profile.read_text(encoding='utf-8'))
+    assert stages['read_package']['calls'] == len(homework.PACKAGES)
+    assert not hasattr(homework.read_package, '__wrapped__')
+
+
+def test_run_rejects_profile_with_workers(tmp_path, capsys):
+    profile = tmp_path / 'profile.json'
+    with pytest.raises(SystemExit):
+        homework.run(['-j', '2', '--profile', str(profile)])
+    assert '--profile' in capsys.readouterr().err
+    assert not profile.exists()
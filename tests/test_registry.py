@@ -0,0 +1,48 @@
+import pytest
+
+import homework
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    for name in ('TRAININGS', 'TRAINING_FIELDS', '_SHAPES'):
+        monkeypatch.setattr(homework, name,
+                            dict(getattr(homework, name)))
+
+
+def test_builtin_trainings_registered():
+    assert homework.TRAININGS == {'RUN': homework.Running,
+                                  'WLK': homework.SportsWalking,
+                                  'SWM': homework.Swimming}
+    assert homework.TRAINING_FIELDS['SWM'] == (
+        'action', 'duration', 'weight', 'length_pool', 'count_pool')
+
+
+def test_register_new_training(registry):
+    @homework.register('BIK')
+    class Cycling(homework.Training):
+        LEN_STEP = 5.5
+
+    training = homework.read_package('BIK', [1000, 1, 70])
+    assert isinstance(training, Cycling)
+    assert training.get_distance() == 5.5
+
+
+def test_register_duplicate_code(registry):
+    with pytest.raises(ValueError):
+        homework.register('RUN')(homework.Running)
+
+
+@pytest.mark.parametrize('workout_type, data', [
+    ('RUN', [15000, 1]),
+    ('WLK', [9000, 1, 75]),
+    ('SWM', [720, 1, 80, 25, 40, 1]),
+])
+def test_read_package_wrong_arity(workout_type, data):
+    with pytest.raises(ValueError, match=workout_type):
+        homework.read_package(workout_type, data)
+
+
+def test_read_package_unknown_code():
+    with pytest.raises(KeyError):
+        homework.read_package('XXX', [1, 1, 1])
@@ -0,0 +1,159 @@
+import asyncio
+import random
+
+import pytest
+
+import homework
+import server
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+]
+
+
+def expected(package):
+    return homework.read_package(*package).show_training_info().get_message()
+
+
+@pytest.mark.parametrize('line', ['XXX,1,1,1', 'RUN,1,1', 'RUN,a,1,1',
+                                  'RUN,1,0,1', 'WLK,1e200,1,75,180', ''])
+def test_handle_line_errors(line):
+    assert server.handle_line(line).startswith(server.ERROR_PREFIX)
+
+
+def test_tcp_round_trip():
+    async def scenario():
+        packet_server = server.PacketServer()
+        await packet_server.start_tcp()
+        client = await server.PacketClient.connect(*packet_server.address)
+        replies = [await client.send(*package) for package in PACKAGES]
+        await client.close()
+        await packet_server.shutdown()
+        return replies
+
+    assert asyncio.run(scenario()) == [expected(p) for p in PACKAGES]
+
+
+def test_unix_round_trip(tmp_path):
+    path = str(tmp_path / 'packets.sock')
+
+    async def scenario():
+        packet_server = server.PacketServer()
+        await packet_server.start_unix(path)
+        client = await server.PacketClient.connect_unix(path)
+        reply = await client.send(*PACKAGES[0])
+        await client.close()
+        await packet_server.shutdown()
+        return reply
+
+    assert asyncio.run(scenario()) == expected(PACKAGES[0])
+
+
+def test_connection_limit_queues_clients():
+    async def scenario():
+        packet_server = server.PacketServer(max_connections=1)
+        await packet_server.start_tcp()
+        first = await server.PacketClient.connect(*packet_server.address)
+        second = await server.PacketClient.connect(*packet_server.address)
+        await first.send(*PACKAGES[0])
+        waiting = asyncio.ensure_future(second.send(*PACKAGES[1]))
+        await asyncio.sleep(0.05)
+        queued = not waiting.done()
+        await first.close()
+        reply = await waiting
+        await second.close()
+        await packet_server.shutdown()
+        return queued, reply
+
+    assert asyncio.run(scenario()) == (True, expected(PACKAGES[1]))
+
+
+def test_shutdown_closes_idle_connections():
+    async def scenario():
+        packet_server = server.PacketServer()
+        await packet_server.start_tcp()
+        client = await server.PacketClient.connect(*packet_server.address)
+        await client.send(*PACKAGES[0])
+        await asyncio.wait_for(packet_server.shutdown(timeout=1), 2)
+        with pytest.raises(ConnectionError):
+            await client.send(*PACKAGES[0])
+        await client.close()
+
+    asyncio.run(scenario())
+
+
+def test_too_long_line():
+    async def scenario():
+        packet_server = server.PacketServer(max_line=64)
+        await packet_server.start_tcp()
+        client = await server.PacketClient.connect(*packet_server.address)
+        reply = await client.send('RUN', [1] * 100)
+        await client.close()
+        await packet_server.shutdown()
+        return reply
+
+    assert asyncio.run(scenario()).startswith(server.ERROR_PREFIX)
+
+
+def test_overflow_keeps_connection():
+    packages = [('WLK', [1e200, 1, 75, 180]), *PACKAGES]
+
+    async def scenario():
+        packet_server = server.PacketServer()
+        await packet_server.start_tcp()
+        client = await server.PacketClient.connect(*packet_server.address)
+        replies = await client.send_many(packages)
+        await client.close()
+        await packet_server.shutdown()
+        return replies
+
+    replies = asyncio.run(scenario())
+    assert replies[0].startswith(server.ERROR_PREFIX)
+    assert replies[1:] == [expected(p) for p in PACKAGES]
+
+
+def test_handle_batch():
+    line = server.BATCH_SEPARATOR.join(
+        ','.join([code, *map(str, data)]) for code, data in PACKAGES)
+    replies = server.handle_batch(line + ';XXX,1').split('\n')
+    assert replies[:-1] == [expected(p) for p in PACKAGES]
+    assert replies[-1].startswith(server.ERROR_PREFIX)
+
+
+def test_send_many_pipelines_batches():
+    packages = PACKAGES * 1000
+
+    async def scenario():
+        packet_server = server.PacketServer()
+        await packet_server.start_tcp()
+        client = await server.PacketClient.connect(*packet_server.address)
+        replies = await client.send_many(packages, batch_size=7)
+        await client.close()
+        await packet_server.shutdown()
+        return replies
+
+    assert asyncio.run(scenario()) == [expected(p) for p in packages]
+
+
+def float_packages(count):
+    rnd = random.Random(0)
+    return [('SWM', [rnd.uniform(100, 30000), rnd.uniform(0.25, 3),
+                     rnd.uniform(40, 120), 25.0, rnd.uniform(1, 80)])
+            for _ in range(count)]
+
+
+def test_send_many_default_batch_fits_line_limit():
+    packages = float_packages(200)
+
+    async def scenario():
+        packet_server = server.PacketServer()
+        await packet_server.start_tcp()
+        client = await server.PacketClient.connect(*packet_server.address)
+        replies = await client.send_many(packages)
+        await client.close()
+        await packet_server.shutdown()
+        return replies
+
+    assert asyncio.run(scenario()) == [expected(p) for p in packages]
@@ -0,0 +1,57 @@
+import pytest
+
+import homework
+from session import TrainingSession
+
+
+@pytest.mark.parametrize('workout_type, data, constants', [
+    ('RUN', [15000, 1, 75], {'weight': 75}),
+    ('WLK', [9000, 1.5, 75, 180], {'weight': 75, 'height': 180}),
+    ('SWM', [720, 1, 80, 25, 40], {'weight': 80, 'length_pool': 25}),
+])
+def test_session_totals_match_training(workout_type, data, constants):
+    session = TrainingSession(workout_type, **constants)
+    seconds = round(data[1] * 3600)
+    laps = data[4] if workout_type == 'SWM' else 0
+    for second in range(seconds):
+        point = session.add_sample(
+            1, data[0] // seconds + (second < data[0] % seconds),
+            laps // seconds + (second < laps % seconds))
+    expected = homework.read_package(workout_type, data)
+    assert point.distance == expected.get_distance()
+    assert point.mean_speed == expected.get_mean_speed()
+    assert point.calories == expected.get_spent_calories()
+    assert (session.show_training_info().get_message()
+            == expected.show_training_info().get_message())
+
+
+def test_window_speed():
+    session = TrainingSession('RUN', window=10, weight=75)
+    for _ in range(10):
+        session.add_sample(1, 2)
+    assert session.window_speed() == pytest.approx(2 * 0.65 / 1000 * 3600)
+    for _ in range(10):
+        point = session.add_sample(1, 4)
+    assert point.window_speed == pytest.approx(4 * 0.65 / 1000 * 3600)
+    assert point.mean_speed == pytest.approx(3 * 0.65 / 1000 * 3600)
+
+
+def test_swimming_window_speed_uses_pool_laps():
+    session = TrainingSession('SWM', window=60, weight=80, length_pool=25)
+    point = session.add_sample(30, 20, 1)
+    assert point.window_speed == pytest.approx(25 / 1000 / (30 / 3600))
+
+
+@pytest.mark.parametrize('workout_type, constants, error', [
+    ('XXX', {'weight': 75}, KeyError),
+    ('WLK', {'weight': 75}, ValueError),
+    ('RUN', {'weight': 75, 'height': 180}, ValueError),
+])
+def test_session_constants(workout_type, constants, error):
+    with pytest.raises(error):
+        TrainingSession(workout_type, **constants)
+
+
+def test_sample_duration_must_be_positive():
+    with pytest.raises(ValueError):
+        TrainingSession('RUN', weight=75).add_sample(0, 10)
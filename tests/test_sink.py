@@ -0,0 +1,66 @@
+import io
+import threading
+
+import pytest
+
+import homework
+from sink import MessageSink
+
+
+def info(producer, index):
+    return homework.InfoMessage(f'P{producer}', index, 0, 0, 0)
+
+
+@pytest.mark.parametrize('batch_size', [1, 7, 1024])
+def test_sink_keeps_producer_order(batch_size):
+    stream = io.StringIO()
+    producers, count = 8, 200
+    with MessageSink(stream, batch_size=batch_size) as sink:
+        threads = [threading.Thread(
+            target=sink.submit_many,
+            args=([info(producer, index) for index in range(count)],))
+            for producer in range(producers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    lines = stream.getvalue().splitlines()
+    assert sink.written == len(lines) == producers * count
+    for producer in range(producers):
+        own = [line for line in lines
+               if line.startswith(f'Тип тренировки: P{producer};')]
+        assert own == [info(producer, index).get_message()
+                       for index in range(count)]
+
+
+def test_sink_flushes_by_interval():
+    class Stream(io.StringIO):
+        flushed = threading.Event()
+
+        def flush(self):
+            self.flushed.set()
+
+    stream = Stream()
+    sink = MessageSink(stream, batch_size=1000, flush_interval=0.01)
+    sink.submit(info(0, 1))
+    assert stream.flushed.wait(2)
+    assert stream.getvalue() == info(0, 1).get_message() + '\n'
+    sink.close()
+
+
+def test_sink_accepts_tuples_and_rejects_after_close():
+    stream = io.StringIO()
+    sink = MessageSink(stream)
+    sink.submit(('Running', 1, 2, 3, 4))
+    sink.close()
+    assert stream.getvalue() == homework.InfoMessage(
+        'Running', 1, 2, 3, 4).get_message() + '\n'
+    with pytest.raises(RuntimeError):
+        sink.submit(('Running', 1, 2, 3, 4))
+
+
+def test_sink_reports_write_errors():
+    sink = MessageSink(io.StringIO(), batch_size=1)
+    sink.submit(('Running', 'не число', 2, 3, 4))
+    with pytest.raises(RuntimeError):
+        sink.close()
@@ -0,0 +1,125 @@
+import math
+import pickle
+import random
+from bisect import bisect_left
+
+import pytest
+
+import homework
+from sketches import (HISTOGRAM_EDGES, Histogram, TDigest, WorkoutStats,
+                      geometric_edges, linear_edges)
+
+QUANTILES = (0.01, 0.5, 0.95, 0.99, 0.999)
+
+
+def rank_error(ordered, value, q):
+    return abs(bisect_left(ordered, value) / len(ordered) - q)
+
+
+def samples(name, count, seed=1):
+    rnd = random.Random(seed)
+    if name == 'lognormal':
+        return [rnd.lognormvariate(2, 0.8) for _ in range(count)]
+    if name == 'exponential':
+        return [rnd.expovariate(0.01) for _ in range(count)]
+    return [rnd.uniform(0, 100) for _ in range(count)]
+
+
+@pytest.mark.parametrize('name', ['lognormal', 'exponential', 'uniform'])
+def test_digest_matches_exact_quantiles(name):
+    values = samples(name, 100_000)
+    ordered = sorted(values)
+    digest = TDigest()
+    digest.extend(values)
+    assert len(digest) == len(values)
+    assert len(digest.means) <= digest.compression
+    for q in QUANTILES:
+        assert rank_error(ordered, digest.quantile(q), q) < 0.001, q
+    assert digest.quantile(0) == ordered[0]
+    assert digest.quantile(1) == ordered[-1]
+
+
+def test_merged_digest_is_as_accurate():
+    values = samples('lognormal', 100_000)
+    ordered = sorted(values)
+    parts = [TDigest() for _ in range(4)]
+    for index, value in enumerate(values):
+        parts[index % 4].add(value)
+    merged = TDigest()
+    for part in parts:
+        merged.merge(pickle.loads(pickle.dumps(part)))
+    assert len(merged) == len(values)
+    for q in QUANTILES:
+        assert rank_error(ordered, merged.quantile(q), q) < 0.001, q
+
+
+def test_digest_small_and_empty():
+    digest = TDigest()
+    assert math.isnan(digest.quantile(0.5))
+    digest.extend([3.0, 1.0, 2.0])
+    assert digest.quantile(0.5) == 2.0
+    assert digest.quantile(0.01) == 1.0
+    with pytest.raises(ValueError):
+        digest.quantile(1.5)
+    with pytest.raises(ValueError):
+        TDigest(compression=1)
+
+
+def test_histogram_quantiles():
+    values = samples('uniform', 50_000)
+    ordered = sorted(values)
+    histogram = Histogram(linear_edges(0, 100, 100))
+    histogram.extend(values)
+    for q in QUANTILES:
+        assert rank_error(ordered, histogram.quantile(q), q) < 0.002, q
+    other = Histogram(linear_edges(0, 100, 100))
+    other.extend([-5, 150])
+    histogram.merge(other)
+    assert len(histogram) == len(values) + 2
+    assert histogram.counts[0] == histogram.counts[-1] == 1
+    assert histogram.quantile(1) == 100
+    with pytest.raises(ValueError):
+        histogram.merge(Histogram([0, 1]))
+    with pytest.raises(ValueError):
+        Histogram([1, 1])
+
+
+def test_geometric_edges():
+    edges = geometric_edges(1, 1000, 3)
+    assert edges[0] == 1
+    assert [round(edge) for edge in edges] == [1, 10, 100, 1000]
+    with pytest.raises(ValueError):
+        geometric_edges(0, 10, 2)
+
+
+def test_workout_stats_per_type():
+    packets = [('RUN', [rate * 1000, 1, 75]) for rate in range(1, 101)]
+    packets += [('WLK', [9000, 1, 75, 180])] * 10
+    results = [homework.read_package(*packet) for packet in packets]
+    first, second = WorkoutStats(), WorkoutStats()
+    first.extend(results[::2])
+    second.extend(info.show_training_info() for info in results[1::2])
+    stats = pickle.loads(pickle.dumps(first))
+    stats.merge(second)
+    assert sorted(stats.training_types()) == ['Running', 'SportsWalking']
+    speeds = sorted(result.get_mean_speed() for result in results[:100])
+    median = stats.quantiles('speed', 'Running')[0.5]
+    assert speeds[48] <= median <= speeds[51]
+    walking = results[-1].get_spent_calories()
+    assert stats.digest('calories', 'SportsWalking').quantile(0.99) == (
+        pytest.approx(walking))
+    assert len(stats.digest('speed')) == len(results)
+    histogram = stats.histogram('calories', 'SportsWalking')
+    assert len(histogram) == 10
+    assert len(stats.histogram('speed')) == len(results)
+    assert len(stats.digest('speed', 'Swimming')) == 0
+    with pytest.raises(ValueError):
+        stats.digest('duration')
+    with pytest.raises(ValueError):
+        stats.merge(WorkoutStats(metrics=['speed']))
+
+
+def test_default_edges_cover_metrics():
+    for metric, edges in HISTOGRAM_EDGES.items():
+        assert metric in homework.MESSAGE_FIELDS
+        assert list(edges) == sorted(edges)
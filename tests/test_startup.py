@@ -0,0 +1,86 @@
+import io
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import cli
+import daemon
+import homework
+import packets
+
+ROOT = Path(__file__).resolve().parent.parent
+# Бюджет времени импорта `cli` вместе с `homework`; на медленной машине
+# его можно поднять переменной окружения.
+IMPORT_BUDGET_MS = float(os.environ.get('IMPORT_BUDGET_MS', 10))
+HEAVY_MODULES = ('argparse', 'asyncio', 'concurrent', 'csv', 'dataclasses',
+                 'json', 'multiprocessing', 'numpy', 're', 'typing')
+
+
+def _python(tmp_path, *args):
+    env = {**os.environ, 'PYTHONPATH': str(ROOT)}
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    command = [sys.executable, '-X', f'pycache_prefix={tmp_path}', *args]
+    return subprocess.run(command, env=env, cwd=ROOT, capture_output=True,
+                          text=True, check=True)
+
+
+def _modules(tmp_path, code):
+    output = _python(tmp_path, '-c', f'{code}import sys; '
+                     'print("\\n".join(sys.modules))').stdout
+    return set(output.split())
+
+
+def test_cli_does_not_load_heavy_modules(tmp_path):
+    loaded = (_modules(tmp_path, 'import cli; ')
+              - _modules(tmp_path, ''))
+    assert not {name.split('.')[0] for name in loaded} & set(HEAVY_MODULES)
+
+
+def test_import_time_budget(tmp_path):
+    _python(tmp_path, '-c', 'import cli')
+    best = float('inf')
+    for _ in range(3):
+        report = _python(tmp_path, '-X', 'importtime', '-c',
+                         'import cli').stderr
+        total, = (int(line.split('|')[1]) for line in report.splitlines()
+                  if line.endswith('| cli'))
+        best = min(best, total / 1000)
+    assert best < IMPORT_BUDGET_MS
+
+
+def test_cli_prints_packets_from_argv():
+    stream = io.StringIO()
+    argv = [str(value) for package in homework.PACKAGES
+            for value in (package[0], *package[1])]
+    assert cli.main(argv, stream) == 0
+    assert stream.getvalue().splitlines() == [
+        homework.read_package(*package).show_training_info().get_message()
+        for package in homework.PACKAGES]
+
+
+def test_cli_shares_parsing_helpers():
+    assert cli.parse_argv(['RUN', '15000', '1.5', '75', 'XXX', '1']) == [
+        ('RUN', [15000, 1.5, 75]), ('XXX', [1])]
+    assert [','.join([code, *map(str, data)]) for code, data in
+            cli.parse_argv(['SWM', '720', '1', '80', '25', '40'])] == (
+        daemon.packet_lines(['SWM', '720', '1', '80', '25', '40']))
+    assert packets.parse_number is homework.parse_number
+
+
+@pytest.mark.parametrize('argv', [['RUN', '15000', '0', '75'],
+                                  ['RUN', '15000', '1'],
+                                  ['RUN', '15000', 'x', '75'],
+                                  ['RUN', '15000', '1', '75', 'XXX', '1']])
+def test_cli_reports_bad_packet(argv, capsys):
+    assert cli.main(argv, io.StringIO()) == 2
+    assert capsys.readouterr().err.startswith('Ошибка: ')
+
+
+def test_cli_delegates_to_full_command(tmp_path):
+    output = tmp_path / 'result.txt'
+    assert cli.main(['-o', str(output)]) == 0
+    assert len(output.read_text(encoding='utf-8').splitlines()) == len(
+        homework.PACKAGES)
@@ -0,0 +1,82 @@
+import itertools
+import math
+
+import pytest
+
+import homework
+import validation
+
+VALID = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+]
+
+
+@pytest.mark.parametrize('package, field', [
+    (('XXX', [1, 1, 1]), 'код'),
+    ((None, [1, 1, 1]), 'код'),
+    (('RUN', [15000, 1]), 'показателей'),
+    (('RUN', 15000), 'списком'),
+    (('RUN', [15000, 0, 75]), 'duration'),
+    (('RUN', [15000, -1, 75]), 'duration'),
+    (('WLK', [9000, 1, 75, 0]), 'height'),
+    (('SWM', [720, 1, 80, 'x', 40]), 'length_pool'),
+    (('SWM', [720, 1, 80, 25, True]), 'count_pool'),
+    (('RUN', [15000, math.nan, 75]), 'duration'),
+    (('RUN', [math.inf, 1, 75]), 'action'),
+    (('RUN', [15000, 1, 0]), 'weight'),
+    (('WLK', [1e200, 1, 75, 180]), 'action'),
+    (('RUN', [15000, 1e-9, 75]), 'duration'),
+    (('WLK', [9000, 1, 75, 1e-300]), 'height'),
+    (('SWM', [720, 1, 80, 25, 1e300]), 'count_pool'),
+])
+def test_rejects_bad_packet(package, field):
+    result = validation.validate_packets([*VALID, package])
+    assert result.mask == [True, True, True, False]
+    assert result.valid == VALID
+    rejection, = result.rejected
+    assert rejection.index == len(VALID)
+    assert rejection.workout_type == package[0]
+    assert field in rejection.reason
+
+
+def test_valid_packets_do_not_fail():
+    packages = [*VALID, ('RUN', [0, 0.5, 60]), ('SWM', [0, 1, 80, 25, 0])]
+    result = validation.validate_packets(iter(packages))
+    assert result.rejected == []
+    for workout_type, data in result.valid:
+        homework.read_package(workout_type, data).show_training_info()
+
+
+def test_limits_keep_results_finite():
+    rules = validation.compile_rules()
+    for code, (_, lows, highs) in rules.items():
+        for data in itertools.product(*zip(lows, highs)):
+            info = homework.read_package(code, list(data)).show_training_info()
+            assert all(map(math.isfinite, (info.distance, info.speed,
+                                           info.calories)))
+
+
+def test_custom_limits():
+    limits = {**validation.LIMITS, 'weight': validation.Range(30, 200)}
+    result = validation.validate_packets(
+        [('RUN', [15000, 1, 20]), ('RUN', [15000, 1, 30])], limits)
+    assert result.mask == [False, True]
+
+
+def test_iter_valid_reports_rejections():
+    rejected = []
+    packages = [('RUN', [15000, 0, 75]), *VALID]
+    assert list(validation.iter_valid(packages, rejected.append)) == VALID
+    assert [rejection.index for rejection in rejected] == [0]
+
+
+def test_run_skips_invalid(tmp_path, capsys):
+    source = tmp_path / 'packets.csv'
+    source.write_text('RUN,15000,1,75\nWLK,9000,1,75,0\nXXX,1\n'
+                      'WLK,1e200,1,75,180\n', encoding='utf-8')
+    output = tmp_path / 'result.txt'
+    homework.run([str(source), '-o', str(output), '--skip-invalid'])
+    assert len(output.read_text(encoding='utf-8').splitlines()) == 1
+    assert capsys.readouterr().err.count('пропущен') == 3
@@ -0,0 +1,149 @@
+"""Проверка пакетов перед расчётом.
+
+Пакет с неизвестным кодом, неверным числом показателей, нечисловым
+или физически невозможным показателем (например, нулевой
+длительностью или ростом) ломает расчёт исключением. Функции модуля
+проверяют весь набор пакетов за один проход без исключений и
+отделяют отклонённые пакеты с причинами от годных.
+"""
+from __future__ import annotations
+
+import math
+import sys
+from dataclasses import dataclass, field
+from itertools import compress
+from typing import Callable, Iterable, Iterator, Sequence
+
+from homework import TRAINING_FIELDS
+
+Packet = tuple[str, Sequence[float]]
+
+
+@dataclass(frozen=True)
+class Range:
+    """Допустимые значения показателя."""
+    low: float
+    high: float = math.inf
+    low_inclusive: bool = True
+
+    def bounds(self) -> tuple[float, float]:
+        """Включительные границы конечных допустимых значений."""
+        low = self.low if self.low_inclusive else math.nextafter(
+            self.low, math.inf)
+        return low, min(self.high, sys.float_info.max)
+
+
+# Формулы монотонны по каждому показателю, поэтому при этих пределах
+# дистанция, скорость и калории любого годного пакета конечны: без
+# верхней границы числа шагов или нижней границы длительности и роста
+# расчёт переполняется (OverflowError).
+LIMITS: dict[str, Range] = {
+    'action': Range(0, 10_000_000),
+    'duration': Range(1 / 3600, 48),
+    'weight': Range(0, 500, low_inclusive=False),
+    'height': Range(30, 300),
+    'length_pool': Range(0, 1000, low_inclusive=False),
+    'count_pool': Range(0, 10_000),
+}
+
+
+@dataclass(frozen=True)
+class Rejection:
+    """Отклонённый пакет: номер в наборе, код и причина."""
+    index: int
+    workout_type: object
+    reason: str
+
+
+@dataclass
+class ValidationResult:
+    """Годные пакеты, маска годности и отклонённые пакеты."""
+    valid: list[Packet] = field(default_factory=list)
+    mask: list[bool] = field(default_factory=list)
+    rejected: list[Rejection] = field(default_factory=list)
+
+
+Rules = dict[str, tuple[tuple[str, ...], tuple[float, ...],
+                        tuple[float, ...]]]
+
+NUMBERS: tuple[type, ...] = (int, float)
+UNBOUNDED = Range(-math.inf)
+
+
+def compile_rules(limits: dict[str, Range] = LIMITS) -> Rules:
+    """Собрать для каждого кода названия показателей и их границы."""
+    rules: Rules = {}
+    for code, fields in TRAINING_FIELDS.items():
+        bounds = [limits.get(name, UNBOUNDED).bounds() for name in fields]
+        rules[code] = (fields, tuple(low for low, _ in bounds),
+                       tuple(high for _, high in bounds))
+    return rules
+
+
+def _reason(fields: tuple[str, ...], lows: tuple[float, ...],
+            highs: tuple[float, ...], data: object) -> str:
+    if not isinstance(data, (list, tuple)):
+        return 'показатели должны быть списком'
+    if len(data) != len(fields):
+        return (f'нужно {len(fields)} показателей, '
+                f'получено {len(data)}')
+    for name, low, high, value in zip(fields, lows, highs, data):
+        if type(value) not in NUMBERS:
+            return f'{name}: не число ({value!r})'
+        if not math.isfinite(value):
+            return f'{name}: не конечное число ({value!r})'
+        if not low <= value <= high:
+            return f'{name}: значение {value!r} вне допустимых пределов'
+    return ''
+
+
+def check_packet(workout_type: object, data: object,
+                 rules: Rules) -> str | None:
+    """Вернуть причину отказа или None для годного пакета.
+
+    Годный пакет проверяется одним проходом по показателям: границы
+    включительные и конечные, поэтому сравнение отсекает и NaN, и
+    бесконечность. Причина ищется только для отклонённых пакетов.
+    """
+    rule = rules.get(workout_type) if type(workout_type) is str else None
+    if rule is None:
+        return f'неизвестный код тренировки {workout_type!r}'
+    fields, lows, highs = rule
+    if type(data) in (list, tuple) and len(data) == len(fields):
+        for value, low, high in zip(data, lows, highs):
+            if type(value) not in NUMBERS or not low <= value <= high:
+                break
+        else:
+            return None
+    return _reason(fields, lows, highs, data)
+
+
+def validate_packets(packets: Iterable[Packet],
+                     limits: dict[str, Range] = LIMITS
+                     ) -> ValidationResult:
+    """Проверить набор пакетов за один проход."""
+    rules = compile_rules(limits)
+    packets = list(packets)
+    reasons = [check_packet(workout_type, data, rules)
+               for workout_type, data in packets]
+    mask = [reason is None for reason in reasons]
+    rejected = [Rejection(index, packets[index][0], reason)
+                for index, reason in enumerate(reasons)
+                if reason is not None]
+    return ValidationResult(list(compress(packets, mask)), mask, rejected)
+
+
+def iter_valid(packets: Iterable[Packet],
+               on_reject: Callable[[Rejection], None] | None = None,
+               limits: dict[str, Range] = LIMITS) -> Iterator[Packet]:
+    """Лениво пропускать только годные пакеты.
+
+    Для каждого отклонённого пакета вызывается `on_reject`.
+    """
+    rules = compile_rules(limits)
+    for index, (workout_type, data) in enumerate(packets):
+        reason = check_packet(workout_type, data, rules)
+        if reason is None:
+            yield workout_type, data
+        elif on_reject is not None:
+            on_reject(Rejection(index, workout_type, reason))